@@ -1,12 +1,14 @@
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Avg, Count, Min, Max
+from django.db.models import Avg, Count, Exists, Min, Max, OuterRef
 from collections import defaultdict
+import numpy as np
 
 from .models import SystemMetric, RegionalMetric, UserActivity, EmergencyTypeMetric
-from emergency.models import EmergencyReport
+from emergency.models import EmergencyReport, EmergencyResponseTiming
 from users.models import User
 from notifications.models import Notification
+from emergency.distance import coordinate_arrays
 
 def collect_daily_metrics():
     """
@@ -69,11 +71,13 @@ def collect_emergency_type_metrics(date):
     emergency_types = EmergencyTag.objects.values_list('emergency_type', flat=True).distinct()
     
     for e_type in emergency_types:
-        # Get reports for this type
-        reports = EmergencyReport.objects.filter(
-            timestamp__date=date,
-            tags__emergency_type=e_type
+        # Reports with at least one tag of this type, each counted once
+        # however many such tags it has
+        tagged = EmergencyReport.tags.through.objects.filter(
+            emergencyreport_id=OuterRef('pk'),
+            emergencytag__emergency_type=e_type
         )
+        reports = EmergencyReport.objects.filter(Exists(tagged), timestamp__date=date)
         
         # Skip if no reports
         if not reports.exists():
@@ -88,9 +92,13 @@ def collect_emergency_type_metrics(date):
         # Calculate resolution rate
         resolution_rate = (resolved / total_count) * 100 if total_count > 0 else 0
         
-        # Calculate average response time (placeholder - need to implement based on your data model)
-        # This would require tracking when a report status changes to RESPONDING
-        avg_response_time = 0
+        # Average minutes until emergency services started responding.
+        # Reports that reached RESPONDING before status events were recorded
+        # have no time for it and are left out.
+        avg_response_time = EmergencyResponseTiming.objects.filter(
+            reported_at__date=date,
+            report__in=reports
+        ).aggregate(avg=Avg('minutes_to_responding'))['avg'] or 0
         
         # Save metrics
         EmergencyTypeMetric.objects.create(
@@ -106,34 +114,33 @@ def collect_regional_metrics(date):
     # This is a placeholder - you need to implement region determination
     # based on your data model (e.g., geocoding based on lat/lng)
     
-    # Example implementation
-    reports_by_region = defaultdict(list)
+    # Load coordinates as columns and classify every report in one pass
+    ids, lats, lngs = coordinate_arrays(
+        EmergencyReport.objects.filter(timestamp__date=date).values_list('id', 'latitude', 'longitude')
+    )
+    regions = assign_regions(lats, lngs)
     
-    # Assign reports to regions (simplified example)
-    for report in EmergencyReport.objects.filter(timestamp__date=date):
-        # Simplified region determination based on coordinates
-        # In a real app, you would use geocoding or predefined regions
-        if report.latitude and report.longitude:
-            if report.latitude > 0 and report.longitude > 0:
-                region = 'NORTH'
-            elif report.latitude > 0 and report.longitude < 0:
-                region = 'WEST'
-            elif report.latitude < 0 and report.longitude > 0:
-                region = 'EAST'
-            elif report.latitude < 0 and report.longitude < 0:
-                region = 'SOUTH'
-            else:
-                region = 'CENTRAL'
-                
-            reports_by_region[region].append(report)
+    reports_by_region = defaultdict(list)
+    for report_id, region in zip(ids, regions):
+        if region:
+            reports_by_region[str(region)].append(report_id)
+    
+    # Average minutes until emergency services started responding, per report
+    response_minutes = dict(
+        EmergencyResponseTiming.objects.filter(
+            reported_at__date=date,
+            minutes_to_responding__isnull=False
+        ).values_list('report_id', 'minutes_to_responding')
+    )
     
     # Calculate metrics for each region
     for region, reports in reports_by_region.items():
         # Count reports
         count = len(reports)
         
-        # Calculate average response time (placeholder)
-        response_time_avg = 0
+        # Calculate average response time
+        minutes = [response_minutes[report_id] for report_id in reports if report_id in response_minutes]
+        response_time_avg = sum(minutes) / len(minutes) if minutes else 0
         
         # Save regional metrics
         RegionalMetric.objects.create(
@@ -143,6 +150,28 @@ def collect_regional_metrics(date):
             response_time_avg=response_time_avg
         )
 
+def assign_regions(lats, lngs):
+    """
+    Assign a region to each coordinate pair given as NumPy columns.
+    
+    Simplified region determination based on coordinates; in a real app you
+    would use geocoding or predefined regions. Rows with a missing or zero
+    coordinate get an empty region and are left out of the metrics.
+    """
+    with np.errstate(invalid='ignore'):
+        located = ~np.isnan(lats) & ~np.isnan(lngs) & (lats != 0) & (lngs != 0)
+        regions = np.select(
+            [
+                (lats > 0) & (lngs > 0),
+                (lats > 0) & (lngs < 0),
+                (lats < 0) & (lngs > 0),
+                (lats < 0) & (lngs < 0),
+            ],
+            ['NORTH', 'WEST', 'EAST', 'SOUTH'],
+            default='CENTRAL'
+        )
+    return np.where(located, regions, '')
+
 def collect_user_activity(date):
     """Collect activity metrics for each user on the given date"""
     # Get all users who were active on the given date
@@ -1,3 +1,55 @@
+import importlib
+from datetime import timedelta
+
+from django.apps import apps
 from django.test import TestCase
+from django.utils import timezone
+
+from emergency.models import EmergencyReport, EmergencyResponseTiming, EmergencyTag
+from emergency.services import record_reports_created, record_status_change
+from users.models import User
+from .models import EmergencyTypeMetric
+from .services import collect_emergency_type_metrics
+
+
+class EmergencyTypeMetricTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('citizen', 'citizen@example.com', 'pass', role='CITIZEN')
+        self.day = timezone.now() - timedelta(days=1)
+
+    def report(self, tags, minutes_to_responding=None):
+        report = EmergencyReport.objects.create(
+            reporter=self.user, reporter_type='VICTIM', description='Smoke', latitude=38.4192, longitude=27.1287
+        )
+        EmergencyReport.objects.filter(pk=report.pk).update(timestamp=self.day)
+        report.refresh_from_db()
+        report.tags.set(tags)
+        record_reports_created([report])
+        if minutes_to_responding is not None:
+            report.status = 'RESPONDING'
+            report.save()
+            record_status_change(report, 'PENDING', timestamp=self.day + timedelta(minutes=minutes_to_responding))
+        return report
+
+    def test_reports_with_several_tags_of_a_type_count_once(self):
+        building = EmergencyTag.objects.create(name='Building fire', emergency_type='FIRE')
+        forest = EmergencyTag.objects.create(name='Forest fire', emergency_type='FIRE')
+        self.report([building, forest], minutes_to_responding=10)
+        self.report([building], minutes_to_responding=20)
+        self.report([building])
+
+        collect_emergency_type_metrics(self.day.date())
+        metric = EmergencyTypeMetric.objects.get(emergency_type='FIRE')
+        self.assertEqual(metric.count, 3)
+        self.assertAlmostEqual(metric.avg_response_time, 15)
+        self.assertEqual(metric.resolution_rate, 0)
+
+    def test_backfill_gives_older_reports_an_empty_timing(self):
+        report = self.report([])
+        EmergencyResponseTiming.objects.all().delete()
 
-# Create your tests here.
+        migration = importlib.import_module('emergency.migrations.0016_backfill_response_timings')
+        migration.backfill_response_timings(apps, None)
+        timing = EmergencyResponseTiming.objects.get()
+        self.assertEqual((timing.report_id, timing.reported_at), (report.pk, report.timestamp))
+        self.assertIsNone(timing.minutes_to_responding)
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Load the active-incident index now rather than on the first request
+from emergency.live_index import live_index
+
+live_index.warm_on_startup()
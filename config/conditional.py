@@ -0,0 +1,52 @@
+"""
+Conditional GET for API views that clients poll.
+
+Views describe the state their response depends on with cheap version
+signals (a change counter, the newest updated_at, ...). The ETag is a hash
+of those signals together with the user, the URL and the response format,
+so a client repeating a request with If-None-Match (or If-Modified-Since)
+gets a 304 before the view runs its queries or serializes anything.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to an APIView.
+
+    Handlers call `not_modified(request)` first and return its response
+    when there is one; the validators are then set on the full response
+    as well.
+    """
+    _etag = None
+    _last_modified = None
+
+    def get_version(self, request):
+        """
+        Return (signals, last_modified): any repr-able description of the
+        state the response depends on, and the time of its last change or
+        None if the signals are not all time based
+        """
+        raise NotImplementedError
+
+    def not_modified(self, request):
+        """A 304 response if the client's copy is current, otherwise None"""
+        signals, last_modified = self.get_version(request)
+        key = repr((request.user.pk, request.get_full_path(), request.accepted_renderer.format, signals))
+        self._etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+        self._last_modified = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(request, etag=self._etag, last_modified=self._last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._etag is not None and response.status_code in (200, 304):
+            response['ETag'] = self._etag
+            if self._last_modified is not None:
+                response['Last-Modified'] = http_date(self._last_modified)
+            # Per-user data: shared caches must not keep it and browsers
+            # must revalidate instead of guessing a freshness lifetime
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
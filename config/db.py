@@ -0,0 +1,34 @@
+"""
+Database helpers shared by the apps.
+"""
+from django.db import connections, router
+
+# Primary keys per DELETE statement
+DELETE_CHUNK_SIZE = 1000
+
+
+def delete_rows(model, pks, chunk_size=DELETE_CHUNK_SIZE):
+    """
+    Delete rows of model by primary key with plain
+    `DELETE FROM <table> WHERE <pk> IN (...)` statements.
+
+    Unlike QuerySet.delete(), no instances are loaded and no signals or
+    cascades run: callers are moving the rows elsewhere (archive tables,
+    compacted tracks) and must have dealt with rows referencing them.
+    Returns the number of rows deleted.
+    """
+    pks = list(pks)
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    pk_field = model._meta.pk
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), chunk_size):
+            chunk = [pk_field.get_db_prep_value(pk, connection) for pk in pks[start:start + chunk_size]]
+            cursor.execute(
+                f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(pk_field.column)} "
+                f"IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+            deleted += cursor.rowcount
+    return deleted
@@ -0,0 +1,24 @@
+"""
+Cross-process cache generations.
+
+A process-local cache (the tag registry, per-user notification versions,
+...) is keyed by a name whose generation is stored in the database as a
+CacheGeneration row. Writers bump the generation; readers compare it
+with the one their copy was built from and reload when it changed.
+"""
+from django.db.models import F
+
+
+def current_generation(key):
+    """Return the stored generation of a cache key (0 if never bumped)"""
+    from emergency.models import CacheGeneration
+
+    return CacheGeneration.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+
+def bump_generation(key):
+    """Invalidate a cache key in every process"""
+    from emergency.models import CacheGeneration
+
+    if not CacheGeneration.objects.filter(key=key).update(version=F('version') + 1):
+        CacheGeneration.objects.get_or_create(key=key, defaults={'version': 1})
@@ -0,0 +1,39 @@
+"""
+Parsing of query parameters shared by the API views. The parsers raise
+ValueError on bad input, which views answer with a 400.
+"""
+import math
+
+
+def parse_limit_param(value, default, maximum):
+    """A positive integer limit capped at maximum, or default if absent"""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError(f'Invalid limit: {value}')
+    return min(limit, maximum)
+
+
+def parse_float_param(params, name, default=None):
+    """A finite number from the query string, or default if absent"""
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f'Invalid {name}: {value}')
+    return number
+
+
+def parse_point_params(params, default_radius=5.0):
+    """
+    lat, lng and radius (km) of a proximity filter. lat and lng are None
+    unless both are given.
+    """
+    lat = parse_float_param(params, 'lat')
+    lng = parse_float_param(params, 'lng')
+    radius = parse_float_param(params, 'radius', default_radius)
+    if lat is None or lng is None:
+        return None, None, radius
+    return lat, lng, radius
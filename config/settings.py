@@ -192,14 +192,19 @@ SOCIAL_MEDIA = {
     }
 }
 
+# Social media outbox (drained by `manage.py drain_social_outbox`)
+SOCIAL_OUTBOX_MAX_ATTEMPTS = 5
+SOCIAL_OUTBOX_LEASE_SECONDS = 300  # Claimed entries are retried after this if the worker dies
+
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB, larger uploads are streamed to TEMP_MEDIA_ROOT
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
 # Temporary directory for file handling
 TEMP_MEDIA_ROOT = os.path.join(MEDIA_ROOT, 'tmp')
 os.makedirs(TEMP_MEDIA_ROOT, exist_ok=True)
+FILE_UPLOAD_TEMP_DIR = TEMP_MEDIA_ROOT
 
 AUTH_USER_MODEL = 'users.User'  # Custom user model
 
@@ -218,6 +223,16 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_TRAILING_SLASH': True,  # Add this to ensure DRF uses trailing slashes
+    # orjson-backed JSON (see config/renderers.py), falls back to the stock encoder without orjson
+    'DEFAULT_RENDERER_CLASSES': [
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'config.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 from datetime import timedelta
@@ -235,4 +250,56 @@ SIMPLE_JWT = {
 
 # URL Settings
 APPEND_SLASH = True
-USE_TRAILING_SLASHES = True
\ No newline at end of file
+USE_TRAILING_SLASHES = True
+
+# In-memory index of active emergencies (see emergency.live_index).
+# Each process reloads it from the database at this interval to pick up
+# changes written by other processes.
+LIVE_INDEX_ENABLED = True
+LIVE_INDEX_REFRESH_SECONDS = 30
+
+# In-memory cache of emergency tags (see emergency.tag_registry). Each
+# process checks the stored generation at most this often.
+TAG_REGISTRY_CHECK_SECONDS = 5
+
+# Reports within this distance and time of an incident's last report, with
+# overlapping tags, are clustered into it (see emergency.services)
+INCIDENT_CLUSTER_RADIUS_KM = 0.5
+INCIDENT_CLUSTER_WINDOW_MINUTES = 30
+
+# Server-sent event stream of report activity (see emergency.stream)
+STREAM_POLL_SECONDS = 1  # How often each process checks for new status events
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_QUEUE_SIZE = 100  # Events buffered per client before it is disconnected
+
+# Changes newer than this are held back from the changes-since endpoint and
+# the incident stream so transactions still in flight cannot commit behind
+# a client's cursor
+CHANGES_SETTLE_SECONDS = 2
+
+# Resolved reports unchanged for this long are moved to the archive tables
+# by `manage.py archive_reports` (see emergency.archive)
+REPORT_ARCHIVE_AFTER_DAYS = 180
+REPORT_ARCHIVE_CHUNK_SIZE = 500
+
+# Most points accepted by one batched location upload
+LOCATION_BATCH_MAX_POINTS = 500
+
+# Write-behind buffer for routine location pings (see location.buffer).
+# Buffered pings are written once this many are waiting or the oldest has
+# waited this long, which bounds what a crash can lose. Emergency pings
+# are always written immediately.
+LOCATION_BUFFER_ENABLED = True
+LOCATION_BUFFER_MAX_POINTS = 1000
+LOCATION_BUFFER_MAX_SECONDS = 2
+
+# Movement filter for location pings (see location.movement). A routine
+# ping this close in distance and time to the user's last accepted point
+# is dropped; emergency pings are always kept.
+LOCATION_FILTER_ENABLED = True
+LOCATION_FILTER_DISTANCE_M = 10
+LOCATION_FILTER_SECONDS = 60
+
+# Routine location points older than this many days are packed into daily
+# tracks by `manage.py compact_locations` (see location.trajectory)
+LOCATION_COMPACT_AFTER_DAYS = 30
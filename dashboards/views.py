@@ -4,17 +4,40 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Count, Q, F
+from django.db.models import Count, Max, Q, F
+import time
 
-from emergency.models import EmergencyReport
+from emergency.changes import last_change
+from emergency.models import ArchivedEmergencyReport, EmergencyReport, EmergencyReportTombstone
+from emergency.live_index import live_index
 from notifications.models import Notification
+from notifications.versions import notifications_version
 from users.permissions import IsEmergencyService, IsCitizen
 from users.models import User
+from config.conditional import ConditionalGetMixin
 
-class DashboardBaseView(APIView):
+# User fields that shape the common dashboard data
+PROFILE_FIELDS = ['first_name', 'last_name', 'email', 'phone_number', 'role']
+
+class DashboardBaseView(ConditionalGetMixin, APIView):
     """Base view for dashboards with common data"""
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_version(self, request):
+        """
+        Version signals of the common data. Subclasses add their own.
+        
+        Counts served from the live index can lag the database by up to
+        its refresh interval, so validators also expire once per interval.
+        """
+        user = request.user
+        return [
+            notifications_version(user.id),
+            user.username,
+            [getattr(user, field) for field in PROFILE_FIELDS],
+            int(time.time() // live_index.refresh_seconds),
+        ], None
+    
     def get_common_data(self, request):
         """Get data common to all dashboard types"""
         user = request.user
@@ -22,7 +45,7 @@ class DashboardBaseView(APIView):
         # Recent notifications
         recent_notifications = Notification.objects.filter(
             recipient=user
-        ).order_by('-timestamp')[:5]
+        ).order_by('-timestamp').values('id', 'title', 'message', 'timestamp', 'is_read')[:5]
         
         # Unread notification count
         unread_count = Notification.objects.filter(
@@ -31,22 +54,13 @@ class DashboardBaseView(APIView):
         ).count()
         
         # User profile completeness - simple implementation
-        profile_fields = ['first_name', 'last_name', 'email', 'phone_number', 'role']
-        completed_fields = sum(1 for field in profile_fields if getattr(user, field))
-        profile_completeness = round((completed_fields / len(profile_fields)) * 100)
+        completed_fields = sum(1 for field in PROFILE_FIELDS if getattr(user, field))
+        profile_completeness = round((completed_fields / len(PROFILE_FIELDS)) * 100)
         
         return {
             'username': user.username,
             'role': user.role,
-            'recent_notifications': [
-                {
-                    'id': n.id,
-                    'title': n.title,
-                    'message': n.message,
-                    'timestamp': n.timestamp,
-                    'is_read': n.is_read
-                } for n in recent_notifications
-            ],
+            'recent_notifications': list(recent_notifications),
             'unread_notifications': unread_count,
             'profile_completeness': profile_completeness
         }
@@ -55,7 +69,19 @@ class CitizenDashboardView(DashboardBaseView):
     """Dashboard view for regular citizens"""
     permission_classes = [permissions.IsAuthenticated, IsCitizen]
     
+    def get_version(self, request):
+        signals, _ = super().get_version(request)
+        signals.append(last_change(
+            EmergencyReport.objects.filter(reporter=request.user),
+            EmergencyReportTombstone.objects.filter(reporter_id=request.user.id)
+        ))
+        return signals, None
+    
     def get(self, request):
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
         # Get common dashboard data
         data = self.get_common_data(request)
         
@@ -65,31 +91,23 @@ class CitizenDashboardView(DashboardBaseView):
         # Recent emergency reports by this user
         recent_reports = EmergencyReport.objects.filter(
             reporter=user
-        ).order_by('-timestamp')[:5]
+        ).order_by('-timestamp').values('id', 'description', 'status', 'timestamp', 'reporter_type')[:5]
+        
+        archived_reports = ArchivedEmergencyReport.objects.filter(reporter=user).count()
         
         # Ongoing emergencies reported by this user
-        ongoing_emergencies = EmergencyReport.objects.filter(
-            reporter=user,
-            status__in=['PENDING', 'RESPONDING', 'ON_SCENE']
-        ).count()
+        ongoing_emergencies = len(live_index.entries(reporter_id=user.id))
         
         # Add citizen-specific data
         data.update({
-            'recent_reports': [
-                {
-                    'id': r.id,
-                    'description': r.description,
-                    'status': r.status,
-                    'timestamp': r.timestamp,
-                    'reporter_type': r.reporter_type
-                } for r in recent_reports
-            ],
+            'recent_reports': list(recent_reports),
             'ongoing_emergencies': ongoing_emergencies,
-            'total_reports': EmergencyReport.objects.filter(reporter=user).count(),
+            # Lifetime totals include archived reports (all RESOLVED)
+            'total_reports': EmergencyReport.objects.filter(reporter=user).count() + archived_reports,
             'resolved_reports': EmergencyReport.objects.filter(
                 reporter=user, 
                 status='RESOLVED'
-            ).count()
+            ).count() + archived_reports
         })
         
         return Response(data)
@@ -98,7 +116,16 @@ class EmergencyServiceDashboardView(DashboardBaseView):
     """Dashboard view for emergency services (fire, police, red crescent)"""
     permission_classes = [permissions.IsAuthenticated, IsEmergencyService]
     
+    def get_version(self, request):
+        signals, _ = super().get_version(request)
+        signals.append(last_change(EmergencyReport.objects.all(), EmergencyReportTombstone.objects.all()))
+        return signals, None
+    
     def get(self, request):
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
         # Get common dashboard data
         data = self.get_common_data(request)
         
@@ -116,37 +143,28 @@ class EmergencyServiceDashboardView(DashboardBaseView):
         
         emergency_type = role_to_emergency_type.get(user_role)
         
-        # Recent pending emergencies
-        pending_filter = Q(status='PENDING')
-        if emergency_type:
-            pending_filter &= Q(tags__emergency_type=emergency_type)
-            
-        pending_emergencies = EmergencyReport.objects.filter(
-            pending_filter
-        ).order_by('-timestamp')[:10]
-        
-        # Active emergencies by status
-        active = EmergencyReport.objects.filter(
-            status__in=['PENDING', 'RESPONDING', 'ON_SCENE']
-        )
-        
-        if emergency_type:
-            active = active.filter(tags__emergency_type=emergency_type)
+        # Recent pending emergencies and active counts, served from the
+        # in-memory index of active incidents
+        pending_emergencies = sorted(
+            live_index.entries(status='PENDING', emergency_type=emergency_type),
+            key=lambda e: e['timestamp'],
+            reverse=True
+        )[:10]
         
         # Counters by status
-        status_counts = dict(active.values_list('status').annotate(count=Count('status')))
+        status_counts = live_index.status_counts(emergency_type=emergency_type)
         
         # Add emergency service specific data
         data.update({
             'pending_emergencies': [
                 {
-                    'id': e.id,
-                    'description': e.description,
-                    'status': e.status,
-                    'timestamp': e.timestamp,
-                    'latitude': e.latitude,
-                    'longitude': e.longitude,
-                    'is_emergency': e.is_emergency
+                    'id': e['id'],
+                    'description': e['description'],
+                    'status': e['status'],
+                    'timestamp': e['timestamp'],
+                    'latitude': e['latitude'],
+                    'longitude': e['longitude'],
+                    'is_emergency': e['is_emergency']
                 } for e in pending_emergencies
             ],
             'current_status': {
@@ -173,7 +191,17 @@ class AdminDashboardView(DashboardBaseView):
     """Dashboard view for admin users"""
     permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
     
+    def get_version(self, request):
+        signals, _ = super().get_version(request)
+        signals.append(last_change(EmergencyReport.objects.all(), EmergencyReportTombstone.objects.all()))
+        signals.append(User.objects.aggregate(count=Count('id'), latest=Max('date_joined')))
+        return signals, None
+    
     def get(self, request):
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
         # Get common dashboard data
         data = self.get_common_data(request)
         
@@ -181,9 +209,11 @@ class AdminDashboardView(DashboardBaseView):
         
         # System status
         total_users = User.objects.count()
-        total_emergencies = EmergencyReport.objects.count()
-        pending_emergencies = EmergencyReport.objects.filter(status='PENDING').count()
-        resolved_emergencies = EmergencyReport.objects.filter(status='RESOLVED').count()
+        # Archived reports are all RESOLVED
+        archived_emergencies = ArchivedEmergencyReport.objects.count()
+        total_emergencies = EmergencyReport.objects.count() + archived_emergencies
+        pending_emergencies = len(live_index.entries(status='PENDING'))
+        resolved_emergencies = EmergencyReport.objects.filter(status='RESOLVED').count() + archived_emergencies
         
         # Today's statistics
         today = timezone.now().date()
@@ -191,7 +221,9 @@ class AdminDashboardView(DashboardBaseView):
         emergencies_today = EmergencyReport.objects.filter(timestamp__date=today).count()
         
         # Recent emergency reports
-        recent_reports = EmergencyReport.objects.all().order_by('-timestamp')[:10]
+        recent_reports = EmergencyReport.objects.order_by('-timestamp').values_list(
+            'id', 'description', 'status', 'timestamp', 'reporter__username', 'reporter_type'
+        )[:10]
         
         # Add admin-specific data
         data.update({
@@ -208,13 +240,13 @@ class AdminDashboardView(DashboardBaseView):
             },
             'recent_reports': [
                 {
-                    'id': r.id,
-                    'description': r.description,
-                    'status': r.status,
-                    'timestamp': r.timestamp,
-                    'reporter': r.reporter.username,
-                    'reporter_type': r.reporter_type
-                } for r in recent_reports
+                    'id': report_id,
+                    'description': description,
+                    'status': report_status,
+                    'timestamp': timestamp,
+                    'reporter': reporter,
+                    'reporter_type': reporter_type
+                } for report_id, description, report_status, timestamp, reporter, reporter_type in recent_reports
             ]
         })
         
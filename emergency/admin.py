@@ -1,6 +1,36 @@
 from django.contrib import admin
-from .models import EmergencyReport, EmergencyTag
+from .models import (
+    ArchivedEmergencyReport, ArchivedEmergencyResponseTiming, ArchivedEmergencyStatusEvent, EmergencyReport,
+    EmergencyReportTombstone, EmergencyResponseTiming, EmergencyStatusEvent, EmergencyTag
+)
 
 # Register your models here.
 admin.site.register(EmergencyReport)
 admin.site.register(EmergencyTag)
+
+@admin.register(EmergencyStatusEvent)
+class EmergencyStatusEventAdmin(admin.ModelAdmin):
+    list_display = ('report', 'from_status', 'to_status', 'actor', 'timestamp')
+    list_filter = ('to_status',)
+    readonly_fields = ('report', 'from_status', 'to_status', 'actor', 'timestamp')
+
+@admin.register(EmergencyResponseTiming)
+class EmergencyResponseTimingAdmin(admin.ModelAdmin):
+    list_display = ('report', 'reported_at', 'minutes_to_responding', 'minutes_to_on_scene', 'minutes_to_resolved')
+
+@admin.register(EmergencyReportTombstone)
+class EmergencyReportTombstoneAdmin(admin.ModelAdmin):
+    list_display = ('report_id', 'reporter_id', 'deleted_at')
+
+@admin.register(ArchivedEmergencyReport)
+class ArchivedEmergencyReportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'reporter', 'status', 'timestamp', 'archived_at')
+
+@admin.register(ArchivedEmergencyStatusEvent)
+class ArchivedEmergencyStatusEventAdmin(admin.ModelAdmin):
+    list_display = ('report', 'from_status', 'to_status', 'actor', 'timestamp')
+    list_filter = ('to_status',)
+
+@admin.register(ArchivedEmergencyResponseTiming)
+class ArchivedEmergencyResponseTimingAdmin(admin.ModelAdmin):
+    list_display = ('report', 'reported_at', 'minutes_to_responding', 'minutes_to_on_scene', 'minutes_to_resolved')
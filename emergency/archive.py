@@ -0,0 +1,149 @@
+"""
+Hot/cold split of emergency reports.
+
+RESOLVED reports that have not changed for REPORT_ARCHIVE_AFTER_DAYS are
+moved, in chunks, from EmergencyReport to ArchivedEmergencyReport along
+with their tag links, status events and response timings (to the
+matching archive tables); notifications are repointed at the archived
+row. Live queries and indexes then only cover recent reports.
+
+Archiving is not a deletion: it leaves no tombstone and tag counters keep
+counting archived reports as RESOLVED. Read APIs only look at the archive
+when asked for a time range that reaches back to archived reports (see
+reports_in_range).
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.db import delete_rows
+from notifications.models import Notification
+from notifications.versions import bump_notifications
+from social.models import SocialOutbox
+from .models import (
+    ArchivedEmergencyReport, ArchivedEmergencyResponseTiming, ArchivedEmergencyStatusEvent, EmergencyReport,
+    EmergencyResponseTiming, EmergencyStatusEvent
+)
+
+# Columns copied from EmergencyReport to ArchivedEmergencyReport
+ARCHIVE_FIELDS = [
+    'id', 'reporter_id', 'reporter_type', 'description', 'latitude', 'longitude', 'is_emergency',
+    'grid_cell', 'status', 'timestamp', 'updated_at', 'incident_id',
+]
+
+# Columns copied from EmergencyStatusEvent to ArchivedEmergencyStatusEvent
+ARCHIVE_EVENT_FIELDS = ['id', 'report_id', 'from_status', 'to_status', 'actor_id', 'timestamp']
+
+# Columns copied from EmergencyResponseTiming to ArchivedEmergencyResponseTiming
+ARCHIVE_TIMING_FIELDS = [
+    'report_id', 'reported_at', 'responding_at', 'on_scene_at', 'resolved_at',
+    'minutes_to_responding', 'minutes_to_on_scene', 'minutes_to_resolved',
+]
+
+
+def archive_cutoff(days=None):
+    """Reports resolved and unchanged since before this time are archived"""
+    if days is None:
+        days = getattr(settings, 'REPORT_ARCHIVE_AFTER_DAYS', 180)
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_chunk(cutoff, chunk_size):
+    """
+    Move one chunk of archivable reports in its own transaction.
+    Returns the number of reports moved.
+    """
+    with transaction.atomic():
+        report_ids = list(
+            EmergencyReport.objects.select_for_update(skip_locked=True)
+            .filter(status='RESOLVED', updated_at__lt=cutoff)
+            .order_by('updated_at', 'id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not report_ids:
+            return 0
+
+        rows = EmergencyReport.objects.filter(pk__in=report_ids).values(*ARCHIVE_FIELDS)
+        ArchivedEmergencyReport.objects.bulk_create([ArchivedEmergencyReport(**row) for row in rows])
+
+        TagLink = EmergencyReport.tags.through
+        ArchivedTagLink = ArchivedEmergencyReport.tags.through
+        ArchivedTagLink.objects.bulk_create([
+            ArchivedTagLink(archivedemergencyreport_id=report_id, emergencytag_id=tag_id)
+            for report_id, tag_id in TagLink.objects.filter(
+                emergencyreport_id__in=report_ids
+            ).values_list('emergencyreport_id', 'emergencytag_id')
+        ])
+
+        events = EmergencyStatusEvent.objects.filter(report_id__in=report_ids)
+        ArchivedEmergencyStatusEvent.objects.bulk_create([
+            ArchivedEmergencyStatusEvent(**row) for row in events.values(*ARCHIVE_EVENT_FIELDS)
+        ])
+        timings = EmergencyResponseTiming.objects.filter(report_id__in=report_ids)
+        ArchivedEmergencyResponseTiming.objects.bulk_create([
+            ArchivedEmergencyResponseTiming(**row) for row in timings.values(*ARCHIVE_TIMING_FIELDS)
+        ])
+
+        notifications = Notification.objects.filter(emergency_report_id__in=report_ids)
+        recipient_ids = set(notifications.values_list('recipient_id', flat=True))
+        notifications.update(
+            archived_report_id=F('emergency_report_id'),
+            emergency_report=None
+        )
+        # Bulk updates send no signals: invalidate the recipients' lists
+        bump_notifications(recipient_ids)
+        SocialOutbox.objects.filter(emergency_report_id__in=report_ids).update(emergency_report=None)
+
+        events.delete()
+        timings.delete()
+        TagLink.objects.filter(emergencyreport_id__in=report_ids).delete()
+        # Nothing references the reports any more. Delete them with plain
+        # SQL: the delete signals would leave tombstones and uncount the
+        # tags, but the reports still exist
+        delete_rows(EmergencyReport, report_ids)
+    return len(report_ids)
+
+
+def archive_resolved_reports(days=None, chunk_size=None):
+    """
+    Archive every resolved report older than the cutoff, one chunk per
+    transaction so locks stay short. Returns the number of reports moved.
+    """
+    cutoff = archive_cutoff(days)
+    chunk_size = chunk_size or getattr(settings, 'REPORT_ARCHIVE_CHUNK_SIZE', 500)
+    total = 0
+    while True:
+        moved = archive_chunk(cutoff, chunk_size)
+        total += moved
+        if moved < chunk_size:
+            return total
+
+
+def reports_in_range(reports, archived_reports, start, end, fields):
+    """
+    Report rows with start <= timestamp < end (end may be None), newest
+    first. The archive is only queried, through a UNION with the live
+    table, when the range starts before its newest report.
+
+    Returns:
+        tuple: (queryset of value rows, whether the archive was included)
+    """
+    reports = reports.filter(timestamp__gte=start)
+    if end is not None:
+        reports = reports.filter(timestamp__lt=end)
+    newest_archived = ArchivedEmergencyReport.objects.order_by('-timestamp').values_list(
+        'timestamp', flat=True
+    ).first()
+    if newest_archived is None or start > newest_archived:
+        return reports.order_by('-timestamp', '-id').values(*fields), False
+
+    archived_reports = archived_reports.filter(timestamp__gte=start)
+    if end is not None:
+        archived_reports = archived_reports.filter(timestamp__lt=end)
+    rows = reports.order_by().values(*fields).union(
+        archived_reports.order_by().values(*fields), all=True
+    )
+    return rows.order_by('-timestamp', '-id'), True
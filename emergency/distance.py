@@ -0,0 +1,55 @@
+"""
+Batched great-circle distance kernel for proximity queries.
+
+Coordinates are passed as NumPy columns so a whole candidate set is
+measured, filtered by radius and ranked in one vectorized pass instead of
+a Python loop per row. Distances are returned unrounded; rounding, if
+any, is left to presentation code.
+"""
+import numpy as np
+
+from .spatial import EARTH_RADIUS_KM
+
+
+def coordinate_arrays(rows):
+    """
+    Split (key, latitude, longitude) rows into a key list and two float64
+    arrays. Missing coordinates become NaN and never match a radius query.
+    """
+    rows = list(rows)
+    keys = [row[0] for row in rows]
+    lats = np.array([np.nan if row[1] is None else float(row[1]) for row in rows], dtype=np.float64)
+    lngs = np.array([np.nan if row[2] is None else float(row[2]) for row in rows], dtype=np.float64)
+    return keys, lats, lngs
+
+
+def haversine_many(lat, lng, lats, lngs):
+    """
+    Distance in kilometers from one point to every point in lats/lngs
+    """
+    lat1 = np.radians(lat)
+    lats2 = np.radians(np.asarray(lats, dtype=np.float64))
+    d_lat = lats2 - lat1
+    d_lng = np.radians(np.asarray(lngs, dtype=np.float64) - lng)
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat1) * np.cos(lats2) * np.sin(d_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_within(lat, lng, lats, lngs, radius_km, limit=None):
+    """
+    Find the points within radius_km of (lat, lng), closest first.
+
+    Returns a tuple of (indices, distances) into the input columns. When
+    limit is given only the closest `limit` points are returned, selected
+    with a partial sort so the full candidate set is never ordered.
+    """
+    distances = haversine_many(lat, lng, lats, lngs)
+    indices = np.flatnonzero(distances <= radius_km)
+    if limit is not None and limit < indices.size:
+        if limit <= 0:
+            indices = indices[:0]
+        else:
+            indices = indices[np.argpartition(distances[indices], limit - 1)[:limit]]
+    order = np.argsort(distances[indices], kind='stable')
+    indices = indices[order]
+    return indices, distances[indices]
@@ -0,0 +1,268 @@
+"""
+Process-local index of active emergency reports.
+
+Keeps every PENDING/RESPONDING/ON_SCENE report in memory, keyed by id and
+by spatial grid cell, so "what is happening now" reads (nearby searches,
+responder dashboards, pending lists) never have to go back to the
+database. The index is loaded when the server starts (see config.wsgi
+and config.asgi), or on first use if that failed, kept current by the
+signal handlers in emergency.signals and fully reloaded every
+LIVE_INDEX_REFRESH_SECONDS to pick up writes made by other processes.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+
+from .distance import nearest_within
+from .spatial import cells_within_radius
+
+logger = logging.getLogger(__name__)
+
+ENTRY_FIELDS = [
+    'id', 'reporter_id', 'reporter_type', 'description', 'latitude', 'longitude',
+    'is_emergency', 'status', 'timestamp', 'grid_cell',
+]
+
+
+class LiveIncidentIndex:
+    def __init__(self, refresh_seconds=None):
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._entries = {}
+        self._cells = defaultdict(set)
+        self._loaded_at = None
+        self._refresh_seconds = refresh_seconds
+
+    @property
+    def refresh_seconds(self):
+        if self._refresh_seconds is not None:
+            return self._refresh_seconds
+        return getattr(settings, 'LIVE_INDEX_REFRESH_SECONDS', 30)
+
+    # Loading
+
+    def warm(self):
+        """Reload every active report from the database"""
+        from .models import EmergencyReport
+
+        rows = list(
+            EmergencyReport.objects.filter(status__in=EmergencyReport.ACTIVE_STATUSES).values(*ENTRY_FIELDS)
+        )
+        tags = self._load_tags([row['id'] for row in rows])
+
+        entries = {}
+        cells = defaultdict(set)
+        for row in rows:
+            entry = self._make_entry(row, tags.get(row['id'], {}))
+            entries[entry['id']] = entry
+            if entry['grid_cell']:
+                cells[entry['grid_cell']].add(entry['id'])
+
+        with self._lock:
+            self._entries = entries
+            self._cells = cells
+            self._loaded_at = time.monotonic()
+
+    def is_fresh(self):
+        loaded_at = self._loaded_at
+        return loaded_at is not None and time.monotonic() - loaded_at < self.refresh_seconds
+
+    def ensure_loaded(self):
+        if self.is_fresh():
+            return
+        if self._loaded_at is None:
+            self._load_lock.acquire()
+        elif not self._load_lock.acquire(blocking=False):
+            # Another thread is already reloading; keep serving current data
+            return
+        try:
+            if not self.is_fresh():
+                self.warm()
+        finally:
+            self._load_lock.release()
+
+    def warm_on_startup(self):
+        """
+        Load the index before the first request is served, so no request
+        pays for the full scan. Runs synchronously: a loader thread would
+        not survive a pre-fork server forking its workers.
+        """
+        if not getattr(settings, 'LIVE_INDEX_ENABLED', True):
+            return
+        try:
+            self.ensure_loaded()
+        except Exception:
+            logger.exception("Could not warm the live index; it will load on first use")
+        finally:
+            # Forked workers must not share the loading connection
+            connections.close_all()
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._cells = defaultdict(set)
+            self._loaded_at = None
+
+    def _load_tags(self, report_ids):
+        from .models import EmergencyReport
+
+        tags = defaultdict(dict)
+        if not report_ids:
+            return tags
+        links = EmergencyReport.tags.through.objects.filter(
+            emergencyreport_id__in=report_ids
+        ).values_list('emergencyreport_id', 'emergencytag_id', 'emergencytag__emergency_type')
+        for report_id, tag_id, emergency_type in links:
+            tags[report_id][tag_id] = emergency_type
+        return tags
+
+    def _make_entry(self, row, tags):
+        entry = {field: row[field] for field in ENTRY_FIELDS}
+        entry['tag_ids'] = frozenset(tags)
+        entry['emergency_types'] = frozenset(tags.values())
+        return entry
+
+    # Updates
+
+    def refresh(self, report_ids):
+        """Re-read the given reports from the database and update the index"""
+        from .models import EmergencyReport
+
+        report_ids = list(report_ids)
+        if not report_ids or self._loaded_at is None:
+            return
+        rows = {
+            row['id']: row
+            for row in EmergencyReport.objects.filter(
+                pk__in=report_ids, status__in=EmergencyReport.ACTIVE_STATUSES
+            ).values(*ENTRY_FIELDS)
+        }
+        tags = self._load_tags(list(rows))
+        with self._lock:
+            for report_id in report_ids:
+                self._discard(report_id)
+                if report_id in rows:
+                    self._add(self._make_entry(rows[report_id], tags.get(report_id, {})))
+
+    def upsert(self, report):
+        """Update the index from a saved report instance, keeping known tags"""
+        from .models import EmergencyReport
+
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            existing = self._discard(report.pk)
+            if report.status not in EmergencyReport.ACTIVE_STATUSES:
+                return
+            row = {field: getattr(report, field) for field in ENTRY_FIELDS}
+            row['id'] = report.pk
+            entry = self._make_entry(row, {})
+            if existing is not None:
+                entry['tag_ids'] = existing['tag_ids']
+                entry['emergency_types'] = existing['emergency_types']
+            self._add(entry)
+
+    def remove(self, report_id):
+        with self._lock:
+            self._discard(report_id)
+
+    def _add(self, entry):
+        self._entries[entry['id']] = entry
+        if entry['grid_cell']:
+            self._cells[entry['grid_cell']].add(entry['id'])
+
+    def _discard(self, report_id):
+        entry = self._entries.pop(report_id, None)
+        if entry is not None and entry['grid_cell']:
+            bucket = self._cells.get(entry['grid_cell'])
+            if bucket is not None:
+                bucket.discard(report_id)
+                if not bucket:
+                    del self._cells[entry['grid_cell']]
+        return entry
+
+    # Queries
+
+    def get(self, report_id):
+        self.ensure_loaded()
+        return self._entries.get(report_id)
+
+    def entries(self, status=None, emergency_type=None, reporter_id=None, is_emergency=None):
+        """Return active entries matching every given filter"""
+        self.ensure_loaded()
+        with self._lock:
+            entries = list(self._entries.values())
+        return [
+            entry for entry in entries
+            if _matches(entry, status, emergency_type, reporter_id, is_emergency)
+        ]
+
+    def within_radius(self, lat, lng, radius_km, limit=None, **filters):
+        """
+        Return (entry, distance_km) pairs within radius_km, closest first.
+        Accepts the same filters as entries().
+        """
+        self.ensure_loaded()
+        cells = cells_within_radius(lat, lng, radius_km)
+        with self._lock:
+            if cells is None:
+                candidates = list(self._entries.values())
+            else:
+                candidates = [
+                    self._entries[report_id]
+                    for cell in cells
+                    for report_id in self._cells.get(cell, ())
+                ]
+        candidates = [
+            entry for entry in candidates
+            if entry['grid_cell'] and _matches(entry, **filters)
+        ]
+        if not candidates:
+            return []
+
+        lats = np.array([entry['latitude'] for entry in candidates], dtype=np.float64)
+        lngs = np.array([entry['longitude'] for entry in candidates], dtype=np.float64)
+        indices, distances = nearest_within(lat, lng, lats, lngs, radius_km, limit=limit)
+        return [(candidates[i], float(distance)) for i, distance in zip(indices, distances)]
+
+    def in_bbox(self, min_lat, min_lng, max_lat, max_lng, **filters):
+        """Return active entries inside a latitude/longitude bounding box"""
+        self.ensure_loaded()
+        with self._lock:
+            entries = list(self._entries.values())
+        if min_lng <= max_lng:
+            in_lng = lambda lng: min_lng <= lng <= max_lng
+        else:
+            # Box crossing the antimeridian
+            in_lng = lambda lng: lng >= min_lng or lng <= max_lng
+        return [
+            entry for entry in entries
+            if entry['grid_cell']
+            and min_lat <= entry['latitude'] <= max_lat
+            and in_lng(entry['longitude'])
+            and _matches(entry, **filters)
+        ]
+
+    def status_counts(self, **filters):
+        """Count active entries per status"""
+        return dict(Counter(entry['status'] for entry in self.entries(**filters)))
+
+
+def _matches(entry, status=None, emergency_type=None, reporter_id=None, is_emergency=None):
+    if status is not None and entry['status'] != status:
+        return False
+    if emergency_type is not None and emergency_type not in entry['emergency_types']:
+        return False
+    if reporter_id is not None and entry['reporter_id'] != reporter_id:
+        return False
+    if is_emergency is not None and entry['is_emergency'] != is_emergency:
+        return False
+    return True
+
+
+live_index = LiveIncidentIndex()
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from emergency.archive import archive_resolved_reports
+
+
+class Command(BaseCommand):
+    help = 'Move resolved reports older than REPORT_ARCHIVE_AFTER_DAYS into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive reports unchanged for this many days')
+        parser.add_argument('--chunk-size', type=int, help='Reports moved per transaction')
+
+    def handle(self, *args, **options):
+        count = archive_resolved_reports(options['days'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {count} reports"))
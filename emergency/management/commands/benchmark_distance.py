@@ -0,0 +1,70 @@
+import math
+import random
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from emergency.distance import nearest_within
+from emergency.spatial import haversine_km
+
+
+class Command(BaseCommand):
+    help = 'Compare the vectorized distance kernel against the per-row haversine loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--radius', type=float, default=5.0, help='Search radius in kilometers')
+        parser.add_argument('--limit', type=int, default=None, help='Only keep the closest N points')
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        radius = options['radius']
+        limit = options['limit']
+        # Points spread over roughly 100 km around a city centre
+        center_lat, center_lng = 38.4192, 27.1287
+
+        self.stdout.write(
+            f"{'points':>10} {'loop (s)':>10} {'numpy (s)':>10} {'speedup':>8} {'loop hits':>10} {'numpy hits':>10}"
+        )
+        for size in options['sizes']:
+            lats = [center_lat + rng.uniform(-0.5, 0.5) for _ in range(size)]
+            lngs = [center_lng + rng.uniform(-0.5, 0.5) for _ in range(size)]
+            lat_array = np.array(lats)
+            lng_array = np.array(lngs)
+
+            loop_time, loop_result = self.best_of(
+                options['repeat'], self.loop, center_lat, center_lng, lats, lngs, radius, limit
+            )
+            numpy_time, numpy_result = self.best_of(
+                options['repeat'], nearest_within, center_lat, center_lng, lat_array, lng_array, radius, limit
+            )
+
+            # Hit counts can differ by a few points at the edge of the radius
+            # because the loop compares rounded distances
+            speedup = loop_time / numpy_time if numpy_time else math.inf
+            self.stdout.write(
+                f"{size:>10} {loop_time:>10.4f} {numpy_time:>10.4f} {speedup:>7.1f}x "
+                f"{len(loop_result):>10} {len(numpy_result[0]):>10}"
+            )
+
+    def best_of(self, repeat, func, *args):
+        best = math.inf
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(*args)
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    def loop(self, lat, lng, lats, lngs, radius, limit):
+        """The previous NearbyEmergenciesView approach: one haversine per row, then sort"""
+        matches = []
+        for index, (point_lat, point_lng) in enumerate(zip(lats, lngs)):
+            distance = round(haversine_km(lat, lng, point_lat, point_lng), 2)
+            if distance <= radius:
+                matches.append((distance, index))
+        matches.sort()
+        return matches[:limit] if limit is not None else matches
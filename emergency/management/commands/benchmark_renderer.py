@@ -0,0 +1,75 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from config.renderers import ORJSONRenderer, orjson
+from emergency.models import EmergencyReport
+
+
+class Command(BaseCommand):
+    help = 'Compare the orjson renderer against the stock DRF JSON renderer on a report list payload'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reports', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stderr.write('orjson is not installed; ORJSONRenderer falls back to the stock renderer')
+
+        payload = self.build_payload(options['reports'], random.Random(options['seed']))
+        renderers = [('stock', JSONRenderer()), ('orjson', ORJSONRenderer())]
+
+        outputs = {}
+        timings = {}
+        for name, renderer in renderers:
+            best = None
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                outputs[name] = renderer.render(payload)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        stock, fast = timings['stock'], timings['orjson']
+        self.stdout.write(f"{'reports':>10} {'stock (s)':>10} {'orjson (s)':>11} {'speedup':>8} {'size (KB)':>10} {'identical':>10}")
+        self.stdout.write(
+            f"{options['reports']:>10} {stock:>10.4f} {fast:>11.4f} {stock / fast:>7.1f}x "
+            f"{len(outputs['orjson']) / 1024:>10.0f} {str(outputs['stock'] == outputs['orjson']):>10}"
+        )
+
+    def build_payload(self, count, rng):
+        """Report rows with native UUIDs, datetimes and Decimals, as views hand them to the renderer"""
+        now = timezone.now()
+        statuses = [code for code, _ in EmergencyReport.STATUS_CHOICES]
+        labels = dict(EmergencyReport.STATUS_CHOICES)
+        reporters = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(100)]
+        tags = [
+            {'id': str(uuid.UUID(int=rng.getrandbits(128))), 'name': name, 'emergency_type': name.upper(), 'description': None}
+            for name in ('fire', 'traffic', 'natural')
+        ]
+        results = []
+        for i in range(count):
+            report_status = rng.choice(statuses)
+            results.append({
+                'id': uuid.UUID(int=rng.getrandbits(128)),
+                'reporter': rng.choice(reporters),
+                'reporter_type': rng.choice(['SPECTATOR', 'VICTIM']),
+                'description': f"Report {i}: smoke seen near the market, people évacuated",
+                'latitude': round(38.4 + rng.random(), 6),
+                'longitude': round(27.1 + rng.random(), 6),
+                'distance': Decimal(f"{rng.random() * 5:.3f}"),
+                'is_emergency': rng.random() < 0.8,
+                'status': report_status,
+                'status_display': labels[report_status],
+                'timestamp': now - timedelta(seconds=rng.randrange(86400 * 30), microseconds=rng.randrange(1_000_000)),
+                'tags': rng.sample(tags, rng.randrange(len(tags) + 1)),
+            })
+        return {'next': None, 'previous': None, 'results': results}
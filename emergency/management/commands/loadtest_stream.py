@@ -0,0 +1,88 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Hold many idle connections open against the server-sent event stream'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/emergency/stream/')
+        parser.add_argument('--token', required=True, help='JWT access token to connect with')
+        parser.add_argument('--connections', type=int, default=2000)
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to hold the connections open')
+        parser.add_argument('--ramp', type=float, default=10, help='Seconds over which to open the connections')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError('Only http:// URLs are supported')
+        separator = '&' if url.query else '?'
+        target = f"{url.path or '/'}{'?' + url.query if url.query else ''}{separator}token={options['token']}"
+        stats = asyncio.run(self.run(url.hostname, url.port or 80, target, options))
+
+        self.stdout.write(
+            f"connected {stats['connected']}/{options['connections']}, failed {stats['failed']}, "
+            f"dropped {stats['dropped']}, still open {stats['open']}"
+        )
+        self.stdout.write(
+            f"heartbeats {stats['heartbeats']}, events {stats['events']}, "
+            f"connect time p50 {stats['p50']:.3f}s p99 {stats['p99']:.3f}s"
+        )
+
+    async def run(self, host, port, target, options):
+        stats = {'connected': 0, 'failed': 0, 'dropped': 0, 'open': 0, 'heartbeats': 0, 'events': 0}
+        connect_times = []
+        deadline = time.monotonic() + options['ramp'] + options['duration']
+        delay = options['ramp'] / max(options['connections'], 1)
+
+        async def client():
+            started = time.monotonic()
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(
+                    f"GET {target} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode()
+                )
+                await writer.drain()
+                status_line = await reader.readline()
+                if b' 200 ' not in status_line:
+                    stats['failed'] += 1
+                    writer.close()
+                    return
+            except OSError:
+                stats['failed'] += 1
+                return
+            stats['connected'] += 1
+            connect_times.append(time.monotonic() - started)
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        stats['open'] += 1
+                        break
+                    try:
+                        line = await asyncio.wait_for(reader.readline(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        continue
+                    if not line:
+                        stats['dropped'] += 1
+                        break
+                    if line.startswith(b': ping'):
+                        stats['heartbeats'] += 1
+                    elif line.startswith(b'event:'):
+                        stats['events'] += 1
+            finally:
+                writer.close()
+
+        tasks = []
+        for _ in range(options['connections']):
+            tasks.append(asyncio.ensure_future(client()))
+            await asyncio.sleep(delay)
+        await asyncio.gather(*tasks)
+
+        connect_times.sort()
+        stats['p50'] = connect_times[len(connect_times) // 2] if connect_times else 0
+        stats['p99'] = connect_times[int(len(connect_times) * 0.99)] if connect_times else 0
+        return stats
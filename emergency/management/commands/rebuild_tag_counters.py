@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from emergency.services import rebuild_tag_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-tag report counters from the report/tag links'
+
+    def handle(self, *args, **options):
+        count = rebuild_tag_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {count} tags"))
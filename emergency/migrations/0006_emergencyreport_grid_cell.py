@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2025-07-08 10:12
+
+from django.db import migrations, models
+
+from emergency.spatial import grid_cell_for
+
+
+def populate_grid_cells(apps, schema_editor):
+    EmergencyReport = apps.get_model('emergency', 'EmergencyReport')
+    reports = EmergencyReport.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).only('id', 'latitude', 'longitude')
+    batch = []
+    for report in reports.iterator(chunk_size=2000):
+        report.grid_cell = grid_cell_for(report.latitude, report.longitude)
+        batch.append(report)
+        if len(batch) >= 2000:
+            EmergencyReport.objects.bulk_update(batch, ['grid_cell'])
+            batch = []
+    if batch:
+        EmergencyReport.objects.bulk_update(batch, ['grid_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0005_remove_location_references'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='grid_cell',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['grid_cell', 'status'], name='emergency_e_grid_ce_8e1db5_idx'),
+        ),
+        migrations.RunPython(populate_grid_cells, migrations.RunPython.noop),
+    ]
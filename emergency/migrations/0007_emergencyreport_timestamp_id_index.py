@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2025-07-10 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0006_emergencyreport_grid_cell'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['timestamp', 'id'], name='emergency_e_timesta_b83dd8_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.3 on 2025-07-15 14:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0007_emergencyreport_timestamp_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmergencyResponseTiming',
+            fields=[
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='response_timing', serialize=False, to='emergency.emergencyreport')),
+                ('reported_at', models.DateTimeField(db_index=True)),
+                ('responding_at', models.DateTimeField(blank=True, null=True)),
+                ('on_scene_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('minutes_to_responding', models.FloatField(blank=True, null=True)),
+                ('minutes_to_on_scene', models.FloatField(blank=True, null=True)),
+                ('minutes_to_resolved', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EmergencyStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('RESPONDING', 'Emergency Services Responding'), ('ON_SCENE', 'Emergency Services On Scene'), ('RESOLVED', 'Resolved')], max_length=20, null=True)),
+                ('to_status', models.CharField(choices=[('PENDING', 'Pending'), ('RESPONDING', 'Emergency Services Responding'), ('ON_SCENE', 'Emergency Services On Scene'), ('RESOLVED', 'Resolved')], max_length=20)),
+                ('timestamp', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_events', to=settings.AUTH_USER_MODEL)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='emergency.emergencyreport')),
+            ],
+            options={
+                'ordering': ['timestamp', 'id'],
+                'indexes': [models.Index(fields=['report', 'timestamp'], name='emergency_e_report__2453db_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2025-07-16 11:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+STATUS_FIELDS = {
+    'PENDING': 'pending',
+    'RESPONDING': 'responding',
+    'ON_SCENE': 'on_scene',
+    'RESOLVED': 'resolved',
+}
+
+
+def populate_tag_counters(apps, schema_editor):
+    EmergencyReport = apps.get_model('emergency', 'EmergencyReport')
+    EmergencyTag = apps.get_model('emergency', 'EmergencyTag')
+    EmergencyTagCounter = apps.get_model('emergency', 'EmergencyTagCounter')
+    counters = {
+        tag_id: EmergencyTagCounter(tag_id=tag_id)
+        for tag_id in EmergencyTag.objects.values_list('id', flat=True)
+    }
+    links = EmergencyReport.tags.through.objects.values_list(
+        'emergencytag_id', 'emergencyreport__status'
+    ).annotate(count=Count('id'))
+    for tag_id, status, count in links:
+        counter = counters[tag_id]
+        counter.total += count
+        field = STATUS_FIELDS[status]
+        setattr(counter, field, getattr(counter, field) + count)
+    EmergencyTagCounter.objects.bulk_create(counters.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0008_status_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmergencyTagCounter',
+            fields=[
+                ('tag', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counter', serialize=False, to='emergency.emergencytag')),
+                ('total', models.IntegerField(default=0)),
+                ('pending', models.IntegerField(default=0)),
+                ('responding', models.IntegerField(default=0)),
+                ('on_scene', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_tag_counters, migrations.RunPython.noop),
+    ]
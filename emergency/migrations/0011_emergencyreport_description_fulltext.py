@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2025-07-17 10:48
+
+from django.db import migrations
+
+FULLTEXT_INDEX_NAME = 'emergency_report_description_ft'
+
+
+def add_fulltext_index(apps, schema_editor):
+    # FULLTEXT indexes are MySQL specific; other backends search with LIKE
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE emergency_emergencyreport ADD FULLTEXT INDEX {FULLTEXT_INDEX_NAME} (description)'
+    )
+
+
+def remove_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        f'ALTER TABLE emergency_emergencyreport DROP INDEX {FULLTEXT_INDEX_NAME}'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0010_cachegeneration'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext_index, remove_fulltext_index),
+    ]
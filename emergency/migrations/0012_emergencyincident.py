@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2025-07-17 16:20
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0011_emergencyreport_description_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmergencyIncident',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('grid_cell', models.CharField(editable=False, max_length=16)),
+                ('first_reported_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_reported_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('report_count', models.IntegerField(default=0)),
+                ('tags', models.ManyToManyField(blank=True, related_name='incidents', to='emergency.emergencytag')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='incident',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reports', to='emergency.emergencyincident'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyincident',
+            index=models.Index(fields=['grid_cell', 'last_reported_at'], name='emergency_e_grid_ce_12ad01_idx'),
+        ),
+    ]
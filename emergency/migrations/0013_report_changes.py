@@ -0,0 +1,43 @@
+# Generated by Django 5.2.3 on 2025-07-18 10:05
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing reports were last changed no earlier than they were created"""
+    EmergencyReport = apps.get_model('emergency', 'EmergencyReport')
+    EmergencyReport.objects.update(updated_at=F('timestamp'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0012_emergencyincident'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmergencyReportTombstone',
+            fields=[
+                ('report_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('reporter_id', models.UUIDField(db_index=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='emergencyreport',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='emergencyreport',
+            index=models.Index(fields=['updated_at', 'id'], name='emergency_e_updated_16d35c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='emergencyreporttombstone',
+            index=models.Index(fields=['deleted_at', 'report_id'], name='emergency_e_deleted_4674f4_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2025-07-18 14:40
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0013_report_changes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEmergencyReport',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('reporter_type', models.CharField(choices=[('SPECTATOR', 'Spectator'), ('VICTIM', 'Victim')], max_length=20)),
+                ('description', models.TextField()),
+                ('latitude', models.FloatField(blank=True, null=True)),
+                ('longitude', models.FloatField(blank=True, null=True)),
+                ('is_emergency', models.BooleanField(default=False)),
+                ('grid_cell', models.CharField(blank=True, editable=False, max_length=16, null=True)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RESPONDING', 'Emergency Services Responding'), ('ON_SCENE', 'Emergency Services On Scene'), ('RESOLVED', 'Resolved')], max_length=20)),
+                ('timestamp', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('incident', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_reports', to='emergency.emergencyincident')),
+                ('reporter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_reports', to=settings.AUTH_USER_MODEL)),
+                ('tags', models.ManyToManyField(blank=True, related_name='archived_reports', to='emergency.emergencytag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['reporter', 'timestamp'], name='emergency_a_reporte_00e073_idx'), models.Index(fields=['timestamp', 'id'], name='emergency_a_timesta_259b07_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2025-07-24 10:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0014_archivedemergencyreport'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEmergencyResponseTiming',
+            fields=[
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='response_timing', serialize=False, to='emergency.archivedemergencyreport')),
+                ('reported_at', models.DateTimeField(db_index=True)),
+                ('responding_at', models.DateTimeField(blank=True, null=True)),
+                ('on_scene_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('minutes_to_responding', models.FloatField(blank=True, null=True)),
+                ('minutes_to_on_scene', models.FloatField(blank=True, null=True)),
+                ('minutes_to_resolved', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedEmergencyStatusEvent',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('from_status', models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('RESPONDING', 'Emergency Services Responding'), ('ON_SCENE', 'Emergency Services On Scene'), ('RESOLVED', 'Resolved')], max_length=20, null=True)),
+                ('to_status', models.CharField(choices=[('PENDING', 'Pending'), ('RESPONDING', 'Emergency Services Responding'), ('ON_SCENE', 'Emergency Services On Scene'), ('RESOLVED', 'Resolved')], max_length=20)),
+                ('timestamp', models.DateTimeField()),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_status_events', to=settings.AUTH_USER_MODEL)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='emergency.archivedemergencyreport')),
+            ],
+            options={
+                'ordering': ['timestamp', 'id'],
+                'indexes': [models.Index(fields=['report', 'timestamp'], name='emergency_a_report__92d004_idx')],
+            },
+        ),
+    ]
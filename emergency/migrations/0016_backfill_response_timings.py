@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2025-07-24 10:40
+
+from django.db import migrations
+
+
+def backfill_response_timings(apps, schema_editor):
+    """
+    Give every report created before status events were recorded a timing
+    row. When those reports reached each stage was never stored, so the
+    stage times stay empty: they are left out of response-time averages
+    and filled in for stages the reports reach from now on.
+    """
+    EmergencyReport = apps.get_model('emergency', 'EmergencyReport')
+    EmergencyResponseTiming = apps.get_model('emergency', 'EmergencyResponseTiming')
+
+    reports = EmergencyReport.objects.filter(response_timing__isnull=True).values_list('id', 'timestamp')
+    rows = list(reports)
+    for start in range(0, len(rows), 1000):
+        EmergencyResponseTiming.objects.bulk_create([
+            EmergencyResponseTiming(report_id=report_id, reported_at=timestamp)
+            for report_id, timestamp in rows[start:start + 1000]
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0015_archived_status_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_response_timings, migrations.RunPython.noop),
+    ]
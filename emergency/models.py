@@ -1,6 +1,8 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 from users.models import User
+from .spatial import grid_cell_for
 
 class EmergencyReport(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -14,24 +16,72 @@ class EmergencyReport(models.Model):
         ('ON_SCENE', 'Emergency Services On Scene'),
         ('RESOLVED', 'Resolved'),
     ]
+    ACTIVE_STATUSES = ['PENDING', 'RESPONDING', 'ON_SCENE']
     reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reports')
     reporter_type = models.CharField(max_length=20, choices=REPORTER_TYPE_CHOICES)
     description = models.TextField() 
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
     is_emergency = models.BooleanField(default=False)  
+    # Spatial bucket key derived from latitude/longitude (see emergency.spatial)
+    grid_cell = models.CharField(max_length=16, null=True, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     timestamp = models.DateTimeField(auto_now_add=True)  
+    # Last change to the report; the cursor of the changes-since endpoint
+    updated_at = models.DateTimeField(auto_now=True)
     tags = models.ManyToManyField('EmergencyTag', related_name='reports', blank=True)
+    # Incident this report was clustered into (see emergency.services.attach_to_incident)
+    incident = models.ForeignKey(
+        'EmergencyIncident',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reports'
+    )
 
     class Meta:
         indexes = [
             models.Index(fields=['reporter', 'timestamp']),
+            models.Index(fields=['grid_cell', 'status']),
+            models.Index(fields=['timestamp', 'id']),
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
         return f"{self.reporter.username} - {self.timestamp}"
 
+    def assign_grid_cell(self):
+        """Recompute the spatial bucket from the current coordinates"""
+        self.grid_cell = grid_cell_for(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.assign_grid_cell()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'updated_at'}
+            if {'latitude', 'longitude'} & update_fields:
+                update_fields.add('grid_cell')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+
+class EmergencyReportTombstone(models.Model):
+    """
+    Marker left behind by a deleted report so clients syncing through
+    the changes-since endpoint can drop their copy
+    """
+    report_id = models.UUIDField(primary_key=True)
+    reporter_id = models.UUIDField(db_index=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'report_id']),
+        ]
+
+    def __str__(self):
+        return f"Deleted {self.report_id}"
+
 
 class EmergencyTag(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -46,4 +96,214 @@ class EmergencyTag(models.Model):
     description = models.TextField(blank=True, null=True)
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class EmergencyStatusEvent(models.Model):
+    """
+    Append-only history of status transitions. The first event of a report
+    has no from_status and records the status it was created with.
+    """
+    report = models.ForeignKey(EmergencyReport, on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(max_length=20, choices=EmergencyReport.STATUS_CHOICES, null=True, blank=True)
+    to_status = models.CharField(max_length=20, choices=EmergencyReport.STATUS_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='status_events')
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            models.Index(fields=['report', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.report_id}: {self.from_status} -> {self.to_status}"
+
+
+class EmergencyResponseTiming(models.Model):
+    """
+    When a report first reached each stage, maintained incrementally from
+    status events. Durations are in minutes from the report's creation.
+    """
+    report = models.OneToOneField(
+        EmergencyReport,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='response_timing'
+    )
+    reported_at = models.DateTimeField(db_index=True)
+    responding_at = models.DateTimeField(null=True, blank=True)
+    on_scene_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    minutes_to_responding = models.FloatField(null=True, blank=True)
+    minutes_to_on_scene = models.FloatField(null=True, blank=True)
+    minutes_to_resolved = models.FloatField(null=True, blank=True)
+
+    # Status -> (time field, duration field)
+    STAGE_FIELDS = {
+        'RESPONDING': ('responding_at', 'minutes_to_responding'),
+        'ON_SCENE': ('on_scene_at', 'minutes_to_on_scene'),
+        'RESOLVED': ('resolved_at', 'minutes_to_resolved'),
+    }
+
+    def __str__(self):
+        return f"Timing for {self.report_id}"
+
+    def reach(self, status, timestamp):
+        """
+        Record the first time the report reached a status.
+        Returns the names of the changed fields.
+        """
+        fields = self.STAGE_FIELDS.get(status)
+        if fields is None or getattr(self, fields[0]) is not None:
+            return []
+        time_field, duration_field = fields
+        setattr(self, time_field, timestamp)
+        setattr(self, duration_field, max((timestamp - self.reported_at).total_seconds() / 60, 0))
+        return [time_field, duration_field]
+
+
+class EmergencyTagCounter(models.Model):
+    """
+    Number of reports carrying a tag, overall and per status. Maintained
+    incrementally by emergency.signals and emergency.services; rebuild with
+    `manage.py rebuild_tag_counters` if it ever drifts.
+    """
+    tag = models.OneToOneField(EmergencyTag, on_delete=models.CASCADE, primary_key=True, related_name='counter')
+    total = models.IntegerField(default=0)
+    pending = models.IntegerField(default=0)
+    responding = models.IntegerField(default=0)
+    on_scene = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+
+    # Report status -> counter field
+    STATUS_FIELDS = {
+        'PENDING': 'pending',
+        'RESPONDING': 'responding',
+        'ON_SCENE': 'on_scene',
+        'RESOLVED': 'resolved',
+    }
+
+    def __str__(self):
+        return f"{self.tag_id}: {self.total}"
+
+
+class CacheGeneration(models.Model):
+    """
+    Version counters for process-local caches. Bumping a key makes every
+    process reload its copy (see config.generations).
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
+
+class EmergencyIncident(models.Model):
+    """
+    A real-world event that one or more reports describe. Reports made
+    close together in space and time, with overlapping tags, are attached
+    to the same incident so follow-up work happens once per incident.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    grid_cell = models.CharField(max_length=16, editable=False)
+    first_reported_at = models.DateTimeField(default=timezone.now)
+    last_reported_at = models.DateTimeField(default=timezone.now)
+    report_count = models.IntegerField(default=0)
+    tags = models.ManyToManyField(EmergencyTag, related_name='incidents', blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['grid_cell', 'last_reported_at']),
+        ]
+
+    def __str__(self):
+        return f"Incident {self.id} ({self.report_count} reports)"
+
+    def save(self, *args, **kwargs):
+        self.grid_cell = grid_cell_for(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+
+class ArchivedEmergencyReport(models.Model):
+    """
+    Resolved report moved out of the live table by emergency.archive once
+    it is older than REPORT_ARCHIVE_AFTER_DAYS. Same columns as
+    EmergencyReport, plus when it was archived.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_reports')
+    reporter_type = models.CharField(max_length=20, choices=EmergencyReport.REPORTER_TYPE_CHOICES)
+    description = models.TextField()
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    is_emergency = models.BooleanField(default=False)
+    grid_cell = models.CharField(max_length=16, null=True, blank=True, editable=False)
+    status = models.CharField(max_length=20, choices=EmergencyReport.STATUS_CHOICES)
+    timestamp = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    tags = models.ManyToManyField(EmergencyTag, related_name='archived_reports', blank=True)
+    incident = models.ForeignKey(
+        EmergencyIncident,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_reports'
+    )
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reporter', 'timestamp']),
+            models.Index(fields=['timestamp', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.reporter_id} - {self.timestamp} (archived)"
+
+
+class ArchivedEmergencyStatusEvent(models.Model):
+    """
+    Status event of an archived report, moved out of EmergencyStatusEvent
+    with it. Keeps the id it had in the live table.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    report = models.ForeignKey(ArchivedEmergencyReport, on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(max_length=20, choices=EmergencyReport.STATUS_CHOICES, null=True, blank=True)
+    to_status = models.CharField(max_length=20, choices=EmergencyReport.STATUS_CHOICES)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_status_events'
+    )
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        ordering = ['timestamp', 'id']
+        indexes = [
+            models.Index(fields=['report', 'timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.report_id}: {self.from_status} -> {self.to_status} (archived)"
+
+
+class ArchivedEmergencyResponseTiming(models.Model):
+    """Response timing of an archived report, moved out of EmergencyResponseTiming with it"""
+    report = models.OneToOneField(
+        ArchivedEmergencyReport,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='response_timing'
+    )
+    reported_at = models.DateTimeField(db_index=True)
+    responding_at = models.DateTimeField(null=True, blank=True)
+    on_scene_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    minutes_to_responding = models.FloatField(null=True, blank=True)
+    minutes_to_on_scene = models.FloatField(null=True, blank=True)
+    minutes_to_resolved = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Timing for {self.report_id} (archived)"
@@ -0,0 +1,116 @@
+"""
+Keyset pagination over a composite, unique ordering.
+
+DRF's CursorPagination only stores the first ordering field in its
+cursor and falls back to an OFFSET among rows that share that value. Here
+the cursor holds the values of every ordering field of the boundary row,
+and the next page is read with a lexicographic "after this row"
+condition. Since the ordering is unique, no offset is ever needed, and
+rows that share a timestamp are neither skipped nor repeated.
+"""
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Cursor pagination whose ordering must be unique as a whole, e.g.
+    ('-timestamp', '-id'). Responses keep the next/previous/results shape
+    of CursorPagination.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor is not None else None
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._after(ordering, position))
+            except (ValidationError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Fetch one extra row to know whether another page follows
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_following
+        else:
+            self.has_next, self.has_previous = has_following, position is not None
+
+        # With an empty page, paging either way continues from the cursor
+        self.next_position = self.previous_position = position
+        if self.page:
+            self.previous_position = self._get_position_from_instance(self.page[0], self.ordering)
+            self.next_position = self._get_position_from_instance(self.page[-1], self.ordering)
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _after(self, ordering, position):
+        """Rows strictly after position in ordering, as a lexicographic keyset condition"""
+        conditions = []
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            conditions.append(equal & Q(**{f'{name}__{lookup}': value}))
+            equal &= Q(**{name: value})
+        return reduce(operator.or_, conditions)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.ordering)
+            or not all(isinstance(value, str) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None:
+            cursor = cursor._replace(position=json.dumps(cursor.position))
+        return super().encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for field in ordering:
+            name = field.lstrip('-')
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(str(value))
+        return position
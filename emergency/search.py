@@ -0,0 +1,69 @@
+"""
+Full-text search over EmergencyReport descriptions.
+
+On MySQL, searches use the FULLTEXT index created by migration 0011 via
+MATCH ... AGAINST, so cost depends on the number of matches rather than
+the table size. Other databases (e.g. SQLite in development) fall back to
+one LIKE per term and give every match the same rank.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Value
+from rest_framework import filters
+
+# Characters with a meaning in MySQL boolean full-text queries
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+class MatchAgainst(Func):
+    """MySQL full-text relevance of a query against FULLTEXT-indexed columns"""
+    template = 'MATCH (%(expressions)s) AGAINST (%%s IN BOOLEAN MODE)'
+    output_field = FloatField()
+
+    def __init__(self, *columns, query):
+        super().__init__(*columns)
+        self.query = query
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = super().as_sql(compiler, connection, **extra_context)
+        return sql, (*params, self.query)
+
+
+def search_terms(query):
+    """Split a search string into plain terms"""
+    return [term for term in _BOOLEAN_OPERATORS.sub(' ', query or '').split() if term]
+
+
+def boolean_query(terms):
+    """Require every term, each matched as a word prefix"""
+    return ' '.join(f'+{term}*' for term in terms)
+
+
+def search_reports(queryset, query):
+    """
+    Filter reports to those whose description matches every term of the
+    query and annotate them with a `rank` (higher is more relevant)
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if connections[queryset.db].vendor == 'mysql':
+        return queryset.annotate(
+            rank=MatchAgainst(F('description'), query=boolean_query(terms))
+        ).filter(rank__gt=0)
+    for term in terms:
+        queryset = queryset.filter(description__icontains=term)
+    return queryset.annotate(rank=Value(1.0, output_field=FloatField()))
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter for ?search= backed by the description full-text index
+    instead of LIKE '%term%' scans
+    """
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not search_terms(query):
+            return queryset
+        return search_reports(queryset, query)
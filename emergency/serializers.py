@@ -1,15 +1,48 @@
 # emergency/serializers.py
 from rest_framework import serializers
-from .models import EmergencyReport, EmergencyTag
+from .models import ArchivedEmergencyReport, EmergencyReport, EmergencyTag
+from .tag_registry import attach_tag_ids, tag_ids_for, tag_registry
+
+# Status code -> human-readable label
+STATUS_DISPLAY = dict(EmergencyReport.STATUS_CHOICES)
 
 class EmergencyTagSerializer(serializers.ModelSerializer):
     class Meta:
         model = EmergencyTag
         fields = ['id', 'name', 'emergency_type', 'description']
 
+class ReportLocationSerializer(serializers.Serializer):
+    """A single affected location of a multi-location report"""
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    address = serializers.CharField(required=False, allow_blank=True)
+
+class BulkStatusUpdateSerializer(serializers.Serializer):
+    """Input of the bulk status update endpoint"""
+    report_ids = serializers.ListField(child=serializers.UUIDField(), min_length=1, max_length=200)
+    status = serializers.ChoiceField(choices=EmergencyReport.STATUS_CHOICES)
+
+class CachedTagsField(serializers.Field):
+    """Nested tags of a report, rendered from the in-memory tag registry"""
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, report):
+        return tag_registry.render(tag_ids_for(report))
+
+class EmergencyReportListSerializer(serializers.ListSerializer):
+    """Loads the tag ids of every report on the page in one query"""
+    def to_representation(self, data):
+        reports = list(data.all() if hasattr(data, 'all') else data)
+        attach_tag_ids(reports)
+        return super().to_representation(reports)
+
 class EmergencyReportSerializer(serializers.ModelSerializer):
     reporter = serializers.PrimaryKeyRelatedField(read_only=True)
-    tags = EmergencyTagSerializer(many=True, required=False, read_only=True)
+    incident = serializers.PrimaryKeyRelatedField(read_only=True)
+    tags = CachedTagsField(required=False)
     tag_ids = serializers.ListField(child=serializers.UUIDField(), write_only=True, required=False)
     status_display = serializers.SerializerMethodField(read_only=True)
     
@@ -18,35 +51,89 @@ class EmergencyReportSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'reporter', 'reporter_type', 'description',
             'latitude', 'longitude', 'is_emergency', 'status', 'status_display', 
-            'timestamp', 'tags', 'tag_ids'
+            'timestamp', 'incident', 'tags', 'tag_ids'
         ]
+        list_serializer_class = EmergencyReportListSerializer
     
     def get_status_display(self, obj):
         """Return the human-readable status"""
-        return dict(EmergencyReport.STATUS_CHOICES).get(obj.status, obj.status)
+        return STATUS_DISPLAY.get(obj.status, obj.status)
     
     def create(self, validated_data):
         tag_ids = validated_data.pop('tag_ids', [])
         report = EmergencyReport.objects.create(**validated_data)
         
         # Add tags if provided
+        report._tag_ids = []
         if tag_ids:
-            tags = EmergencyTag.objects.filter(id__in=tag_ids)
-            report.tags.set(tags)
+            report._tag_ids = tag_registry.existing_ids(tag_ids)
+            report.tags.set(report._tag_ids)
         
         return report
     
     def update(self, instance, validated_data):
         tag_ids = validated_data.pop('tag_ids', None)
         
+        # Update tags if provided. This happens while the report still has
+        # its old status, which the tag counters are kept under; a status
+        # change is then moved once, on the final tags, by
+        # record_status_change.
+        if tag_ids is not None:
+            instance._tag_ids = tag_registry.existing_ids(tag_ids)
+            instance.tags.set(instance._tag_ids)
+        
         # Update regular fields
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
         
-        # Update tags if provided
-        if tag_ids is not None:
-            tags = EmergencyTag.objects.filter(id__in=tag_ids)
-            instance.tags.set(tags)
-        
-        return instance
\ No newline at end of file
+        return instance
+
+# Columns read by serialize_report_rows
+REPORT_ROW_FIELDS = [
+    'id', 'reporter_id', 'reporter_type', 'description', 'latitude', 'longitude',
+    'is_emergency', 'status', 'timestamp', 'incident_id',
+]
+
+def serialize_report_rows(rows, include_archived=False):
+    """
+    Read-only fast path for report listings. Builds the same output as
+    EmergencyReportSerializer straight from .values(*REPORT_ROW_FIELDS)
+    rows, with tags rendered from the tag registry. Pass include_archived
+    when rows may come from ArchivedEmergencyReport.
+    """
+    rows = list(rows)
+    tag_ids = {row['id']: [] for row in rows}
+    if tag_ids:
+        links = EmergencyReport.tags.through.objects.filter(
+            emergencyreport_id__in=list(tag_ids)
+        ).values_list('emergencyreport_id', 'emergencytag_id')
+        for report_id, tag_id in links:
+            tag_ids[report_id].append(tag_id)
+        if include_archived:
+            links = ArchivedEmergencyReport.tags.through.objects.filter(
+                archivedemergencyreport_id__in=list(tag_ids)
+            ).values_list('archivedemergencyreport_id', 'emergencytag_id')
+            for report_id, tag_id in links:
+                tag_ids[report_id].append(tag_id)
+    
+    timestamp = serializers.DateTimeField().to_representation
+    render_tags = tag_registry.render
+    status_display = STATUS_DISPLAY
+    return [
+        {
+            'id': str(row['id']),
+            'reporter': row['reporter_id'],
+            'reporter_type': row['reporter_type'],
+            'description': row['description'],
+            'latitude': row['latitude'],
+            'longitude': row['longitude'],
+            'is_emergency': row['is_emergency'],
+            'status': row['status'],
+            'status_display': status_display.get(row['status'], row['status']),
+            'timestamp': timestamp(row['timestamp']),
+            'incident': row['incident_id'],
+            'tags': render_tags(tag_ids[row['id']]),
+        }
+        for row in rows
+    ]
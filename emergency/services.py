@@ -0,0 +1,288 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import (
+    ArchivedEmergencyReport, EmergencyIncident, EmergencyReport, EmergencyResponseTiming, EmergencyStatusEvent,
+    EmergencyTag, EmergencyTagCounter
+)
+from .spatial import cells_within_radius, haversine_km
+
+
+def record_reports_created(reports, actor=None):
+    """
+    Write the initial status event and response timing row for new reports.
+    Call this inside the transaction that created them.
+    """
+    reports = list(reports)
+    if not reports:
+        return
+    EmergencyStatusEvent.objects.bulk_create([
+        EmergencyStatusEvent(
+            report=report,
+            from_status=None,
+            to_status=report.status,
+            actor=actor,
+            timestamp=report.timestamp
+        )
+        for report in reports
+    ])
+    timings = []
+    for report in reports:
+        timing = EmergencyResponseTiming(report=report, reported_at=report.timestamp)
+        timing.reach(report.status, report.timestamp)
+        timings.append(timing)
+    EmergencyResponseTiming.objects.bulk_create(timings)
+
+
+def record_report_created(report, actor=None):
+    record_reports_created([report], actor)
+
+
+def record_status_change(report, from_status, actor=None, timestamp=None):
+    """
+    Append a status event for a report whose status was just saved and
+    update its response timing. Does nothing if the status did not change.
+    """
+    if from_status == report.status:
+        return None
+    timestamp = timestamp or timezone.now()
+    with transaction.atomic():
+        event = EmergencyStatusEvent.objects.create(
+            report=report,
+            from_status=from_status,
+            to_status=report.status,
+            actor=actor,
+            timestamp=timestamp
+        )
+        timing, _ = EmergencyResponseTiming.objects.select_for_update().get_or_create(
+            report=report,
+            defaults={'reported_at': report.timestamp}
+        )
+        changed = timing.reach(report.status, timestamp)
+        if changed:
+            timing.save(update_fields=changed)
+        move_tag_counters(report, from_status, report.status)
+    return event
+
+
+def change_report_statuses(reports, to_status, actor=None):
+    """
+    Move many reports to a status in a fixed number of statements: one
+    UPDATE of the reports, one INSERT of their status events, one bulk
+    update of their response timings and one counter update per group of
+    tags. As with a single report, any status may follow any other (e.g.
+    a RESOLVED report reopened as PENDING); reports already at the status
+    are left untouched.
+
+    Returns:
+        tuple: (list of changed report rows with id, from_status and
+        reporter_id; dict of skipped report id -> reason)
+    """
+    timestamp = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            reports.select_for_update().order_by('pk').values('id', 'status', 'timestamp', 'reporter_id')
+        )
+        changed, skipped = [], {}
+        for row in rows:
+            if row['status'] == to_status:
+                skipped[row['id']] = f'Already {to_status}'
+            else:
+                changed.append({
+                    'id': row['id'],
+                    'from_status': row['status'],
+                    'reporter_id': row['reporter_id'],
+                    'reported_at': row['timestamp'],
+                })
+        if not changed:
+            return changed, skipped
+        report_ids = [row['id'] for row in changed]
+
+        EmergencyReport.objects.filter(pk__in=report_ids).update(status=to_status, updated_at=timestamp)
+        EmergencyStatusEvent.objects.bulk_create([
+            EmergencyStatusEvent(
+                report_id=row['id'],
+                from_status=row['from_status'],
+                to_status=to_status,
+                actor=actor,
+                timestamp=timestamp
+            )
+            for row in changed
+        ])
+
+        timings = EmergencyResponseTiming.objects.select_for_update().in_bulk(report_ids)
+        new_timings, reached = [], []
+        for row in changed:
+            timing = timings.get(row['id'])
+            if timing is None:
+                timing = EmergencyResponseTiming(report_id=row['id'], reported_at=row['reported_at'])
+                timing.reach(to_status, timestamp)
+                new_timings.append(timing)
+            elif timing.reach(to_status, timestamp):
+                reached.append(timing)
+        EmergencyResponseTiming.objects.bulk_create(new_timings)
+        if reached:
+            EmergencyResponseTiming.objects.bulk_update(reached, list(EmergencyResponseTiming.STAGE_FIELDS[to_status]))
+
+        # Reports per (tag, previous status), then one UPDATE per
+        # (previous status, count) group of tags
+        from_status = {row['id']: row['from_status'] for row in changed}
+        moves = Counter(
+            (tag_id, from_status[report_id])
+            for tag_id, report_id in EmergencyReport.tags.through.objects.filter(
+                emergencyreport_id__in=report_ids
+            ).values_list('emergencytag_id', 'emergencyreport_id')
+        )
+        groups = defaultdict(list)
+        for (tag_id, status), count in moves.items():
+            groups[status, count].append(tag_id)
+        to_field = EmergencyTagCounter.STATUS_FIELDS[to_status]
+        for (status, count), tag_ids in groups.items():
+            from_field = EmergencyTagCounter.STATUS_FIELDS[status]
+            EmergencyTagCounter.objects.filter(tag_id__in=tag_ids).update(**{
+                from_field: F(from_field) - count,
+                to_field: F(to_field) + count,
+            })
+    return changed, skipped
+
+
+def adjust_tag_counters(tag_ids, status, delta):
+    """
+    Add delta reports with the given status to the counters of each tag
+    """
+    tag_ids = list(tag_ids)
+    if not tag_ids or not delta:
+        return
+    field = EmergencyTagCounter.STATUS_FIELDS[status]
+    EmergencyTagCounter.objects.bulk_create(
+        [EmergencyTagCounter(tag_id=tag_id) for tag_id in tag_ids],
+        ignore_conflicts=True
+    )
+    EmergencyTagCounter.objects.filter(tag_id__in=tag_ids).update(
+        total=F('total') + delta,
+        **{field: F(field) + delta}
+    )
+
+
+def adjust_tag_counters_for_reports(tag_id, report_ids, delta):
+    """
+    Add (or with a negative delta, remove) the given reports to one tag's
+    counters, grouped by their current status
+    """
+    statuses = EmergencyReport.objects.filter(
+        pk__in=report_ids
+    ).values('status').annotate(count=Count('id')).values_list('status', 'count')
+    for status, count in statuses:
+        adjust_tag_counters([tag_id], status, delta * count)
+
+
+def move_tag_counters(report, from_status, to_status):
+    """
+    Move a report from one status column to another on all of its tags
+    """
+    from_field = EmergencyTagCounter.STATUS_FIELDS[from_status]
+    to_field = EmergencyTagCounter.STATUS_FIELDS[to_status]
+    EmergencyTagCounter.objects.filter(tag__reports=report).update(**{
+        from_field: F(from_field) - 1,
+        to_field: F(to_field) + 1,
+    })
+
+
+def rebuild_tag_counters():
+    """
+    Recompute every tag counter from the report/tag links, counting
+    archived reports as RESOLVED. Returns the number of tags counted.
+    """
+    TagLink = EmergencyReport.tags.through
+    ArchivedTagLink = ArchivedEmergencyReport.tags.through
+    with transaction.atomic():
+        counters = {
+            tag_id: EmergencyTagCounter(tag_id=tag_id)
+            for tag_id in EmergencyTag.objects.values_list('id', flat=True)
+        }
+        links = TagLink.objects.values_list(
+            'emergencytag_id', 'emergencyreport__status'
+        ).annotate(count=Count('id'))
+        archived_links = ArchivedTagLink.objects.values_list('emergencytag_id').annotate(count=Count('id'))
+        links = list(links) + [(tag_id, 'RESOLVED', count) for tag_id, count in archived_links]
+        for tag_id, status, count in links:
+            counter = counters[tag_id]
+            counter.total += count
+            field = EmergencyTagCounter.STATUS_FIELDS[status]
+            setattr(counter, field, getattr(counter, field) + count)
+        EmergencyTagCounter.objects.all().delete()
+        EmergencyTagCounter.objects.bulk_create(counters.values())
+    return len(counters)
+
+
+def attach_to_incident(latitude, longitude, tag_ids=(), count=1):
+    """
+    Find the incident that new emergency reports at a location describe,
+    or start one. Only emergency reports are clustered; reports that are
+    not emergencies have no incident.
+    
+    Candidates are incidents in the grid cells around the location that had
+    a report within INCIDENT_CLUSTER_WINDOW_MINUTES; the closest one within
+    INCIDENT_CLUSTER_RADIUS_KM whose tags overlap the report's (or that
+    either side has no tags) is used. Call this inside the transaction that
+    creates the reports and pass the incident to them.
+    
+    Returns:
+        tuple: (incident, created); (None, True) for reports without coordinates
+    """
+    if latitude is None or longitude is None:
+        return None, True
+    latitude, longitude = float(latitude), float(longitude)
+    tag_ids = set(tag_ids)
+    now = timezone.now()
+    radius = settings.INCIDENT_CLUSTER_RADIUS_KM
+    
+    candidates = EmergencyIncident.objects.filter(
+        last_reported_at__gte=now - timedelta(minutes=settings.INCIDENT_CLUSTER_WINDOW_MINUTES)
+    )
+    cells = cells_within_radius(latitude, longitude, radius)
+    if cells is not None:
+        candidates = candidates.filter(grid_cell__in=cells)
+    candidates = list(candidates.select_for_update())
+    
+    incident_tags = {}
+    if candidates:
+        links = EmergencyIncident.tags.through.objects.filter(
+            emergencyincident_id__in=[incident.pk for incident in candidates]
+        ).values_list('emergencyincident_id', 'emergencytag_id')
+        for incident_id, tag_id in links:
+            incident_tags.setdefault(incident_id, set()).add(tag_id)
+    
+    best, best_distance = None, None
+    for incident in candidates:
+        known_tags = incident_tags.get(incident.pk)
+        if tag_ids and known_tags and not tag_ids & known_tags:
+            continue
+        distance = haversine_km(latitude, longitude, incident.latitude, incident.longitude)
+        if distance <= radius and (best is None or distance < best_distance):
+            best, best_distance = incident, distance
+    
+    if best is None:
+        incident = EmergencyIncident.objects.create(
+            latitude=latitude,
+            longitude=longitude,
+            first_reported_at=now,
+            last_reported_at=now,
+            report_count=count
+        )
+        created = True
+    else:
+        incident = best
+        EmergencyIncident.objects.filter(pk=incident.pk).update(
+            report_count=F('report_count') + count,
+            last_reported_at=now
+        )
+        created = False
+    if tag_ids:
+        incident.tags.add(*tag_ids)
+    return incident, created
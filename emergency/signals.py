@@ -0,0 +1,122 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from config.generations import bump_generation
+from .live_index import live_index
+from .models import ArchivedEmergencyReport, EmergencyReport, EmergencyReportTombstone, EmergencyTag
+from .services import adjust_tag_counters, adjust_tag_counters_for_reports
+from .tag_registry import GENERATION_KEY, tag_registry
+
+
+@receiver(post_save, sender=EmergencyReport)
+def index_saved_report(sender, instance, **kwargs):
+    """Add, update or drop (once RESOLVED) the report in the live index"""
+    transaction.on_commit(lambda: live_index.upsert(instance))
+
+
+@receiver(post_delete, sender=EmergencyReport)
+def unindex_deleted_report(sender, instance, **kwargs):
+    report_id = instance.pk
+    transaction.on_commit(lambda: live_index.remove(report_id))
+
+
+@receiver(m2m_changed, sender=EmergencyReport.tags.through)
+def reindex_report_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the tag types of indexed reports current"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        report_ids = [instance.pk]
+    elif pk_set:
+        report_ids = list(pk_set)
+    else:
+        # A tag was cleared from every report; rebuild on next read
+        transaction.on_commit(live_index.clear)
+        return
+    transaction.on_commit(lambda: live_index.refresh(report_ids))
+
+
+def _linked_ids(instance, reverse, pk_set):
+    """Ids on the other side of the existing links of a report or tag"""
+    links = EmergencyReport.tags.through.objects
+    if reverse:
+        links = links.filter(emergencytag_id=instance.pk)
+        if pk_set is not None:
+            links = links.filter(emergencyreport_id__in=pk_set)
+        return set(links.values_list('emergencyreport_id', flat=True))
+    links = links.filter(emergencyreport_id=instance.pk)
+    if pk_set is not None:
+        links = links.filter(emergencytag_id__in=pk_set)
+    return set(links.values_list('emergencytag_id', flat=True))
+
+
+@receiver(m2m_changed, sender=EmergencyReport.tags.through)
+def count_report_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep tag counters in step with report/tag links"""
+    if action in ('pre_remove', 'pre_clear'):
+        # Remember which links really exist before they are removed
+        instance._removed_tag_links = _linked_ids(instance, reverse, pk_set)
+        return
+    if action == 'post_add':
+        linked_ids, delta = pk_set, 1
+    elif action in ('post_remove', 'post_clear'):
+        linked_ids, delta = instance.__dict__.pop('_removed_tag_links', set()), -1
+    else:
+        return
+    if not linked_ids:
+        return
+    if reverse:
+        adjust_tag_counters_for_reports(instance.pk, linked_ids, delta)
+    else:
+        adjust_tag_counters(linked_ids, instance.status, delta)
+
+
+@receiver(pre_delete, sender=EmergencyReport)
+def uncount_deleted_report(sender, instance, **kwargs):
+    """Tag links are removed by cascade without m2m signals"""
+    adjust_tag_counters(_linked_ids(instance, False, None), instance.status, -1)
+
+
+@receiver(pre_delete, sender=ArchivedEmergencyReport)
+def uncount_deleted_archived_report(sender, instance, **kwargs):
+    """Archived reports stay counted as RESOLVED until they are deleted"""
+    tag_ids = ArchivedEmergencyReport.tags.through.objects.filter(
+        archivedemergencyreport_id=instance.pk
+    ).values_list('emergencytag_id', flat=True)
+    adjust_tag_counters(tag_ids, 'RESOLVED', -1)
+
+
+@receiver(post_delete, sender=EmergencyReport)
+def leave_tombstone(sender, instance, **kwargs):
+    """Let clients syncing through changes-since learn about the deletion"""
+    EmergencyReportTombstone.objects.update_or_create(
+        report_id=instance.pk,
+        defaults={'reporter_id': instance.reporter_id, 'deleted_at': timezone.now()}
+    )
+
+
+@receiver(m2m_changed, sender=EmergencyReport.tags.through)
+def touch_retagged_reports(sender, instance, action, reverse, pk_set, **kwargs):
+    """Tags are part of a report's representation, so retagging is a change"""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            reports = EmergencyReport.objects.filter(pk=instance.pk)
+        else:
+            return
+    elif action in ('post_add', 'post_remove') and pk_set:
+        reports = EmergencyReport.objects.filter(pk__in=pk_set)
+    elif action == 'pre_clear':
+        reports = EmergencyReport.objects.filter(tags=instance)
+    else:
+        return
+    reports.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=EmergencyTag)
+@receiver(post_delete, sender=EmergencyTag)
+def invalidate_tag_registry(sender, **kwargs):
+    """Make every process reload its cached tags"""
+    bump_generation(GENERATION_KEY)
+    transaction.on_commit(tag_registry.invalidate)
@@ -0,0 +1,84 @@
+"""
+Fixed latitude/longitude grid used to bucket emergency reports spatially.
+
+Every report stores the key of the grid cell it falls in, so proximity
+queries only have to read the handful of cells that overlap the search
+circle instead of every active report in the table.
+"""
+import math
+
+# Size of a grid cell in degrees (~11 km north/south). Changing this value
+# invalidates every stored cell key, so existing rows must be re-bucketed.
+GRID_CELL_DEGREES = 0.1
+
+# Above this many cells a radius query is wide enough that filtering on the
+# cell index no longer helps, so callers fall back to a plain scan.
+MAX_QUERY_CELLS = 400
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE_LAT = 111.32
+
+_ROWS = int(round(180 / GRID_CELL_DEGREES))
+_COLS = int(round(360 / GRID_CELL_DEGREES))
+
+
+def _row(lat):
+    return min(max(int(math.floor((lat + 90) / GRID_CELL_DEGREES)), 0), _ROWS - 1)
+
+
+def _col(lng):
+    return int(math.floor((lng + 180) / GRID_CELL_DEGREES)) % _COLS
+
+
+def grid_cell_for(lat, lng):
+    """
+    Return the grid cell key for a coordinate, or None if it is incomplete
+    """
+    if lat is None or lng is None:
+        return None
+    return f"{_row(float(lat))}:{_col(float(lng))}"
+
+
+def cells_within_radius(lat, lng, radius_km):
+    """
+    Return the keys of every grid cell overlapping a circle around a point.
+
+    Returns None when the circle covers more than MAX_QUERY_CELLS cells, in
+    which case the cell filter should be skipped.
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(lat - d_lat, -90.0)
+    max_lat = min(lat + d_lat, 90.0)
+
+    # Longitude degrees shrink towards the poles, so size the box for the
+    # latitude in the band that is furthest from the equator
+    widest = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest))
+    if cos_lat < 1e-6:
+        return None
+    d_lng = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if d_lng >= 180:
+        return None
+
+    rows = range(_row(min_lat), _row(max_lat) + 1)
+    first_col = int(math.floor((lng - d_lng + 180) / GRID_CELL_DEGREES))
+    last_col = int(math.floor((lng + d_lng + 180) / GRID_CELL_DEGREES))
+    cols = {col % _COLS for col in range(first_col, last_col + 1)}
+
+    if len(rows) * len(cols) > MAX_QUERY_CELLS:
+        return None
+    return [f"{row}:{col}" for row in rows for col in sorted(cols)]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Calculate distance between two points using Haversine formula
+    Returns distance in kilometers
+    """
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = math.sin(d_lat / 2) * math.sin(d_lat / 2) + \
+        math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * \
+        math.sin(d_lon / 2) * math.sin(d_lon / 2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
@@ -0,0 +1,301 @@
+"""
+Server-sent event stream of report activity for responder dashboards.
+
+Clients open GET /api/emergency/stream/ and receive report_created,
+status_changed and resolved events instead of polling the dashboard and
+nearby endpoints. Each process runs a single poller that tails the
+EmergencyStatusEvent table and fans new events out to every connected
+client, so database load does not grow with the number of clients.
+
+Like the changes-since endpoint, the stream holds back events newer than
+CHANGES_SETTLE_SECONDS: a slower transaction can still commit an event
+with a lower id, and the poller must not move past it.
+
+Streams need an ASGI server (e.g. `uvicorn config.asgi:application`).
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from config.renderers import ORJSONRenderer
+from firebase_auth.authentication import FirebaseAuthentication
+from .spatial import haversine_km
+
+logger = logging.getLogger(__name__)
+
+# Emergency services whose work matches a tag emergency type only receive
+# events of that type. The others (POLICE, RED_CRESCENT) have no matching
+# type in EmergencyTag.EMERGENCY_TYPE_CHOICES and receive every event.
+ROLE_EMERGENCY_TYPES = {
+    'FIRE_STATION': 'FIRE',
+}
+
+# Roles that follow all reports, not only their own
+SERVICE_ROLES = ('FIRE_STATION', 'POLICE', 'RED_CRESCENT')
+
+# Events replayed to a client reconnecting with Last-Event-ID
+MAX_REPLAY_EVENTS = 500
+
+_renderer = ORJSONRenderer()
+
+
+def _settled():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'CHANGES_SETTLE_SECONDS', 2))
+
+
+def load_events(after_id, limit=1000):
+    """
+    Settled status events with an id above after_id, oldest first, as
+    stream payloads. Stops at the first event that has not settled yet, so
+    the last id returned is safe to continue from.
+    """
+    from .models import EmergencyReport, EmergencyStatusEvent
+
+    settled = _settled()
+    rows = list(
+        EmergencyStatusEvent.objects.filter(id__gt=after_id).order_by('id').values(
+            'id', 'report_id', 'from_status', 'to_status', 'timestamp',
+            'report__reporter_id', 'report__description', 'report__latitude', 'report__longitude',
+            'report__is_emergency', 'report__incident_id',
+        )[:limit]
+    )
+    for index, row in enumerate(rows):
+        if row['timestamp'] > settled:
+            rows = rows[:index]
+            break
+    emergency_types = {}
+    if rows:
+        links = EmergencyReport.tags.through.objects.filter(
+            emergencyreport_id__in={row['report_id'] for row in rows}
+        ).values_list('emergencyreport_id', 'emergencytag__emergency_type')
+        for report_id, emergency_type in links:
+            emergency_types.setdefault(report_id, set()).add(emergency_type)
+
+    events = []
+    for row in rows:
+        if row['from_status'] is None:
+            event_type = 'report_created'
+        elif row['to_status'] == 'RESOLVED':
+            event_type = 'resolved'
+        else:
+            event_type = 'status_changed'
+        events.append({
+            'id': row['id'],
+            'type': event_type,
+            'timestamp': row['timestamp'],
+            'reporter_id': row['report__reporter_id'],
+            'report': {
+                'id': row['report_id'],
+                'description': row['report__description'],
+                'latitude': row['report__latitude'],
+                'longitude': row['report__longitude'],
+                'is_emergency': row['report__is_emergency'],
+                'incident': row['report__incident_id'],
+                'from_status': row['from_status'],
+                'status': row['to_status'],
+                'emergency_types': sorted(emergency_types.get(row['report_id'], ())),
+            },
+        })
+    return events
+
+
+def latest_event_id():
+    """Where a new poller starts: just before the first event not settled yet"""
+    from .models import EmergencyStatusEvent
+
+    unsettled = EmergencyStatusEvent.objects.filter(timestamp__gt=_settled()).order_by(
+        'id'
+    ).values_list('id', flat=True).first()
+    if unsettled is not None:
+        return unsettled - 1
+    return EmergencyStatusEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+class Subscription:
+    """One connected client: its filters and a bounded queue of pending events"""
+
+    def __init__(self, user, lat=None, lng=None, radius_km=None):
+        self.user = user
+        self.lat = lat
+        self.lng = lng
+        self.radius_km = radius_km
+        self.queue = asyncio.Queue(maxsize=getattr(settings, 'STREAM_QUEUE_SIZE', 100))
+        self.overflowed = False
+
+    def matches(self, event):
+        user = self.user
+        report = event['report']
+        if not user.is_staff:
+            if user.role in ROLE_EMERGENCY_TYPES:
+                if ROLE_EMERGENCY_TYPES[user.role] not in report['emergency_types']:
+                    return False
+            elif user.role not in SERVICE_ROLES and event['reporter_id'] != user.id:
+                # Citizens only follow their own reports
+                return False
+        if self.radius_km is not None:
+            if report['latitude'] is None or report['longitude'] is None:
+                return False
+            distance = haversine_km(self.lat, self.lng, report['latitude'], report['longitude'])
+            if distance > self.radius_km:
+                return False
+        return True
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up; the client reconnects with Last-Event-ID
+            self.overflowed = True
+
+
+class IncidentEventHub:
+    """
+    Tails the status event table once per process and fans events out to
+    every subscription. The poller only runs while clients are connected.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._task = None
+        self._last_id = None
+
+    @property
+    def poll_seconds(self):
+        return getattr(settings, 'STREAM_POLL_SECONDS', 1)
+
+    def subscribe(self, subscription):
+        self._subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+
+    async def _run(self):
+        if self._last_id is None:
+            self._last_id = await sync_to_async(latest_event_id)()
+        while self._subscriptions:
+            try:
+                events = await sync_to_async(load_events)(self._last_id)
+            except Exception:
+                logger.exception("Failed to load status events for the stream")
+                events = []
+            for event in events:
+                self._last_id = event['id']
+                for subscription in list(self._subscriptions):
+                    if subscription.matches(event):
+                        subscription.push(event)
+            if not events:
+                await asyncio.sleep(self.poll_seconds)
+        # Forget the position so a later client does not get a backlog
+        self._last_id = None
+
+
+hub = IncidentEventHub()
+
+
+def format_event(event):
+    data = _renderer.render(event).decode()
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+def authenticate(request):
+    """
+    Resolve the user from a JWT or a Firebase ID token, as the REST API
+    does, in the Authorization header or, for EventSource clients that
+    cannot set headers, the ?token= parameter
+    """
+    firebase = FirebaseAuthentication()
+    if request.headers.get('Authorization', '').startswith('Firebase '):
+        result = firebase.authenticate(request)
+        return result[0] if result is not None else None
+
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw_token = auth.get_raw_token(header) if header else None
+    from_query = raw_token is None
+    if from_query:
+        token = request.GET.get('token')
+        raw_token = token.encode() if token else None
+    if raw_token is None:
+        return None
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        if not from_query:
+            return None
+    # Not one of our JWTs: the query token may be a Firebase ID token
+    return firebase.authenticate_credentials(raw_token.decode())
+
+
+async def event_stream(subscription, last_event_id=None):
+    """
+    Replay the events after last_event_id, if given, then follow the hub.
+    The replay is read after subscribing, so no event falls between the
+    two; events found in both are only sent once.
+    """
+    heartbeat = getattr(settings, 'STREAM_HEARTBEAT_SECONDS', 15)
+    hub.subscribe(subscription)
+    try:
+        yield 'retry: 3000\n\n'
+        sent_id = last_event_id
+        if last_event_id is not None:
+            for event in await sync_to_async(load_events)(last_event_id, MAX_REPLAY_EVENTS):
+                sent_id = event['id']
+                if subscription.matches(event):
+                    yield format_event(event)
+        while not subscription.overflowed:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing idle connections
+                yield ': ping\n\n'
+                continue
+            if sent_id is not None and event['id'] <= sent_id:
+                continue
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+def _float_param(request, name):
+    value = request.GET.get(name)
+    return float(value) if value not in (None, '') else None
+
+
+async def incident_stream(request):
+    """
+    Stream report activity as server-sent events.
+
+    Optional lat, lng and radius (km) restrict events to an area.
+    """
+    user = await sync_to_async(authenticate)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+
+    try:
+        lat = _float_param(request, 'lat')
+        lng = _float_param(request, 'lng')
+        radius = _float_param(request, 'radius')
+    except ValueError:
+        return JsonResponse({'error': 'lat, lng and radius must be numbers'}, status=400)
+    if radius is not None and (lat is None or lng is None):
+        return JsonResponse({'error': 'lat and lng are required with radius'}, status=400)
+    if radius is None and lat is not None and lng is not None:
+        radius = 5.0
+
+    last_event_id = request.headers.get('Last-Event-ID')
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    subscription = Subscription(user, lat, lng, radius)
+    response = StreamingHttpResponse(event_stream(subscription, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
@@ -0,0 +1,139 @@
+"""
+Process-local cache of every EmergencyTag.
+
+Tags are few and rarely change, so each process keeps them in memory to
+resolve tag_ids and render nested tags without touching the tag table.
+Writes bump a generation counter stored in the database (see
+config.generations) and every process reloads once it sees a newer
+generation, checking at most every TAG_REGISTRY_CHECK_SECONDS.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+from config.generations import current_generation
+
+GENERATION_KEY = 'emergency_tags'
+
+TAG_FIELDS = ['id', 'name', 'emergency_type', 'description']
+
+
+class TagRegistry:
+    def __init__(self, check_seconds=None):
+        self._lock = threading.Lock()
+        self._tags = {}
+        self._generation = None
+        self._checked_at = None
+        self._check_seconds = check_seconds
+
+    @property
+    def check_seconds(self):
+        if self._check_seconds is not None:
+            return self._check_seconds
+        return getattr(settings, 'TAG_REGISTRY_CHECK_SECONDS', 5)
+
+    def ensure_current(self, force=False):
+        """Reload the tags if another process changed them"""
+        checked_at = self._checked_at
+        if not force and checked_at is not None and time.monotonic() - checked_at < self.check_seconds:
+            return
+        with self._lock:
+            generation = current_generation(GENERATION_KEY)
+            if generation != self._generation or self._checked_at is None:
+                self._load(generation)
+            self._checked_at = time.monotonic()
+
+    def _load(self, generation):
+        from .models import EmergencyTag
+
+        tags = {}
+        for row in EmergencyTag.objects.values(*TAG_FIELDS):
+            # Rendered the same way as EmergencyTagSerializer
+            tags[row['id']] = {
+                'id': str(row['id']),
+                'name': row['name'],
+                'emergency_type': row['emergency_type'],
+                'description': row['description'],
+            }
+        self._tags = tags
+        self._generation = generation
+
+    def invalidate(self):
+        """Drop this process's copy; the next read reloads it"""
+        with self._lock:
+            self._checked_at = None
+
+    @property
+    def generation(self):
+        """Generation of the loaded tags, for use in cache validators"""
+        self.ensure_current()
+        return self._generation
+
+    def all(self):
+        self.ensure_current()
+        return list(self._tags.values())
+
+    def existing_ids(self, tag_ids):
+        """
+        Return the given tag ids that exist, in order and without duplicates.
+        Unknown ids are dropped, like a filter(id__in=...) query would.
+        """
+        tag_ids = [_as_uuid(tag_id) for tag_id in tag_ids]
+        self.ensure_current()
+        if any(tag_id not in self._tags for tag_id in tag_ids if tag_id is not None):
+            # Possibly created in another process since the last check
+            self.ensure_current(force=True)
+        tags = self._tags
+        return list(dict.fromkeys(tag_id for tag_id in tag_ids if tag_id in tags))
+
+    def render(self, tag_ids):
+        """Serialized tags for the given ids, ordered by name"""
+        self.ensure_current()
+        tags = self._tags
+        rendered = [tags[tag_id] for tag_id in tag_ids if tag_id in tags]
+        rendered.sort(key=lambda tag: (tag['name'], tag['id']))
+        return [dict(tag) for tag in rendered]
+
+
+def _as_uuid(value):
+    if isinstance(value, uuid.UUID):
+        return value
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def attach_tag_ids(reports):
+    """
+    Load the tag ids of many reports from the link table in one query and
+    remember them on each instance for tag_ids_for()
+    """
+    from .models import EmergencyReport
+
+    pending = {report.pk: report for report in reports if not hasattr(report, '_tag_ids')}
+    if not pending:
+        return
+    for report in pending.values():
+        report._tag_ids = []
+    links = EmergencyReport.tags.through.objects.filter(
+        emergencyreport_id__in=list(pending)
+    ).values_list('emergencyreport_id', 'emergencytag_id')
+    for report_id, tag_id in links:
+        pending[report_id]._tag_ids.append(tag_id)
+
+
+def tag_ids_for(report):
+    """Tag ids of a report, using ids attached in bulk when available"""
+    if not hasattr(report, '_tag_ids'):
+        prefetched = getattr(report, '_prefetched_objects_cache', {}).get('tags')
+        if prefetched is not None:
+            report._tag_ids = [tag.pk for tag in prefetched]
+        else:
+            attach_tag_ids([report])
+    return report._tag_ids
+
+
+tag_registry = TagRegistry()
@@ -1,3 +1,640 @@
-from django.test import TestCase
+import asyncio
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.renderers import ORJSONRenderer
+from notifications.models import Notification
+from notifications.versions import notifications_version
+from social.models import SocialOutbox
+from users.models import User
+from .archive import archive_resolved_reports
+from .live_index import live_index
+from .models import (
+    ArchivedEmergencyReport, ArchivedEmergencyResponseTiming, ArchivedEmergencyStatusEvent, EmergencyIncident, EmergencyReport, EmergencyReportTombstone, EmergencyStatusEvent, EmergencyTag,
+    EmergencyTagCounter
+)
+from .serializers import REPORT_ROW_FIELDS, EmergencyReportSerializer, serialize_report_rows
+from .services import rebuild_tag_counters, record_reports_created
+from .stream import Subscription, authenticate, event_stream, latest_event_id, load_events
+from .tag_registry import TagRegistry, tag_registry
+
+
+def make_user(username, role='CITIZEN', **extra):
+    return User.objects.create_user(username, f'{username}@example.com', 'pass', role=role, **extra)
+
+
+def make_report(reporter, **fields):
+    fields.setdefault('reporter_type', 'VICTIM')
+    fields.setdefault('description', 'Smoke from a building')
+    fields.setdefault('latitude', 38.4192)
+    fields.setdefault('longitude', 27.1287)
+    return EmergencyReport.objects.create(reporter=reporter, **fields)
+
+
+def make_tag(name, emergency_type='OTHER', **fields):
+    tag = EmergencyTag.objects.create(name=name, emergency_type=emergency_type, **fields)
+    # The registry reloads on commit, which never comes inside a TestCase
+    tag_registry.invalidate()
+    return tag
+
+
+class NearbyEmergenciesViewTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        live_index.clear()
+        self.addCleanup(live_index.clear)
+
+    def test_invalid_params_are_rejected(self):
+        for query in ['lat=x&lng=27', 'lat=38&lng=27&radius=x', 'lat=38&lng=27&limit=abc', 'lat=nan&lng=27']:
+            response = self.client.get(f'/api/emergency/nearby/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.json())
+
+    def test_missing_coordinates_return_nothing(self):
+        response = self.client.get('/api/emergency/nearby/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_reports_resolved_behind_the_index_are_not_returned(self):
+        active = make_report(self.user, is_emergency=True)
+        resolved = make_report(self.user, is_emergency=True)
+        live_index.warm()
+        # Resolved by another process: no signal reaches this index
+        EmergencyReport.objects.filter(pk=resolved.pk).update(status='RESOLVED')
+
+        response = self.client.get('/api/emergency/nearby/?lat=38.4192&lng=27.1287&radius=1')
+        self.assertEqual([row['id'] for row in response.json()], [str(active.pk)])
+
+
+class ReportListPaginationTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Two runs of reports sharing a timestamp, the case an offset
+        # fallback gets wrong
+        self.reports = [make_report(self.user) for _ in range(7)]
+        shared = timezone.now() - timedelta(minutes=5)
+        EmergencyReport.objects.filter(pk__in=[r.pk for r in self.reports[:4]]).update(timestamp=shared)
+        EmergencyReport.objects.filter(pk__in=[r.pk for r in self.reports[4:]]).update(
+            timestamp=shared - timedelta(minutes=1)
+        )
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            ids.append([row['id'] for row in body['results']])
+            url = body[link]
+        return ids
+
+    def expected(self, descending=True):
+        rows = EmergencyReport.objects.order_by(
+            *(('-timestamp', '-id') if descending else ('timestamp', 'id'))
+        ).values_list('id', flat=True)
+        return [str(pk) for pk in rows]
+
+    def test_pages_cover_every_report_once_in_order(self):
+        pages = self.walk('/api/emergency/reports/?page_size=3', 'next')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), self.expected())
+
+    def test_ascending_ordering(self):
+        pages = self.walk('/api/emergency/reports/?page_size=2&ordering=timestamp', 'next')
+        self.assertEqual(sum(pages, []), self.expected(descending=False))
+
+    def test_previous_links_walk_back(self):
+        url = '/api/emergency/reports/?page_size=3'
+        for _ in range(2):
+            url = self.client.get(url).json()['next']
+        last_page = self.client.get(url).json()
+        pages = self.walk(last_page['previous'], 'previous')
+        self.assertEqual(sum(reversed(pages), []) + [row['id'] for row in last_page['results']], self.expected())
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ['not-base64!', 'cD1bIngiLCAieSJd']:  # second: p=["x", "y"]
+            response = self.client.get(f'/api/emergency/reports/?cursor={cursor}')
+            self.assertEqual(response.status_code, 404)
+
+
+    def test_unchanged_list_is_answered_with_304(self):
+        url = '/api/emergency/reports/?page_size=3'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+        # Both validators move when a report changes
+        EmergencyReport.objects.filter(pk=self.reports[0].pk).update(
+            updated_at=timezone.now() + timedelta(seconds=2)
+        )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+class TagCounterTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag_a = make_tag('Fire', 'FIRE')
+        self.tag_b = make_tag('Flood', 'NATURAL')
+
+    def counters(self):
+        return {
+            counter.tag_id: (counter.total, counter.pending, counter.responding)
+            for counter in EmergencyTagCounter.objects.all()
+        }
+
+    def test_patch_of_status_and_tags_together(self):
+        response = self.client.post('/api/emergency/reports/', {
+            'reporter_type': 'VICTIM', 'description': 'Smoke', 'latitude': 38.4192, 'longitude': 27.1287,
+            'tag_ids': [str(self.tag_b.pk)],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        report_id = response.json()['id']
+
+        response = self.client.patch(f'/api/emergency/reports/{report_id}/', {
+            'status': 'RESPONDING', 'tag_ids': [str(self.tag_a.pk)],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+
+        counted = self.counters()
+        self.assertEqual(counted[self.tag_a.pk], (1, 0, 1))
+        self.assertEqual(counted[self.tag_b.pk], (0, 0, 0))
+        rebuild_tag_counters()
+        self.assertEqual(self.counters(), counted)
+
+
+
+class TagRegistryTests(TestCase):
+    def setUp(self):
+        tag_registry.invalidate()
+        self.fire = EmergencyTag.objects.create(name='Fire', emergency_type='FIRE')
+
+    def names(self, registry):
+        return sorted(tag['name'] for tag in registry.all())
+
+    def test_other_processes_reload_when_the_generation_changes(self):
+        # Two other processes: one checking on every read, one rarely
+        eager, lazy = TagRegistry(check_seconds=0), TagRegistry(check_seconds=3600)
+        self.assertEqual(self.names(eager), ['Fire'])
+        self.assertEqual(self.names(lazy), ['Fire'])
+        generation = eager.generation
+
+        self.fire.name = 'Wildfire'
+        self.fire.save()
+        flood = EmergencyTag.objects.create(name='Flood', emergency_type='NATURAL')
+        self.assertEqual(self.names(eager), ['Flood', 'Wildfire'])
+        self.assertEqual(eager.generation, generation + 2)
+        self.assertEqual(self.names(lazy), ['Fire'])
+
+        # An unknown id forces a check, so a new tag can be used at once
+        self.assertEqual(lazy.existing_ids([str(flood.pk), 'not-a-uuid']), [flood.pk])
+        self.assertEqual(self.names(lazy), ['Flood', 'Wildfire'])
+
+        self.fire.delete()
+        self.assertEqual(self.names(eager), ['Flood'])
+
+    def test_this_process_reloads_once_the_write_commits(self):
+        self.assertEqual(self.names(tag_registry), ['Fire'])
+        with self.captureOnCommitCallbacks(execute=True):
+            EmergencyTag.objects.create(name='Flood', emergency_type='NATURAL')
+        self.assertEqual(self.names(tag_registry), ['Fire', 'Flood'])
+
+class StreamTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.report = make_report(self.user)
+
+    def add_event(self, seconds_ago, to_status='PENDING'):
+        return EmergencyStatusEvent.objects.create(
+            report=self.report, to_status=to_status, timestamp=timezone.now() - timedelta(seconds=seconds_ago)
+        )
+
+    def test_events_are_held_back_until_settled(self):
+        first = self.add_event(10)
+        self.add_event(0)
+        # Older than its predecessor, but must not be delivered before it
+        self.add_event(10, 'RESPONDING')
+
+        self.assertEqual([event['id'] for event in load_events(0)], [first.pk])
+        self.assertEqual(latest_event_id(), first.pk)
+        EmergencyStatusEvent.objects.update(timestamp=timezone.now() - timedelta(seconds=10))
+        self.assertEqual(len(load_events(first.pk)), 2)
+
+    def test_authenticate_accepts_jwt_and_firebase_tokens(self):
+        factory = RequestFactory()
+        jwt = str(AccessToken.for_user(self.user))
+        self.assertEqual(authenticate(factory.get('/', HTTP_AUTHORIZATION=f'Bearer {jwt}')), self.user)
+        self.assertEqual(authenticate(factory.get('/', {'token': jwt})), self.user)
+
+        with mock.patch(
+            'firebase_auth.authentication.FirebaseAuthentication.authenticate_credentials', return_value=self.user
+        ) as verify:
+            self.assertEqual(authenticate(factory.get('/', HTTP_AUTHORIZATION='Firebase id-token')), self.user)
+            self.assertEqual(authenticate(factory.get('/', {'token': 'id-token'})), self.user)
+        self.assertEqual([call.args for call in verify.call_args_list], [('id-token',), ('id-token',)])
+
+        self.assertIsNone(authenticate(factory.get('/', HTTP_AUTHORIZATION='Bearer bad')))
+
+    def event(self, event_id, emergency_types=(), reporter_id=None):
+        return {
+            'id': event_id, 'type': 'status_changed', 'timestamp': timezone.now(),
+            'reporter_id': reporter_id or self.user.id,
+            'report': {
+                'id': self.report.pk, 'latitude': 38.4192, 'longitude': 27.1287,
+                'emergency_types': list(emergency_types),
+            },
+        }
+
+    def test_services_receive_the_events_of_their_work(self):
+        other = make_user('other').id
+        fire = self.event(1, ['FIRE'], other)
+        flood = self.event(2, ['NATURAL'], other)
+        cases = [
+            ('FIRE_STATION', [True, False]),
+            ('POLICE', [True, True]),
+            ('RED_CRESCENT', [True, True]),
+            ('CITIZEN', [False, False]),
+        ]
+        for role, expected in cases:
+            subscription = Subscription(make_user(f'{role.lower()}-user', role=role))
+            self.assertEqual([subscription.matches(fire), subscription.matches(flood)], expected, role)
+        self.assertTrue(Subscription(self.user).matches(self.event(3)))
+
+    def test_replay_and_live_events_are_not_sent_twice(self):
+        subscription = Subscription(self.user)
+        # Already delivered by the hub when the replay is read
+        for event_id in (6, 7):
+            subscription.queue.put_nowait(self.event(event_id))
+
+        async def collect():
+            stream = event_stream(subscription, last_event_id=5)
+            chunks = [await stream.__anext__() for _ in range(3)]
+            await stream.aclose()
+            return chunks
+
+        with mock.patch('emergency.stream.hub'), \
+                mock.patch('emergency.stream.load_events', return_value=[self.event(6)]) as replay:
+            chunks = asyncio.run(collect())
+        replay.assert_called_once_with(5, 500)
+        self.assertEqual(chunks[0], 'retry: 3000\n\n')
+        self.assertEqual([chunk.split('\n')[0] for chunk in chunks[1:]], ['id: 6', 'id: 7'])
+
+
+class ORJSONRendererTests(TestCase):
+    def test_output_matches_the_stock_renderer(self):
+        data = {
+            'id': uuid.uuid4(),
+            'timestamp': timezone.now(),
+            'amount': Decimal('1.50'),
+            'text': 'Yangın \u2028 line',
+            'nested': [{'value': None, 'flag': True}],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_report_api_round_trip(self):
+        user = make_user('citizen')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(
+            '/api/emergency/reports/',
+            '{"reporter_type": "VICTIM", "description": "Duman \u00e7\u0131k\u0131yor", "latitude": 38.4192, "longitude": 27.1287}',
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        report = EmergencyReport.objects.get()
+        self.assertEqual(report.description, 'Duman çıkıyor')
+
+        response = client.get(f'/api/emergency/reports/{report.pk}/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_malformed_json_is_rejected(self):
+        client = APIClient()
+        client.force_authenticate(make_user('citizen'))
+        response = client.post('/api/emergency/reports/', '{"description": ', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+
+class ReportRowSerializerTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        fire = make_tag('Fire', 'FIRE')
+        smoke = make_tag('Smoke', 'OTHER', description='Visible smoke')
+        incident = EmergencyIncident.objects.create(latitude=38.4192, longitude=27.1287)
+        self.tagged = make_report(self.user, is_emergency=True, status='RESPONDING', incident=incident)
+        self.tagged.tags.add(smoke, fire)
+        make_report(self.user, reporter_type='SPECTATOR', latitude=None, longitude=None, description='Yangın')
+        self.unknown = make_report(self.user, status='UNKNOWN')
+
+    def test_rows_render_like_the_model_serializer(self):
+        reports = EmergencyReport.objects.order_by('pk')
+        expected = EmergencyReportSerializer(reports, many=True).data
+        rows = serialize_report_rows(reports.values(*REPORT_ROW_FIELDS))
+        # Compare what clients receive
+        self.assertEqual(JSONRenderer().render(rows), JSONRenderer().render(expected))
+        rows = {row['id']: row for row in rows}
+        self.assertEqual([tag['name'] for tag in rows[str(self.tagged.pk)]['tags']], ['Fire', 'Smoke'])
+        self.assertEqual(rows[str(self.unknown.pk)]['status_display'], 'UNKNOWN')
+
+    def test_list_endpoint_matches_the_detail_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        listed = client.get('/api/emergency/reports/').json()
+        listed = listed.get('results', listed)
+        self.assertEqual(len(listed), 3)
+        for row in listed:
+            self.assertEqual(row, client.get(f"/api/emergency/reports/{row['id']}/").json())
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.tag = make_tag('Fire', 'FIRE')
+        self.long_ago = timezone.now() - timedelta(days=400)
+        self.old = [make_report(self.user, status='RESOLVED') for _ in range(3)]
+        record_reports_created(self.old, self.user)
+        self.old[0].tags.add(self.tag)
+        EmergencyReport.objects.filter(pk__in=[r.pk for r in self.old]).update(
+            timestamp=self.long_ago, updated_at=self.long_ago
+        )
+        self.recent = make_report(self.user, status='RESOLVED')
+        self.notification = Notification.objects.create(
+            recipient=self.user, title='Resolved', message='Done', emergency_report=self.old[0]
+        )
+
+    def test_old_resolved_reports_are_moved_in_chunks(self):
+        counters = list(EmergencyTagCounter.objects.values_list('tag_id', 'total', 'resolved'))
+        events = list(EmergencyStatusEvent.objects.values_list('id', 'report_id', 'to_status').order_by('id'))
+        version = notifications_version(self.user.id)
+        self.assertEqual(archive_resolved_reports(chunk_size=2), 3)
+
+        self.assertEqual(list(EmergencyReport.objects.values_list('id', flat=True)), [self.recent.pk])
+        self.assertEqual(ArchivedEmergencyReport.objects.count(), 3)
+        archived = ArchivedEmergencyReport.objects.get(pk=self.old[0].pk)
+        self.assertEqual(list(archived.tags.all()), [self.tag])
+        self.notification.refresh_from_db()
+        self.assertIsNone(self.notification.emergency_report_id)
+        self.assertEqual(self.notification.archived_report_id, self.old[0].pk)
+        self.assertNotEqual(notifications_version(self.user.id), version)
+
+        # Status history and response timings move with the reports
+        self.assertEqual(
+            list(ArchivedEmergencyStatusEvent.objects.values_list('id', 'report_id', 'to_status').order_by('id')),
+            events
+        )
+        self.assertEqual(ArchivedEmergencyResponseTiming.objects.count(), 3)
+        self.assertFalse(EmergencyStatusEvent.objects.exists())
+
+        # Archiving is not a deletion
+        self.assertFalse(EmergencyReportTombstone.objects.exists())
+        self.assertEqual(list(EmergencyTagCounter.objects.values_list('tag_id', 'total', 'resolved')), counters)
+        rebuild_tag_counters()
+        self.assertEqual(list(EmergencyTagCounter.objects.values_list('tag_id', 'total', 'resolved')), counters)
+
+    def test_history_includes_the_archive_only_when_the_range_reaches_it(self):
+        archive_resolved_reports()
+        start = (self.long_ago - timedelta(days=1)).date().isoformat()
+        response = self.client.get(f'/api/emergency/reports/history/?start={start}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['id'] for row in response.json()],
+            [str(self.recent.pk)] + sorted((str(r.pk) for r in self.old), reverse=True)
+        )
+
+        start = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response = self.client.get(f'/api/emergency/reports/history/?start={start}')
+        self.assertEqual([row['id'] for row in response.json()], [str(self.recent.pk)])
+
+        start = (self.long_ago - timedelta(days=1)).date().isoformat()
+        response = self.client.get(f'/api/emergency/reports/history/?start={start}&limit=2')
+        self.assertEqual(len(response.json()), 2)
+
+        for query in ['', 'start=yesterday', f'start={start}&limit=abc', f'start={start}&limit=-1']:
+            response = self.client.get(f'/api/emergency/reports/history/?{query}')
+            self.assertEqual(response.status_code, 400)
+
+
+class IncidentClusteringTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def report(self, is_emergency=True, latitude=38.4192, **extra):
+        response = self.client.post('/api/emergency/reports/', {
+            'reporter_type': 'VICTIM', 'description': 'Smoke', 'latitude': latitude, 'longitude': 27.1287,
+            'is_emergency': is_emergency, **extra,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_emergency_after_nearby_routine_report_is_posted(self):
+        routine = self.report(is_emergency=False)
+        self.assertIsNone(routine['incident'])
+        self.assertNotIn('social_post_status', routine)
+
+        emergency = self.report(latitude=38.4193)
+        self.assertEqual(emergency['social_post_status'], 'QUEUED')
+        self.assertIsNotNone(emergency['incident'])
+        self.assertEqual(SocialOutbox.objects.count(), 1)
+
+    def test_nearby_emergencies_share_an_incident_and_one_post(self):
+        first = self.report()
+        second = self.report(latitude=38.4193)
+        self.assertEqual(first['social_post_status'], 'QUEUED')
+        self.assertEqual(second['social_post_status'], 'DUPLICATE')
+        self.assertEqual(second['incident'], first['incident'])
+        self.assertEqual(SocialOutbox.objects.count(), 1)
+
+        # Far away: a separate incident
+        far = self.report(latitude=38.5)
+        self.assertEqual(far['social_post_status'], 'QUEUED')
+        self.assertNotEqual(far['incident'], first['incident'])
+
+    def test_routine_multi_location_reports_have_no_incident(self):
+        response = self.client.post('/api/emergency/reports/multi_location/', {
+            'reporter_type': 'VICTIM', 'description': 'Flooded streets', 'is_emergency': False,
+            'locations': [{'latitude': 38.4192, 'longitude': 27.1287}, {'latitude': 38.42, 'longitude': 27.13}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertFalse(EmergencyReport.objects.exclude(incident=None).exists())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        make_report(self.user, description='Smoke from a warehouse roof')
+        make_report(self.user, description='Smoke near the harbour')
+        make_report(self.user, description='Flooded underpass')
+
+    def test_search_matches_every_word(self):
+        response = self.client.get('/api/emergency/reports/search/?search=smoke')
+        self.assertEqual(len(response.json()), 2)
+        response = self.client.get('/api/emergency/reports/search/?search=smoke harb')
+        self.assertEqual([row['description'] for row in response.json()], ['Smoke near the harbour'])
+
+    def test_limit(self):
+        response = self.client.get('/api/emergency/reports/search/?search=smoke&limit=1')
+        self.assertEqual(len(response.json()), 1)
+        for limit in ['abc', '-1', '0', '1.5']:
+            response = self.client.get(f'/api/emergency/reports/search/?search=smoke&limit={limit}')
+            self.assertEqual(response.status_code, 400, limit)
+            self.assertIn('error', response.json())
+
+
+class ChangesSinceTests(TestCase):
+    url = '/api/emergency/reports/changes-since/'
+
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.reports = [make_report(self.user) for _ in range(3)]
+        self.settle()
+
+    def settle(self):
+        """Move the latest changes out of the settle window, keeping their order"""
+        now = timezone.now()
+        recent = now - timedelta(seconds=30)
+        past = now - timedelta(minutes=1)
+        EmergencyReport.objects.filter(updated_at__gt=recent).update(updated_at=past)
+        EmergencyReportTombstone.objects.filter(deleted_at__gt=recent).update(deleted_at=past)
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_full_sync_then_only_new_changes(self):
+        body = self.sync()
+        self.assertEqual({row['id'] for row in body['changes']}, {str(r.pk) for r in self.reports})
+        self.assertEqual({row['change'] for row in body['changes']}, {'created'})
+        self.assertFalse(body['has_more'])
+        self.assertEqual(self.sync(body['cursor'])['changes'], [])
+
+        updated, deleted = self.reports[0], self.reports[1]
+        updated.status = 'RESOLVED'
+        updated.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        # Too recent: held back until they settle
+        body = self.sync(body['cursor'])
+        self.assertEqual((body['changes'], body['deleted']), ([], []))
+
+        self.settle()
+        body = self.sync(body['cursor'])
+        self.assertEqual([(row['id'], row['change']) for row in body['changes']], [(str(updated.pk), 'resolved')])
+        self.assertEqual(body['deleted'], [str(deleted_id)])
+
+    def test_changes_and_deletions_are_paged_together(self):
+        deleted_id = self.reports[0].pk
+        self.reports[0].delete()
+        self.settle()
+        seen, deleted, cursor = [], [], None
+        while True:
+            body = self.sync(cursor, limit=1)
+            self.assertLessEqual(len(body['changes']) + len(body['deleted']), 1)
+            seen += [row['id'] for row in body['changes']]
+            deleted += body['deleted']
+            cursor = body['cursor']
+            if not body['has_more']:
+                break
+        self.assertEqual(sorted(seen), sorted(str(r.pk) for r in self.reports[1:]))
+        self.assertEqual(deleted, [str(deleted_id)])
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ['cursor=not-a-cursor', 'limit=abc', 'limit=-5', 'limit=0']:
+            response = self.client.get(f'{self.url}?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.json())
+
+
+class BulkStatusTests(TestCase):
+    url = '/api/emergency/reports/bulk-status/'
+
+    def setUp(self):
+        self.citizen = make_user('citizen')
+        self.station = make_user('station', role='FIRE_STATION')
+        self.client = APIClient()
+        self.client.force_authenticate(self.station)
+        self.tag = make_tag('Fire', 'FIRE')
+        self.pending = make_report(self.citizen)
+        self.resolved = make_report(self.citizen, status='RESOLVED')
+        self.responding = make_report(self.citizen, status='RESPONDING')
+        reports = [self.pending, self.resolved, self.responding]
+        record_reports_created(reports, self.citizen)
+        for report in reports:
+            report.tags.add(self.tag)
+
+    def bulk(self, status, *reports, missing=()):
+        return self.client.post(self.url, {
+            'status': status, 'report_ids': [str(report.pk) for report in reports] + [str(pk) for pk in missing],
+        }, format='json')
+
+    def test_any_transition_is_allowed_as_for_a_single_report(self):
+        missing = uuid.uuid4()
+        response = self.bulk('RESPONDING', self.pending, self.resolved, self.responding, missing=[missing])
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual(sorted(body['updated']), sorted([str(self.pending.pk), str(self.resolved.pk)]))
+        self.assertEqual(body['skipped'], [
+            {'id': str(self.responding.pk), 'error': 'Already RESPONDING'},
+            {'id': str(missing), 'error': 'Report not found'},
+        ])
+        self.assertEqual(
+            set(EmergencyReport.objects.values_list('status', flat=True)), {'RESPONDING'}
+        )
+        self.assertTrue(EmergencyStatusEvent.objects.filter(
+            report=self.resolved, from_status='RESOLVED', to_status='RESPONDING', actor=self.station
+        ).exists())
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.citizen, notification_type='UPDATE').count(), 2
+        )
+
+        counted = list(EmergencyTagCounter.objects.values_list('total', 'pending', 'responding', 'resolved'))
+        self.assertEqual(counted, [(3, 0, 3, 0)])
+        rebuild_tag_counters()
+        self.assertEqual(
+            list(EmergencyTagCounter.objects.values_list('total', 'pending', 'responding', 'resolved')), counted
+        )
+
+    def test_single_and_bulk_updates_agree(self):
+        other = make_report(self.citizen, status='RESOLVED')
+        record_reports_created([other], self.citizen)
+        response = self.client.post(
+            f'/api/emergency/reports/{other.pk}/update_status/', {'status': 'PENDING'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        response = self.bulk('PENDING', self.resolved)
+        self.assertEqual(response.json()['updated'], [str(self.resolved.pk)])
+        self.assertEqual(
+            list(EmergencyReport.objects.filter(pk__in=[other.pk, self.resolved.pk]).values_list('status', flat=True)),
+            ['PENDING', 'PENDING']
+        )
+
+    def test_responders_only(self):
+        self.client.force_authenticate(self.citizen)
+        self.assertEqual(self.bulk('RESOLVED', self.pending).status_code, 403)
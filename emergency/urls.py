@@ -7,6 +7,7 @@ from .views import (
     NearbyEmergenciesView,
     EmergencyStatsByTagView
 )
+from .stream import incident_stream
 
 router = DefaultRouter()
 # Ensure trailing slashes for viewsets
@@ -18,4 +19,5 @@ urlpatterns = [
     # Add trailing slashes to other URLs
     path('nearby/', NearbyEmergenciesView.as_view(), name='nearby-emergencies'),
     path('stats/tags/', EmergencyStatsByTagView.as_view(), name='emergency-tag-stats'),
+    path('stream/', incident_stream, name='incident-stream'),
 ]
@@ -1,23 +1,102 @@
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime
 from rest_framework import generics, mixins, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 from django_filters.rest_framework import DjangoFilterBackend
-import math
-from django.db.models import F, Func
 import logging
 
-from .models import EmergencyReport, EmergencyTag
-from .serializers import EmergencyReportSerializer, EmergencyTagSerializer
+from .models import ArchivedEmergencyReport, EmergencyReport, EmergencyTag, EmergencyTagCounter
+from .serializers import (
+    REPORT_ROW_FIELDS, STATUS_DISPLAY, BulkStatusUpdateSerializer, EmergencyReportSerializer,
+    EmergencyTagSerializer, ReportLocationSerializer, serialize_report_rows
+)
+from .spatial import cells_within_radius
+from .distance import coordinate_arrays, nearest_within
+from .live_index import live_index
+from .pagination import KeysetCursorPagination
+from .tag_registry import tag_registry
+from .search import FullTextSearchFilter, search_terms
+from .archive import reports_in_range
+from .changes import (
+    InvalidCursor, changes_since, decode_cursor, encode_cursor, last_change, visible_tombstones
+)
+from .services import (
+    adjust_tag_counters, attach_to_incident, change_report_statuses, record_report_created, record_reports_created,
+    record_status_change
+)
 from users.permissions import IsCitizen, IsFireStation, IsPolice, IsRedCrescent
 from notifications.models import Notification
+from notifications.versions import bump_notifications
 from users.models import User
-from social.views import post_emergency_to_social_media
+from social.services import enqueue_emergency_post
+from config.conditional import ConditionalGetMixin
+from config.params import parse_limit_param, parse_point_params
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+class EmergencyReportCursorPagination(KeysetCursorPagination):
+    """
+    Keyset pagination over (timestamp, id): cursors carry both values, so
+    every page costs the same, even among reports sharing a timestamp,
+    and no COUNT(*) is issued
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-timestamp', '-id')
+
+class ReportOrderingFilter(filters.OrderingFilter):
+    """Ordering filter that always breaks timestamp ties on id"""
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') == 'id' for field in ordering):
+            ordering = list(ordering) + ['-id' if ordering[0].startswith('-') else 'id']
+        return ordering
+
+def parse_time_param(value):
+    """Parse an ISO 8601 date or datetime query parameter (None if absent)"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        parsed = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def tag_counts(tags):
+    """
+    Report counts for each tag, overall and per status, read from the
+    materialized counters in a single query
+    """
+    rows = tags.values(
+        'id', 'name', 'emergency_type', 'counter__total', 'counter__pending',
+        'counter__responding', 'counter__on_scene', 'counter__resolved'
+    )
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'emergency_type': row['emergency_type'],
+            'count': row['counter__total'] or 0,
+            'status_counts': {
+                status: row[f'counter__{field}'] or 0
+                for status, field in EmergencyTagCounter.STATUS_FIELDS.items()
+            }
+        }
+        for row in rows
+    ]
+
 class EmergencyTagViewSet(mixins.RetrieveModelMixin,
                           mixins.ListModelMixin,
                           GenericViewSet):
@@ -31,13 +110,10 @@ class EmergencyTagViewSet(mixins.RetrieveModelMixin,
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get statistics about emergency tags usage"""
-        tags_with_counts = EmergencyTag.objects.annotate(
-            count=Func(F('emergencyreport'), function='COUNT')
-        ).values('id', 'name', 'emergency_type', 'count')
-        
-        return Response(tags_with_counts)
+        return Response(tag_counts(EmergencyTag.objects.all()))
 
-class EmergencyReportViewSet(mixins.CreateModelMixin,
+class EmergencyReportViewSet(ConditionalGetMixin,
+                            mixins.CreateModelMixin,
                             mixins.RetrieveModelMixin,
                             mixins.UpdateModelMixin,
                             mixins.DestroyModelMixin,
@@ -47,17 +123,18 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
     API endpoint for emergency reports with mixins for better organization.
     """
     serializer_class = EmergencyReportSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = EmergencyReportCursorPagination
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, ReportOrderingFilter]
     filterset_fields = ['status', 'is_emergency', 'reporter_type']
     search_fields = ['description']
     ordering_fields = ['timestamp']
-    ordering = ['-timestamp']
+    ordering = ['-timestamp', '-id']
     
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action == 'update_status':
+        if self.action in ('update_status', 'bulk_update_status'):
             permission_classes = [permissions.IsAuthenticated, IsFireStation | IsPolice | IsRedCrescent]
         else:
             permission_classes = [permissions.IsAuthenticated]
@@ -71,22 +148,87 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
         """
         user = self.request.user
         if user.is_staff or user.role in ['FIRE_STATION', 'POLICE', 'RED_CRESCENT']:
-            return EmergencyReport.objects.all().select_related('reporter').prefetch_related('tags')
-        return EmergencyReport.objects.filter(reporter=user).select_related('reporter').prefetch_related('tags')
+            return EmergencyReport.objects.all().select_related('reporter')
+        return EmergencyReport.objects.filter(reporter=user).select_related('reporter')
+    
+    def get_archived_queryset(self):
+        """Archived reports, with the same visibility rules as get_queryset"""
+        user = self.request.user
+        if user.is_staff or user.role in ['FIRE_STATION', 'POLICE', 'RED_CRESCENT']:
+            return ArchivedEmergencyReport.objects.all()
+        return ArchivedEmergencyReport.objects.filter(reporter=user)
+    
+    def get_version(self, request):
+        """
+        The visible reports change when one is saved, retagged or deleted;
+        rendered tags also change when a tag is edited
+        """
+        changed = last_change(self.get_queryset(), visible_tombstones(request.user))
+        return (changed, tag_registry.generation), changed
+    
+    def list(self, request, *args, **kwargs):
+        """
+        List reports through the fast row serializer, reading only the
+        columns the response needs
+        """
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
+        queryset = self.filter_queryset(self.get_queryset()).values(*REPORT_ROW_FIELDS)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_report_rows(page))
+        return Response(serialize_report_rows(queryset))
     
     def perform_create(self, serializer):
         """
         Automatically set the current user as the reporter
         """
         logger.debug(f"Creating emergency report with serializer data: {serializer.validated_data}")
-        serializer.save(reporter=self.request.user)
+        self.save_report(serializer)
     
     def perform_create_and_get_instance(self, serializer):
         """
         Same as perform_create but returns the created instance
         """
         logger.debug(f"Creating emergency report with serializer data: {serializer.validated_data}")
-        return serializer.save(reporter=self.request.user)
+        report, _ = self.save_report(serializer)
+        return report
+    
+    def save_report(self, serializer):
+        """
+        Save a new report from the current user, attach it to a matching
+        incident (or start one) if it is an emergency and record its
+        initial status
+        
+        Returns:
+            tuple: (report, new_incident); new_incident is False for
+            reports that are not emergencies
+        """
+        data = serializer.validated_data
+        with transaction.atomic():
+            # Only emergencies form incidents, so an earlier routine report
+            # nearby cannot swallow the first alert of a real one
+            incident, new_incident = None, False
+            if data.get('is_emergency'):
+                incident, new_incident = attach_to_incident(
+                    data.get('latitude'),
+                    data.get('longitude'),
+                    tag_registry.existing_ids(data.get('tag_ids', []))
+                )
+            report = serializer.save(reporter=self.request.user, incident=incident)
+            record_report_created(report, self.request.user)
+        return report, new_incident
+    
+    def perform_update(self, serializer):
+        """
+        Save the report and record a status event if the status changed
+        """
+        old_status = serializer.instance.status
+        with transaction.atomic():
+            report = serializer.save()
+            record_status_change(report, old_status, self.request.user)
 
     def create(self, request, *args, **kwargs):
         """Create a standard emergency report with detailed logging for debugging"""
@@ -104,47 +246,21 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
         
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            report = self.perform_create_and_get_instance(serializer)
+            logger.debug(f"Creating emergency report with serializer data: {serializer.validated_data}")
+            with transaction.atomic():
+                report, new_incident = self.save_report(serializer)
+                
+                # Queue the social media post in the same transaction as the
+                # report, once per incident
+                if report.is_emergency and new_incident:
+                    self.queue_social_post(report, request)
             
-            # Post to social media if it's an emergency
+            response_data = serializer.data
             if report.is_emergency:
-                # Prepare additional emergency info from request
-                emergency_data = {
-                    'description': report.description,
-                    'emergency_type': request.data.get('incident_type', 'General Emergency'),
-                    'contact_info': request.data.get('contact_info', ''),
-                    'severity': request.data.get('severity', ''),
-                    'people_count': request.data.get('people_count', '')
-                }
-                
-                # Create location data from latitude and longitude
-                location_data = None
-                if report.latitude is not None and report.longitude is not None:
-                    location_data = {
-                        'latitude': report.latitude,
-                        'longitude': report.longitude
-                    }
-                
-                try:
-                    social_results = post_emergency_to_social_media(
-                        emergency_data,
-                        location_data,
-                        request.data.get('media_file')
-                    )
-                    
-                    # Add social media results to response
-                    response_data = serializer.data
-                    if social_results and social_results.get('success'):
-                        response_data['social_post_results'] = social_results.get('results', [])
-                    
-                    return Response(response_data, status=status.HTTP_201_CREATED)
-                    
-                except Exception as e:
-                    logger.error(f"Error posting to social media: {str(e)}")
-                    # Continue with the standard response even if social media posting fails
-        
+                response_data['social_post_status'] = 'QUEUED' if new_incident else 'DUPLICATE'
+            
             headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+            return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
         else:
             # Log validation errors
             logger.error(f"Serializer validation errors: {serializer.errors}")
@@ -153,6 +269,36 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
             print("=========================\n")
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    def queue_social_post(self, report, request):
+        """
+        Add the report to the social media outbox. The post is published by
+        the drain_social_outbox worker, so report creation never waits on
+        third-party APIs.
+        """
+        # Prepare additional emergency info from request
+        emergency_data = {
+            'description': report.description,
+            'emergency_type': request.data.get('incident_type', 'General Emergency'),
+            'contact_info': request.data.get('contact_info', ''),
+            'severity': request.data.get('severity', ''),
+            'people_count': request.data.get('people_count', '')
+        }
+        
+        # Create location data from latitude and longitude
+        location_data = None
+        if report.latitude is not None and report.longitude is not None:
+            location_data = {
+                'latitude': report.latitude,
+                'longitude': report.longitude
+            }
+        
+        return enqueue_emergency_post(
+            emergency_data,
+            location_data,
+            request.data.get('media_file'),
+            report=report
+        )
+    
     @action(detail=False, methods=['post'])
     def report_emergency(self, request):
         """
@@ -185,40 +331,16 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
             # Create emergency report
             report_serializer = self.get_serializer(data=report_data)
             if report_serializer.is_valid():
-                report = report_serializer.save(reporter=request.user)
-                
-                # Prepare additional emergency info from request
-                emergency_data = {
-                    'description': report.description,
-                    'emergency_type': request.data.get('incident_type', 'General Emergency'),
-                    'contact_info': request.data.get('contact_info', ''),
-                    'severity': request.data.get('severity', ''),
-                    'people_count': request.data.get('people_count', '')
-                }
-                
-                # Create location data from latitude and longitude
-                location_data = None
-                if report.latitude is not None and report.longitude is not None:
-                    location_data = {
-                        'latitude': report.latitude,
-                        'longitude': report.longitude
-                    }
-                
-                # Attempt to post to social media if media file is included
-                social_results = {}
-                try:
-                    social_results = post_emergency_to_social_media(
-                        emergency_data,
-                        location_data,
-                        request.data.get('media_file')
-                    )
-                except Exception as e:
-                    logger.error(f"Error posting to social media: {str(e)}")
+                with transaction.atomic():
+                    report, new_incident = self.save_report(report_serializer)
+                    
+                    # Queue the social media post in the same transaction as
+                    # the report, once per incident
+                    if new_incident:
+                        self.queue_social_post(report, request)
                 
-                # Include social media results in the response
                 response_data = report_serializer.data
-                if social_results and social_results.get('success'):
-                    response_data['social_post_results'] = social_results.get('results', [])
+                response_data['social_post_status'] = 'QUEUED' if new_incident else 'DUPLICATE'
                 
                 return Response(response_data, status=status.HTTP_201_CREATED)
             
@@ -231,6 +353,99 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over report descriptions, most relevant first.
+        Combines with the status, is_emergency and reporter_type filters.
+        """
+        if not search_terms(request.query_params.get('search')):
+            return Response(
+                {'error': 'A search query is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = parse_limit_param(request.query_params.get('limit'), 50, 200)
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rows = list(
+            self.filter_queryset(self.get_queryset())
+            .order_by('-rank', '-timestamp', '-id')
+            .values(*REPORT_ROW_FIELDS, 'rank')[:limit]
+        )
+        results = serialize_report_rows(rows)
+        for result, row in zip(results, rows):
+            result['rank'] = row['rank']
+        return Response(results)
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        Reports created between ?start= and ?end= (ISO 8601 dates or
+        datetimes, end optional and exclusive), newest first. Archived
+        reports are included when the range reaches back to them.
+        """
+        try:
+            start = parse_time_param(request.query_params.get('start'))
+            end = parse_time_param(request.query_params.get('end'))
+        except ValueError:
+            return Response(
+                {'error': 'start and end must be ISO 8601 dates or datetimes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start is None:
+            return Response({'error': 'start is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = parse_limit_param(request.query_params.get('limit'), 50, 200)
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        rows, include_archived = reports_in_range(
+            self.get_queryset(), self.get_archived_queryset(), start, end, REPORT_ROW_FIELDS
+        )
+        return Response(serialize_report_rows(rows[:limit], include_archived=include_archived))
+    
+    @action(detail=False, methods=['get'], url_path='changes-since')
+    def changes_since(self, request):
+        """
+        Reports created, updated or resolved and ids of reports deleted
+        after ?cursor=, oldest first. Omit the cursor for a full sync and
+        pass the returned cursor on the next call.
+        """
+        position = None
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                position = decode_cursor(cursor)
+            except InvalidCursor as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = parse_limit_param(request.query_params.get('limit'), 100, 500)
+        except ValueError:
+            return Response({'error': 'limit must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Reports created after the client's last sync are new to it
+        created_after = position[0] if position else None
+        rows, tombstones, position, has_more = changes_since(
+            self.get_queryset(), visible_tombstones(request.user), position, limit, REPORT_ROW_FIELDS
+        )
+        changes = serialize_report_rows(rows)
+        for change, row in zip(changes, rows):
+            if row['status'] == 'RESOLVED':
+                change['change'] = 'resolved'
+            elif created_after is None or row['timestamp'] > created_after:
+                change['change'] = 'created'
+            else:
+                change['change'] = 'updated'
+        
+        return Response({
+            'changes': changes,
+            'deleted': [str(row['report_id']) for row in tombstones],
+            'cursor': encode_cursor(*position) if position else None,
+            'has_more': has_more,
+        })
+    
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
         """
@@ -255,7 +470,9 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
             )
         
         report.status = status_value
-        report.save()
+        with transaction.atomic():
+            report.save()
+            record_status_change(report, old_status, request.user)
         
         # Create notification for the reporter
         if report.reporter.id != request.user.id:
@@ -270,6 +487,51 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
         serializer = self.get_serializer(report)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_update_status(self, request):
+        """
+        Move up to 200 reports to a status at once (for emergency services).
+        Like update_status, any transition is allowed; reports already at
+        the status are returned as skipped with the reason.
+        """
+        serializer = BulkStatusUpdateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        report_ids = list(dict.fromkeys(serializer.validated_data['report_ids']))
+        status_value = serializer.validated_data['status']
+        status_display = STATUS_DISPLAY[status_value]
+        
+        with transaction.atomic():
+            changed, skipped = change_report_statuses(
+                self.get_queryset().filter(pk__in=report_ids), status_value, request.user
+            )
+            
+            # Notify the reporters
+            notified = [row for row in changed if row['reporter_id'] != request.user.id]
+            Notification.objects.bulk_create([
+                Notification(
+                    recipient_id=row['reporter_id'],
+                    title='Emergency Status Update',
+                    message=f'Your emergency report has been updated to {status_display}',
+                    notification_type='UPDATE',
+                    emergency_report_id=row['id']
+                )
+                for row in notified
+            ])
+            bump_notifications(row['reporter_id'] for row in notified)
+            
+            # Bulk updates bypass the post_save signal that maintains the index
+            changed_ids = [row['id'] for row in changed]
+            transaction.on_commit(lambda: live_index.refresh(changed_ids))
+        
+        found = {row['id'] for row in changed} | set(skipped)
+        skipped.update({report_id: 'Report not found' for report_id in report_ids if report_id not in found})
+        return Response({
+            'status': status_value,
+            'updated': [str(row['id']) for row in changed],
+            'skipped': [{'id': str(report_id), 'error': error} for report_id, error in skipped.items()],
+        })
+    
     @action(detail=False, methods=['post'])
     def multi_location(self, request):
         """
@@ -283,46 +545,84 @@ class EmergencyReportViewSet(mixins.CreateModelMixin,
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Create main report from the first location
-            first_location = request.data.get('locations')[0]
+            # Validate every location in one pass
+            location_serializer = ReportLocationSerializer(data=request.data.get('locations'), many=True)
+            if not location_serializer.is_valid():
+                return Response({'locations': location_serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+            locations = location_serializer.validated_data
+            
+            # Validate the fields shared by every report once, using the first location
             report_data = {
                 'description': request.data.get('description'),
                 'reporter_type': request.data.get('reporter_type', 'SPECTATOR'),
                 'is_emergency': request.data.get('is_emergency', True),
-                'latitude': first_location.get('latitude'),
-                'longitude': first_location.get('longitude'),
+                'latitude': locations[0]['latitude'],
+                'longitude': locations[0]['longitude'],
                 'tag_ids': request.data.get('tag_ids', [])
             }
-            
-            # Create emergency report
             report_serializer = self.get_serializer(data=report_data)
-            if report_serializer.is_valid():
-                main_report = report_serializer.save(reporter=request.user)
+            if not report_serializer.is_valid():
+                return Response(report_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            
+            shared_data = dict(report_serializer.validated_data)
+            shared_data.pop('latitude', None)
+            shared_data.pop('longitude', None)
+            requested_tag_ids = shared_data.pop('tag_ids', [])
+            
+            # Resolve tags once for all reports
+            tag_ids = tag_registry.existing_ids(requested_tag_ids)
+            
+            TagLink = EmergencyReport.tags.through
+            with transaction.atomic():
+                # All locations belong to one event, clustered on the first
+                # one if it is an emergency
+                incident = None
+                if shared_data.get('is_emergency'):
+                    incident, _ = attach_to_incident(
+                        locations[0]['latitude'],
+                        locations[0]['longitude'],
+                        tag_ids,
+                        count=len(locations)
+                    )
                 
-                # Create additional reports for other locations
-                additional_reports = []
-                for location_data in request.data.get('locations')[1:]:
-                    additional_report_data = {
-                        'description': request.data.get('description'),
-                        'reporter_type': request.data.get('reporter_type', 'SPECTATOR'),
-                        'is_emergency': request.data.get('is_emergency', True),
-                        'latitude': location_data.get('latitude'),
-                        'longitude': location_data.get('longitude'),
-                        'tag_ids': request.data.get('tag_ids', [])
-                    }
-                    additional_report_serializer = self.get_serializer(data=additional_report_data)
-                    if additional_report_serializer.is_valid():
-                        additional_report = additional_report_serializer.save(reporter=request.user)
-                        additional_reports.append(additional_report_serializer.data)
+                reports = []
+                for location_data in locations:
+                    report = EmergencyReport(
+                        reporter=request.user,
+                        latitude=location_data['latitude'],
+                        longitude=location_data['longitude'],
+                        incident=incident,
+                        **shared_data
+                    )
+                    # bulk_create skips save(), so bucket the report here
+                    report.assign_grid_cell()
+                    reports.append(report)
+                report_ids = [report.id for report in reports]
                 
-                # Return combined response
-                return Response({
-                    'main_report': report_serializer.data,
-                    'additional_reports': additional_reports,
-                    'total_locations': len(request.data.get('locations'))
-                }, status=status.HTTP_201_CREATED)
+                EmergencyReport.objects.bulk_create(reports)
+                record_reports_created(reports, request.user)
+                TagLink.objects.bulk_create([
+                    TagLink(emergencyreport_id=report_id, emergencytag_id=tag_id)
+                    for report_id in report_ids
+                    for tag_id in tag_ids
+                ])
+                # Bulk inserts send no model signals
+                adjust_tag_counters(tag_ids, reports[0].status, len(reports))
+                transaction.on_commit(lambda: live_index.refresh(report_ids))
             
-            return Response(report_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            created = EmergencyReport.objects.filter(
+                pk__in=report_ids
+            ).select_related('reporter').in_bulk()
+            for report in created.values():
+                report._tag_ids = tag_ids
+            report_data = self.get_serializer([created[report_id] for report_id in report_ids], many=True).data
+            
+            # Return combined response
+            return Response({
+                'main_report': report_data[0],
+                'additional_reports': report_data[1:],
+                'total_locations': len(reports)
+            }, status=status.HTTP_201_CREATED)
             
         except Exception as e:
             logger.exception("Error in multi_location")
@@ -336,50 +636,73 @@ class NearbyEmergenciesView(generics.ListAPIView):
     serializer_class = EmergencyReportSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
-        lat = self.request.query_params.get('lat')
-        lng = self.request.query_params.get('lng')
-        radius = float(self.request.query_params.get('radius', 5.0))  # Default 5km
+    def get_params(self):
+        """
+        Parse lat, lng, radius (km, default 5) and limit from the query
+        string. Returns None for lat and lng if either is missing.
         
-        if not lat or not lng:
+        Raises:
+            ValueError: If a parameter is not a finite number
+        """
+        params = self.request.query_params
+        lat, lng, radius = parse_point_params(params)
+        limit = int(params['limit']) if params.get('limit') else None
+        return lat, lng, radius, limit
+    
+    def get_queryset(self):
+        lat, lng, radius, limit = self.get_params()
+        if lat is None:
             return EmergencyReport.objects.none()
         
-        lat = float(lat)
-        lng = float(lng)
+        if getattr(settings, 'LIVE_INDEX_ENABLED', True):
+            distance_by_id = self.nearby_from_index(lat, lng, radius, limit)
+        else:
+            distance_by_id = self.nearby_from_database(lat, lng, radius, limit)
         
-        # Get all active emergencies
-        active_emergencies = EmergencyReport.objects.filter(
+        # The index can lag writes by other processes by up to its refresh
+        # interval, so re-check that the hits are still active emergencies
+        emergencies = EmergencyReport.objects.filter(
+            pk__in=list(distance_by_id),
             is_emergency=True,
-            status__in=['PENDING', 'RESPONDING', 'ON_SCENE']
-        ).select_related('reporter').prefetch_related('tags')
-        
-        # Calculate distance for each emergency
-        emergencies_with_distance = []
-        for emergency in active_emergencies:
-            distance = self.calculate_distance(
-                lat, lng, emergency.latitude, emergency.longitude
-            )
-            if distance <= radius:
-                emergency.distance = distance  # Attach distance for serializer
-                emergencies_with_distance.append(emergency)
+            status__in=EmergencyReport.ACTIVE_STATUSES
+        ).values(*REPORT_ROW_FIELDS)
         
         # Sort by distance
-        return sorted(emergencies_with_distance, key=lambda e: e.distance)
+        return sorted(emergencies, key=lambda e: distance_by_id[e['id']])
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            self.get_params()
+        except ValueError:
+            return Response(
+                {'error': 'lat, lng and radius must be numbers and limit an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(serialize_report_rows(self.get_queryset()))
     
-    def calculate_distance(self, lat1, lon1, lat2, lon2):
-        """
-        Calculate distance between two points using Haversine formula
-        Returns distance in kilometers
-        """
-        R = 6371  # Radius of the Earth in km
-        dLat = math.radians(lat2 - lat1)
-        dLon = math.radians(lon2 - lon1)
-        a = math.sin(dLat / 2) * math.sin(dLat / 2) + \
-            math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * \
-            math.sin(dLon / 2) * math.sin(dLon / 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        distance = R * c
-        return round(distance, 2)
+    def nearby_from_index(self, lat, lng, radius, limit):
+        """Search the in-memory index of active incidents"""
+        matches = live_index.within_radius(lat, lng, radius, limit=limit, is_emergency=True)
+        return {entry['id']: distance for entry, distance in matches}
+    
+    def nearby_from_database(self, lat, lng, radius, limit):
+        """Search the database, reading only the grid cells that overlap the radius"""
+        active_emergencies = EmergencyReport.objects.filter(
+            is_emergency=True,
+            status__in=EmergencyReport.ACTIVE_STATUSES
+        )
+        cells = cells_within_radius(lat, lng, radius)
+        if cells is not None:
+            active_emergencies = active_emergencies.filter(grid_cell__in=cells)
+        else:
+            active_emergencies = active_emergencies.filter(grid_cell__isnull=False)
+        
+        # Measure, filter and rank all candidates in one vectorized pass
+        ids, lats, lngs = coordinate_arrays(
+            active_emergencies.values_list('id', 'latitude', 'longitude')
+        )
+        indices, distances = nearest_within(lat, lng, lats, lngs, radius, limit=limit)
+        return {ids[i]: float(d) for i, d in zip(indices, distances)}
 
 class EmergencyStatsByTagView(generics.ListAPIView):
     """Get statistics about emergency reports by tag type"""
@@ -395,17 +718,4 @@ class EmergencyStatsByTagView(generics.ListAPIView):
         return EmergencyTag.objects.all()
     
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = []
-        
-        for tag in queryset:
-            # Count reports with this tag
-            report_count = tag.reports.count()
-            data.append({
-                'id': tag.id,
-                'name': tag.name,
-                'emergency_type': tag.emergency_type,
-                'count': report_count
-            })
-            
-        return Response(data)
\ No newline at end of file
+        return Response(tag_counts(self.get_queryset()))
\ No newline at end of file
@@ -22,7 +22,15 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
         id_token = auth_header.split(' ')[1]
         if not id_token:
             return None
-            
+        
+        user = self.authenticate_credentials(id_token)
+        return (user, None) if user is not None else None
+    
+    def authenticate_credentials(self, id_token):
+        """
+        Return the user of a Firebase ID token, created on first sign-in,
+        or None if the token cannot be verified
+        """
         try:
             # Verify the token using Firebase Auth REST API
             firebase_api_key = settings.FIREBASE_CONFIG['apiKey']
@@ -73,7 +81,7 @@ class FirebaseAuthentication(authentication.BaseAuthentication):
                         firebase_uid=firebase_uid
                     )
                     
-            return (user, None)
+            return user
             
         except Exception as e:
             print(f"Firebase auth error: {str(e)}")
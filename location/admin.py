@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Location
+from .models import LatestLocation, Location, LocationFilterStats, LocationTrack
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
@@ -7,3 +7,22 @@ class LocationAdmin(admin.ModelAdmin):
     list_filter = ('is_emergency', 'timestamp')
     search_fields = ('user__username', 'user__email')
     date_hierarchy = 'timestamp'
+
+@admin.register(LatestLocation)
+class LatestLocationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'latitude', 'longitude', 'timestamp', 'is_emergency')
+    list_filter = ('is_emergency', 'user__role')
+    search_fields = ('user__username', 'user__email')
+    readonly_fields = ('location_id',)
+
+@admin.register(LocationFilterStats)
+class LocationFilterStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'accepted', 'suppressed')
+    date_hierarchy = 'date'
+
+@admin.register(LocationTrack)
+class LocationTrackAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date', 'point_count', 'start', 'end')
+    search_fields = ('user__username', 'user__email')
+    date_hierarchy = 'date'
+    exclude = ('data',)
@@ -0,0 +1,128 @@
+"""
+Process-local write-behind buffer for location pings.
+
+Routine pings are queued in memory and written by a background thread
+with one bulk INSERT once LOCATION_BUFFER_MAX_POINTS are waiting or the
+oldest has waited LOCATION_BUFFER_MAX_SECONDS, whichever comes first. A
+crash therefore loses at most that many seconds of routine pings; on a
+normal shutdown the buffer is flushed by an atexit hook. Emergency pings
+never go through the buffer (see location.services.save_locations).
+
+Buffered pings are not visible to reads until they are flushed.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class LocationWriteBuffer:
+    def __init__(self, max_points=None, max_seconds=None):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = []
+        self._oldest = None
+        self._thread = None
+        self._pid = None
+        self._max_points = max_points
+        self._max_seconds = max_seconds
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'LOCATION_BUFFER_ENABLED', True)
+
+    @property
+    def max_points(self):
+        if self._max_points is not None:
+            return self._max_points
+        return getattr(settings, 'LOCATION_BUFFER_MAX_POINTS', 1000)
+
+    @property
+    def max_seconds(self):
+        if self._max_seconds is not None:
+            return self._max_seconds
+        return getattr(settings, 'LOCATION_BUFFER_MAX_SECONDS', 2)
+
+    def add(self, locations):
+        """Queue unsaved Location instances for the next flush"""
+        if not locations:
+            return
+        self._ensure_thread()
+        with self._lock:
+            first = not self._pending
+            if first:
+                self._oldest = time.monotonic()
+            self._pending.extend(locations)
+            full = len(self._pending) >= self.max_points
+        if first or full:
+            # Let the flusher recompute its deadline
+            self._wakeup.set()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Write every queued location now. Returns the number written."""
+        from .services import write_locations
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._oldest = None
+            if not pending:
+                return 0
+            try:
+                write_locations(pending)
+            except Exception:
+                logger.exception("Failed to flush %d buffered locations", len(pending))
+                with self._lock:
+                    # Retry on the next flush, but never hold more than ten
+                    # full buffers if the database stays unavailable
+                    keep = max(self.max_points * 10 - len(self._pending), 0)
+                    if keep:
+                        self._pending[:0] = pending[-keep:]
+                    self._oldest = time.monotonic()
+                return 0
+            return len(pending)
+
+    def _ensure_thread(self):
+        # A forked worker inherits the buffer but not the flusher thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._pending = []
+                self._oldest = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='location-write-buffer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                oldest = self._oldest
+            timeout = self.max_seconds if oldest is None else max(oldest + self.max_seconds - time.monotonic(), 0)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+            with self._lock:
+                due = bool(self._pending) and (
+                    len(self._pending) >= self.max_points
+                    or time.monotonic() - self._oldest >= self.max_seconds
+                )
+            if due:
+                close_old_connections()
+                self.flush()
+
+
+location_buffer = LocationWriteBuffer()
+
+atexit.register(location_buffer.flush)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from location.trajectory import compact_locations
+
+
+class Command(BaseCommand):
+    help = 'Roll routine location points older than LOCATION_COMPACT_AFTER_DAYS into daily tracks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Compact points older than this many days')
+
+    def handle(self, *args, **options):
+        tracks, points = compact_locations(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Compacted {points} points into {tracks} daily tracks"))
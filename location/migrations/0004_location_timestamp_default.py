@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2025-07-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0003_location_is_emergency'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='location',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
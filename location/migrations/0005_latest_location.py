@@ -0,0 +1,58 @@
+# Generated by Django 5.2.3 on 2025-07-21 10:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_latest_locations(apps, schema_editor):
+    """Copy each user's newest location, found with one index probe per user"""
+    User = apps.get_model('users', 'User')
+    Location = apps.get_model('location', 'Location')
+    LatestLocation = apps.get_model('location', 'LatestLocation')
+
+    newest = Location.objects.filter(user_id=OuterRef('pk')).order_by('-timestamp', '-id').values('id')[:1]
+    location_ids = list(
+        User.objects.annotate(latest_id=Subquery(newest))
+        .filter(latest_id__isnull=False)
+        .values_list('latest_id', flat=True)
+    )
+    for start in range(0, len(location_ids), 1000):
+        LatestLocation.objects.bulk_create([
+            LatestLocation(
+                user_id=location.user_id,
+                location_id=location.id,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                is_emergency=location.is_emergency,
+                timestamp=location.timestamp
+            )
+            for location in Location.objects.filter(pk__in=location_ids[start:start + 1000])
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0004_location_timestamp_default'),
+        ('users', '0004_alter_user_managers_alter_user_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestLocation',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='latest_location', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('location_id', models.UUIDField()),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9)),
+                ('is_emergency', models.BooleanField(default=False)),
+                ('timestamp', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['timestamp'], name='location_la_timesta_6eb3d4_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_latest_locations, migrations.RunPython.noop),
+    ]
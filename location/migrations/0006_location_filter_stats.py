@@ -0,0 +1,24 @@
+# Generated by Django 5.2.3 on 2025-07-22 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0005_latest_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationFilterStats',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('accepted', models.PositiveBigIntegerField(default=0)),
+                ('suppressed', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'location filter stats',
+            },
+        ),
+    ]
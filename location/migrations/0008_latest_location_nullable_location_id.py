@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2025-07-24 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('location', '0007_location_track'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='latestlocation',
+            name='location_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 
 class Location(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -8,7 +9,8 @@ class Location(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     is_emergency = models.BooleanField(default=False) 
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # When the point was recorded; batched points carry their own time
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         indexes = [
@@ -16,4 +18,61 @@ class Location(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user.username} - {self.timestamp}"
\ No newline at end of file
+        return f"{self.user.username} - {self.timestamp}"
+
+class LatestLocation(models.Model):
+    """
+    Newest point of each user, upserted whenever locations are written so
+    current positions can be read without scanning the location history
+    """
+    user = models.OneToOneField(
+        'users.User', on_delete=models.CASCADE, primary_key=True, related_name='latest_location'
+    )
+    # Id of the Location row this was copied from, None once that row
+    # has been compacted into a LocationTrack
+    location_id = models.UUIDField(null=True, blank=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6)
+    is_emergency = models.BooleanField(default=False)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.timestamp}"
+
+
+class LocationFilterStats(models.Model):
+    """Daily totals of pings accepted and suppressed by the movement filter"""
+    date = models.DateField(primary_key=True)
+    accepted = models.PositiveBigIntegerField(default=0)
+    suppressed = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'location filter stats'
+
+    def __str__(self):
+        return f"{self.date}: {self.accepted} accepted, {self.suppressed} suppressed"
+
+
+class LocationTrack(models.Model):
+    """
+    A user's routine points of one day, packed by location.trajectory
+    into a delta-encoded blob once they are old enough to be compacted
+    """
+    user = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='location_tracks')
+    date = models.DateField()
+    # First and last point time, whole seconds
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    point_count = models.PositiveIntegerField()
+    data = models.BinaryField()
+
+    class Meta:
+        unique_together = ['user', 'date']
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} ({self.point_count} points)"
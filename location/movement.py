@@ -0,0 +1,152 @@
+"""
+Ingest-time movement filter for location pings.
+
+A routine ping within LOCATION_FILTER_DISTANCE_M meters and
+LOCATION_FILTER_SECONDS of the user's last accepted point says nothing
+new and is dropped, i.e. merged into that point. Emergency pings are
+always kept. A stationary phone therefore stores one point per interval
+instead of one per ping.
+
+The last accepted point of recently active users is kept per process and
+looked up in LatestLocation otherwise, so a user whose pings are spread
+over several workers may have a few more points kept than strictly
+needed, never fewer.
+
+Accepted and suppressed counts are added to the day's LocationFilterStats
+row every STATS_FLUSH_SECONDS and on shutdown.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from emergency.spatial import haversine_km
+from .models import LatestLocation, Location, LocationFilterStats
+
+logger = logging.getLogger(__name__)
+
+# Users whose last accepted point is remembered per process
+CACHE_SIZE = 10000
+
+STATS_FLUSH_SECONDS = 10
+
+
+class MovementFilter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = OrderedDict()
+        self._accepted = 0
+        self._suppressed = 0
+        self._flushed_at = time.monotonic()
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'LOCATION_FILTER_ENABLED', True)
+
+    @property
+    def distance_m(self):
+        return getattr(settings, 'LOCATION_FILTER_DISTANCE_M', 10)
+
+    @property
+    def seconds(self):
+        return getattr(settings, 'LOCATION_FILTER_SECONDS', 60)
+
+    def last_accepted(self, user_id):
+        """The user's newest accepted point as a Location (possibly unsaved yet), or None"""
+        with self._lock:
+            last = self._last.get(user_id)
+        if last is not None and last.timestamp >= timezone.now() - timedelta(seconds=self.seconds):
+            return last
+
+        # Not seen recently by this process: another one may have accepted
+        # a newer point since
+        stored = LatestLocation.objects.filter(user_id=user_id).first()
+        if stored is not None and (last is None or stored.timestamp > last.timestamp):
+            last = Location(
+                id=stored.location_id,
+                user_id=user_id,
+                latitude=stored.latitude,
+                longitude=stored.longitude,
+                is_emergency=stored.is_emergency,
+                timestamp=stored.timestamp
+            )
+            self._remember(user_id, last)
+        return last
+
+    def filter(self, user_id, locations):
+        """Return the locations of one user worth storing, in order"""
+        if not self.enabled:
+            self._count(len(locations), 0)
+            return locations
+
+        last = self.last_accepted(user_id)
+        kept = []
+        for location in locations:
+            if location.is_emergency or last is None or not self._is_redundant(location, last):
+                kept.append(location)
+                if last is None or location.timestamp >= last.timestamp:
+                    last = location
+        if kept:
+            self._remember(user_id, last)
+        self._count(len(kept), len(locations) - len(kept))
+        return kept
+
+    def _is_redundant(self, location, last):
+        if abs((location.timestamp - last.timestamp).total_seconds()) > self.seconds:
+            return False
+        distance = haversine_km(
+            float(location.latitude), float(location.longitude),
+            float(last.latitude), float(last.longitude)
+        )
+        return distance * 1000 <= self.distance_m
+
+    def _remember(self, user_id, location):
+        with self._lock:
+            self._last[user_id] = location
+            self._last.move_to_end(user_id)
+            if len(self._last) > CACHE_SIZE:
+                self._last.popitem(last=False)
+
+    def _count(self, accepted, suppressed):
+        with self._lock:
+            self._accepted += accepted
+            self._suppressed += suppressed
+            due = time.monotonic() - self._flushed_at >= STATS_FLUSH_SECONDS
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """Add the counts gathered since the last flush to today's stats row"""
+        with self._lock:
+            accepted, suppressed = self._accepted, self._suppressed
+            self._accepted = self._suppressed = 0
+            self._flushed_at = time.monotonic()
+        if not accepted and not suppressed:
+            return
+        today = timezone.localdate()
+        try:
+            if not LocationFilterStats.objects.filter(date=today).update(
+                accepted=F('accepted') + accepted,
+                suppressed=F('suppressed') + suppressed
+            ):
+                stats, created = LocationFilterStats.objects.get_or_create(
+                    date=today, defaults={'accepted': accepted, 'suppressed': suppressed}
+                )
+                if not created:
+                    LocationFilterStats.objects.filter(date=today).update(
+                        accepted=F('accepted') + accepted,
+                        suppressed=F('suppressed') + suppressed
+                    )
+        except Exception:
+            logger.exception("Failed to record location filter stats")
+
+
+movement_filter = MovementFilter()
+
+atexit.register(movement_filter.flush_stats)
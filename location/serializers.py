@@ -1,9 +1,39 @@
 # location/serializers.py
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Location
+from .models import LatestLocation, Location
+
+# Clock skew tolerated on timestamps sent by devices
+MAX_CLOCK_SKEW = timedelta(minutes=5)
 
 class LocationSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)  # Auto-set to current user
     class Meta:
         model = Location
-        fields = ['id', 'user', 'latitude', 'longitude', 'timestamp']
\ No newline at end of file
+        fields = ['id', 'user', 'latitude', 'longitude', 'timestamp']
+        read_only_fields = ['timestamp']
+
+class LatestLocationSerializer(serializers.ModelSerializer):
+    """A user's current position; id is that of the Location it was copied from"""
+    id = serializers.UUIDField(source='location_id', read_only=True)
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+    class Meta:
+        model = LatestLocation
+        fields = ['id', 'user', 'latitude', 'longitude', 'is_emergency', 'timestamp']
+
+class LocationPointSerializer(serializers.Serializer):
+    """
+    A timestamped point of a batched location upload. Coordinates are
+    accepted at full device precision and stored rounded to 6 places.
+    """
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    timestamp = serializers.DateTimeField()
+    is_emergency = serializers.BooleanField(default=False)
+    
+    def validate_timestamp(self, value):
+        if value > timezone.now() + MAX_CLOCK_SKEW:
+            raise serializers.ValidationError('Timestamp is in the future')
+        return value
@@ -0,0 +1,119 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .buffer import location_buffer
+from .models import LatestLocation, Location
+from .movement import movement_filter
+
+# Columns of LatestLocation refreshed from a newer point
+LATEST_FIELDS = ['location_id', 'latitude', 'longitude', 'is_emergency', 'timestamp']
+
+
+def _latest_from(location):
+    return LatestLocation(
+        user_id=location.user_id,
+        location_id=location.id,
+        latitude=location.latitude,
+        longitude=location.longitude,
+        is_emergency=location.is_emergency,
+        timestamp=location.timestamp
+    )
+
+
+def update_latest_locations(locations):
+    """
+    Upsert the LatestLocation rows of the users in locations, only where
+    a location is at least as new as the stored one (batched uploads can
+    arrive after newer live pings). Must run inside a transaction.
+    """
+    newest = {}
+    for location in locations:
+        current = newest.get(location.user_id)
+        if current is None or location.timestamp >= current.timestamp:
+            newest[location.user_id] = location
+    if not newest:
+        return
+
+    # Lock existing rows in a fixed order so concurrent flushes queue up
+    # instead of deadlocking
+    stored = dict(
+        LatestLocation.objects.select_for_update()
+        .filter(user_id__in=newest)
+        .order_by('user_id')
+        .values_list('user_id', 'timestamp')
+    )
+    rows = [
+        _latest_from(location)
+        for user_id, location in newest.items()
+        if user_id not in stored or location.timestamp >= stored[user_id]
+    ]
+    if not rows:
+        return
+    # MySQL upserts on any unique key and takes no conflict target
+    unique_fields = ['user'] if connection.features.supports_update_conflicts_with_target else None
+    LatestLocation.objects.bulk_create(
+        rows, update_conflicts=True, update_fields=LATEST_FIELDS, unique_fields=unique_fields
+    )
+
+
+def refresh_latest_location(user_id):
+    """Recompute a user's LatestLocation from their history, e.g. after a deletion"""
+    location = Location.objects.filter(user_id=user_id).order_by('-timestamp', '-id').first()
+    if location is None:
+        LatestLocation.objects.filter(user_id=user_id).delete()
+        return
+    LatestLocation.objects.update_or_create(
+        user_id=user_id,
+        defaults={field: getattr(_latest_from(location), field) for field in LATEST_FIELDS}
+    )
+
+
+def write_locations(locations):
+    """
+    Insert Location instances with one multi-row INSERT and upsert the
+    latest positions of their users, in a single transaction
+    """
+    with transaction.atomic():
+        locations = Location.objects.bulk_create(locations)
+        update_latest_locations(locations)
+    return locations
+
+
+def save_locations(user, points):
+    """
+    Store validated location points of one user. Points the movement
+    filter finds redundant are dropped; emergency points are written
+    immediately and the rest go through the write-behind buffer when it
+    is enabled. Returns the Location instances kept, in order.
+    """
+    locations = [
+        Location(
+            user=user,
+            latitude=round(point['latitude'], 6),
+            longitude=round(point['longitude'], 6),
+            is_emergency=point.get('is_emergency', False),
+            timestamp=point.get('timestamp') or timezone.now()
+        )
+        for point in points
+    ]
+    locations = movement_filter.filter(user.id, locations)
+    if not location_buffer.enabled:
+        return write_locations(locations)
+    urgent = [location for location in locations if location.is_emergency]
+    if urgent:
+        write_locations(urgent)
+    location_buffer.add([location for location in locations if not location.is_emergency])
+    return locations
+
+
+def latest_locations(user_ids=None, since=None):
+    """
+    Current positions from LatestLocation, optionally limited to some
+    users and to positions reported at or after since
+    """
+    queryset = LatestLocation.objects.all()
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    if since is not None:
+        queryset = queryset.filter(timestamp__gte=since)
+    return queryset
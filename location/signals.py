@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import LatestLocation, Location
+from .services import refresh_latest_location, update_latest_locations
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def refresh_latest_on_change(sender, instance, created=False, **kwargs):
+    """
+    Keep LatestLocation in step with locations saved one by one (e.g. in
+    the admin) and with edits or deletions of the point it was copied
+    from. Bulk writes upsert it themselves (see services.write_locations).
+    """
+    if created:
+        with transaction.atomic():
+            update_latest_locations([instance])
+    elif LatestLocation.objects.filter(user_id=instance.user_id, location_id=instance.id).exists():
+        refresh_latest_location(instance.user_id)
@@ -1,3 +1,371 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+from .buffer import LocationWriteBuffer
+from .models import LatestLocation, Location, LocationFilterStats, LocationTrack
+from .movement import movement_filter
+from .services import update_latest_locations, write_locations
+from .trajectory import compact_locations, decode_track, encode_track
+
+
+def make_user(username, role='CITIZEN'):
+    return User.objects.create_user(username, f'{username}@example.com', 'pass', role=role)
+
+
+@override_settings(LOCATION_BUFFER_ENABLED=False, LOCATION_FILTER_DISTANCE_M=10, LOCATION_FILTER_SECONDS=60)
+class MovementFilterTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # The filter is a process singleton: start from a clean slate
+        movement_filter.flush_stats()
+        LocationFilterStats.objects.all().delete()
+        movement_filter._last.clear()
+        self.addCleanup(movement_filter._last.clear)
+
+    def ping(self, latitude, longitude, **extra):
+        return self.client.post('/api/locations/', {'latitude': latitude, 'longitude': longitude, **extra})
+
+    def test_stationary_pings_are_merged_into_the_last_point(self):
+        first = self.ping('38.419200', '27.128700')
+        self.assertEqual(first.status_code, 201)
+        # About 5 m away
+        second = self.ping('38.419240', '27.128710')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['id'], first.json()['id'])
+        # About 55 m away
+        self.assertEqual(self.ping('38.419700', '27.128700').status_code, 201)
+        self.assertEqual(Location.objects.count(), 2)
+
+    def test_emergency_points_are_always_kept(self):
+        self.ping('38.419200', '27.128700')
+        response = self.client.post('/api/locations/batch/', [
+            {'latitude': 38.4192, 'longitude': 27.1287, 'timestamp': timezone.now().isoformat(), 'is_emergency': True},
+        ], format='json')
+        self.assertEqual(response.json(), {'created': 1, 'suppressed': 0})
+        self.assertEqual(Location.objects.filter(is_emergency=True).count(), 1)
+
+    def test_batch_keeps_one_point_per_interval_and_counts_the_rest(self):
+        start = timezone.now() - timedelta(minutes=10)
+        points = [
+            {'latitude': 38.4192, 'longitude': 27.1287, 'timestamp': (start + timedelta(seconds=10 * i)).isoformat()}
+            for i in range(19)
+        ]
+        response = self.client.post('/api/locations/batch/', points, format='json')
+        self.assertEqual(response.status_code, 201)
+        # Kept at 0, 70 and 140 seconds
+        self.assertEqual(response.json(), {'created': 3, 'suppressed': 16})
+
+        movement_filter.flush_stats()
+        stats = LocationFilterStats.objects.get()
+        self.assertEqual((stats.accepted, stats.suppressed), (3, 16))
+
+    def test_points_accepted_by_another_process_are_seen(self):
+        self.ping('38.419200', '27.128700')
+        # Another worker knows nothing of this process's cache
+        movement_filter._last.clear()
+        self.assertEqual(self.ping('38.419200', '27.128700').status_code, 200)
+        self.assertEqual(Location.objects.count(), 1)
+
+    @override_settings(LOCATION_FILTER_ENABLED=False)
+    def test_disabled_filter_keeps_everything(self):
+        self.ping('38.419200', '27.128700')
+        self.assertEqual(self.ping('38.419200', '27.128700').status_code, 201)
+        self.assertEqual(Location.objects.count(), 2)
+
+
+
+
+class LatestLocationTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.other = make_user('other')
+        self.now = timezone.now()
+
+    def point(self, user, minutes_ago, latitude='38.419200', **fields):
+        return Location(
+            user=user, latitude=Decimal(latitude), longitude=Decimal('27.128700'),
+            timestamp=self.now - timedelta(minutes=minutes_ago), **fields
+        )
+
+    def latest(self, user):
+        return LatestLocation.objects.get(user=user)
+
+    def test_newest_point_of_each_user_wins(self):
+        points = write_locations([
+            self.point(self.user, 5), self.point(self.user, 1, '38.5'), self.point(self.user, 3),
+            self.point(self.other, 2, '38.6', is_emergency=True),
+        ])
+        latest = self.latest(self.user)
+        self.assertEqual((latest.location_id, latest.latitude), (points[1].id, Decimal('38.5')))
+        latest = self.latest(self.other)
+        self.assertEqual((latest.location_id, latest.is_emergency), (points[3].id, True))
+
+        # A late batch of older points leaves the stored position alone
+        write_locations([self.point(self.user, 10, '38.7')])
+        self.assertEqual(self.latest(self.user).latitude, Decimal('38.5'))
+
+        # Updated in place, one row per user
+        newer = write_locations([self.point(self.user, 0, '38.8')])[0]
+        self.assertEqual(self.latest(self.user).location_id, newer.id)
+        self.assertEqual(LatestLocation.objects.count(), 2)
+
+    def test_single_saves_and_deletes_keep_it_in_step(self):
+        # Saved one by one, as in the admin
+        older = self.point(self.user, 5)
+        older.save()
+        newer = write_locations([self.point(self.user, 1, '38.5')])[0]
+        self.assertEqual(self.latest(self.user).location_id, newer.id)
+
+        newer.latitude = Decimal('38.6')
+        newer.save()
+        self.assertEqual(self.latest(self.user).latitude, Decimal('38.6'))
+
+        newer.delete()
+        self.assertEqual(self.latest(self.user).location_id, older.id)
+        older.delete()
+        self.assertFalse(LatestLocation.objects.filter(user=self.user).exists())
+
+    def test_current_endpoint_reads_the_latest_positions(self):
+        write_locations([self.point(self.user, 30), self.point(self.other, 1, '38.5')])
+        client = APIClient()
+        client.force_authenticate(make_user('station', role='FIRE_STATION'))
+        response = client.get('/api/locations/current/')
+        self.assertEqual([row['user'] for row in response.json()], [str(self.other.id), str(self.user.id)])
+        response = client.get('/api/locations/current/?active_minutes=10')
+        self.assertEqual([row['user'] for row in response.json()], [str(self.other.id)])
+
+@override_settings(LOCATION_BUFFER_ENABLED=False, LOCATION_FILTER_ENABLED=False)
+class BatchUploadTests(TestCase):
+    url = '/api/locations/batch/'
+
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.start = timezone.now() - timedelta(minutes=10)
+
+    def point(self, i, **fields):
+        return {
+            'latitude': 38.41920012 + i / 1000, 'longitude': 27.1287,
+            'timestamp': (self.start + timedelta(minutes=i)).isoformat(), **fields
+        }
+
+    def post_ndjson(self, lines):
+        return self.client.post(self.url, '\n'.join(lines), content_type='application/x-ndjson')
+
+    def test_ndjson_lines_are_stored_like_an_array(self):
+        lines = [json.dumps(self.point(i)) for i in range(3)]
+        response = self.post_ndjson(lines[:1] + [''] + lines[1:] + [''])
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json(), {'created': 3, 'suppressed': 0})
+        self.assertEqual(
+            list(Location.objects.order_by('timestamp').values_list('latitude', flat=True)),
+            [Decimal('38.419200'), Decimal('38.420200'), Decimal('38.421200')]
+        )
+        self.assertEqual(LatestLocation.objects.get(user=self.user).latitude, Decimal('38.421200'))
+
+        response = self.client.post(self.url, [self.point(4), self.point(5)], format='json')
+        self.assertEqual(response.json(), {'created': 2, 'suppressed': 0})
+
+    def test_malformed_line_is_reported_by_number(self):
+        response = self.post_ndjson([json.dumps(self.point(0)), '{"latitude": 38.4'])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('NDJSON parse error on line 2', response.json()['detail'])
+        self.assertFalse(Location.objects.exists())
+
+    def test_one_invalid_point_rejects_the_batch(self):
+        response = self.post_ndjson([json.dumps(self.point(0)), json.dumps(self.point(1, latitude=91))])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()), ['1'])
+        self.assertIn('latitude', response.json()['1'])
+        self.assertFalse(Location.objects.exists())
+
+    @override_settings(LOCATION_BATCH_MAX_POINTS=2)
+    def test_empty_and_oversized_batches_are_rejected(self):
+        self.assertEqual(self.post_ndjson(['', '  ']).status_code, 400)
+        response = self.post_ndjson([json.dumps(self.point(i)) for i in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'A batch may contain at most 2 points'})
+
+
+@override_settings(LOCATION_BUFFER_ENABLED=True, LOCATION_FILTER_ENABLED=False)
+class WriteBufferTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # A buffer of our own, flushed by hand instead of by its thread
+        self.buffer = LocationWriteBuffer(max_points=3, max_seconds=3600)
+        for patcher in [
+            mock.patch('location.services.location_buffer', self.buffer),
+            mock.patch.object(LocationWriteBuffer, '_ensure_thread'),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_buffered_pings_are_acknowledged_before_they_are_written(self):
+        response = self.client.post('/api/locations/', {'latitude': '38.419200', 'longitude': '27.128700'})
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(Location.objects.exists())
+        self.assertEqual(len(self.buffer), 1)
+
+        # Emergency pings skip the buffer
+        response = self.client.post('/api/locations/emergency/', {'latitude': '38.5', 'longitude': '27.2'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(Location.objects.values_list('is_emergency', flat=True)), [True])
+
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(Location.objects.count(), 2)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_flush_keeps_the_newest_pings_when_the_database_fails(self):
+        self.buffer.add([Location(user=self.user, latitude=i, longitude=0) for i in range(40)])
+        with mock.patch('location.services.write_locations', side_effect=DatabaseError('gone away')):
+            with self.assertLogs('location.buffer', 'ERROR'):
+                self.assertEqual(self.buffer.flush(), 0)
+        # At most ten full buffers are kept for the retry
+        self.assertEqual(len(self.buffer), 30)
+        self.assertEqual(self.buffer.flush(), 30)
+        self.assertEqual(
+            sorted(Location.objects.values_list('latitude', flat=True)), [Decimal(i) for i in range(10, 40)]
+        )
+
+    def test_a_full_buffer_wakes_the_flusher(self):
+        self.buffer.add([Location(user=self.user, latitude=0, longitude=0)])
+        self.buffer._wakeup.clear()
+        self.buffer.add([Location(user=self.user, latitude=0, longitude=0)])
+        self.assertFalse(self.buffer._wakeup.is_set())
+        self.buffer.add([Location(user=self.user, latitude=0, longitude=0)])
+        self.assertTrue(self.buffer._wakeup.is_set())
+
+class TrajectoryTests(TestCase):
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        # Noon, 40 days ago, so a day's points never straddle midnight
+        self.day = timezone.make_aware(
+            datetime.combine(timezone.localdate() - timedelta(days=40), datetime.min.time())
+        ) + timedelta(hours=12)
+
+    def add_points(self, start, count, **fields):
+        return Location.objects.bulk_create([
+            Location(
+                user=self.user,
+                latitude=Decimal('38.419200') + Decimal(i).scaleb(-5),
+                longitude=Decimal('27.128700') - Decimal(i).scaleb(-6),
+                timestamp=start + timedelta(seconds=37 * i),
+                **fields
+            )
+            for i in range(count)
+        ])
+
+    def test_encode_decode_round_trip(self):
+        base = datetime(2025, 3, 1, 8, tzinfo=dt_timezone.utc)
+        points = [
+            (Decimal('-33.868820'), Decimal('151.209290'), base + timedelta(seconds=90)),
+            (Decimal('38.419200'), Decimal('-179.999999'), base),
+            (Decimal('38.419201'), Decimal('0.000000'), base + timedelta(days=1, seconds=5)),
+        ]
+        start, end, data = encode_track(points)
+        self.assertEqual((start, end), (base, base + timedelta(days=1, seconds=5)))
+        self.assertEqual(decode_track(start, data), sorted(points, key=lambda point: point[2]))
+
+    def test_old_routine_points_are_compacted_per_day(self):
+        self.add_points(self.day, 50)
+        self.add_points(self.day + timedelta(days=1), 20)
+        emergency = self.add_points(self.day, 1, is_emergency=True)
+        recent = self.add_points(timezone.now() - timedelta(days=1), 3)
+
+        out = StringIO()
+        call_command('compact_locations', days=30, stdout=out)
+        self.assertIn('Compacted 70 points into 2 daily tracks', out.getvalue())
+        self.assertEqual(
+            set(Location.objects.values_list('id', flat=True)), {location.id for location in emergency + recent}
+        )
+        self.assertEqual(
+            sorted(LocationTrack.objects.values_list('point_count', flat=True)), [20, 50]
+        )
+
+        # A late upload for a compacted day is merged into its track
+        self.add_points(self.day + timedelta(hours=1), 5)
+        self.assertEqual(compact_locations(30), (1, 5))
+        track = LocationTrack.objects.get(date=timezone.localdate(self.day))
+        self.assertEqual(track.point_count, 55)
+        self.assertEqual(len(decode_track(track.start, track.data)), 55)
+
+    def test_compacted_latest_point_is_unlinked(self):
+        points = self.add_points(self.day, 5)
+        other = make_user('other')
+        kept = Location.objects.create(user=other, latitude='38.419200', longitude='27.128700', is_emergency=True)
+        with transaction.atomic():
+            update_latest_locations(points)
+        latest = LatestLocation.objects.get(user=self.user)
+        self.assertEqual(latest.location_id, points[-1].id)
+
+        compact_locations(30)
+        self.assertFalse(Location.objects.filter(user=self.user).exists())
+        latest.refresh_from_db()
+        self.assertIsNone(latest.location_id)
+        self.assertEqual((latest.latitude, latest.timestamp), (points[-1].latitude, points[-1].timestamp))
+        self.assertEqual(LatestLocation.objects.get(user=other).location_id, kept.id)
+
+        response = self.client.get('/api/locations/latest/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()['id'])
+
+    def test_history_merges_raw_and_compacted_points(self):
+        old = self.add_points(self.day, 10)
+        recent = self.add_points(timezone.now() - timedelta(days=1), 2)
+        expected = sorted(
+            ((str(location.latitude), str(location.longitude)) for location in old + recent), reverse=True
+        )
+        compact_locations(30)
+
+        response = self.client.get(f'/api/users/{self.user.id}/locations/')
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()
+        self.assertEqual([row['id'] for row in rows[2:]], [None] * 10)
+        self.assertEqual([row['id'] for row in rows[:2]], [str(location.id) for location in reversed(recent)])
+        timestamps = [row['timestamp'] for row in rows]
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+        self.assertEqual(sorted(((row['latitude'], row['longitude']) for row in rows), reverse=True), expected)
+
+
+class EmergencyLocationsTests(TestCase):
+    url = '/api/locations/emergency-locations/'
+
+    def setUp(self):
+        self.responder = make_user('station', role='FIRE_STATION')
+        self.client = APIClient()
+        self.client.force_authenticate(self.responder)
+        citizen = make_user('citizen')
+        self.near = Location.objects.create(user=citizen, latitude='38.419200', longitude='27.128700', is_emergency=True)
+        self.far = Location.objects.create(user=citizen, latitude='38.500000', longitude='27.128700', is_emergency=True)
+
+    def test_proximity_filter_sorts_closest_first(self):
+        response = self.client.get(f'{self.url}?lat=38.4193&lng=27.1287&radius=20')
+        self.assertEqual([row['id'] for row in response.json()], [str(self.near.id), str(self.far.id)])
+        response = self.client.get(f'{self.url}?lat=38.4193&lng=27.1287&radius=1')
+        self.assertEqual([row['id'] for row in response.json()], [str(self.near.id)])
+
+    def test_invalid_params_are_rejected(self):
+        for query in ['lat=38&lng=27&radius=x', 'lat=x&lng=27', 'lat=38&lng=inf']:
+            response = self.client.get(f'{self.url}?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.json())
+            response = self.client.get(f'/api/locations/current/?{query}')
+            self.assertEqual(response.status_code, 400, query)
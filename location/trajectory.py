@@ -0,0 +1,184 @@
+"""
+Compact storage of old location history.
+
+Routine points older than LOCATION_COMPACT_AFTER_DAYS are rolled, per
+user and day, from Location rows into one LocationTrack. Its blob holds
+the points in time order as varints: for each point the zigzag-encoded
+change in latitude and longitude, in integer microdegrees (the precision
+of Location's DecimalFields), and the seconds since the previous point.
+A point that barely moved thus takes 3 to 5 bytes instead of a full row
+and its index entries.
+
+Compacted points keep their coordinates and their time to the second,
+but not their id. Emergency points are never compacted. Reads go through
+location_history, which merges both stores.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from config.db import delete_rows
+
+from .models import LatestLocation, Location, LocationTrack
+
+FORMAT_VERSION = 1
+
+
+def _to_micro(value):
+    return int((Decimal(str(value)) * 1000000).to_integral_value())
+
+
+def _from_micro(value):
+    return Decimal(value).scaleb(-6)
+
+
+def _zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n):
+    return n // 2 if not n & 1 else -(n // 2) - 1
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def encode_track(points):
+    """
+    Pack (latitude, longitude, timestamp) points into a blob.
+
+    Returns:
+        tuple: (time of the first point, time of the last point, blob),
+        times truncated to whole seconds
+    """
+    points = sorted(
+        ((_to_micro(lat), _to_micro(lng), int(timestamp.timestamp())) for lat, lng, timestamp in points),
+        key=lambda point: point[2]
+    )
+    out = bytearray([FORMAT_VERSION])
+    prev_lat = prev_lng = 0
+    prev_time = points[0][2]
+    for lat, lng, seconds in points:
+        _write_varint(out, _zigzag(lat - prev_lat))
+        _write_varint(out, _zigzag(lng - prev_lng))
+        _write_varint(out, seconds - prev_time)
+        prev_lat, prev_lng, prev_time = lat, lng, seconds
+    return (
+        datetime.fromtimestamp(points[0][2], dt_timezone.utc),
+        datetime.fromtimestamp(points[-1][2], dt_timezone.utc),
+        bytes(out),
+    )
+
+
+def decode_track(start, data):
+    """The (latitude, longitude, timestamp) points of a blob, oldest first"""
+    data = bytes(data)
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(f"Unknown track format {data[0]}")
+    points = []
+    lat = lng = 0
+    seconds = int(start.timestamp())
+    pos = 1
+    while pos < len(data):
+        d_lat, pos = _read_varint(data, pos)
+        d_lng, pos = _read_varint(data, pos)
+        d_time, pos = _read_varint(data, pos)
+        lat += _unzigzag(d_lat)
+        lng += _unzigzag(d_lng)
+        seconds += d_time
+        points.append((_from_micro(lat), _from_micro(lng), datetime.fromtimestamp(seconds, dt_timezone.utc)))
+    return points
+
+
+def _day_start(date):
+    return timezone.make_aware(datetime.combine(date, datetime.min.time()))
+
+
+def compaction_cutoff(days=None):
+    """Points before the start of this day are compacted"""
+    if days is None:
+        days = getattr(settings, 'LOCATION_COMPACT_AFTER_DAYS', 30)
+    return _day_start(timezone.localdate() - timedelta(days=days))
+
+
+def compact_day(user_id, date, rows):
+    """
+    Roll one user's (id, latitude, longitude, timestamp) rows of one day
+    into their track, merging with points compacted earlier (e.g. from a
+    late batch upload), and delete the rows. A LatestLocation copied from
+    one of them keeps its position but loses its location_id.
+    """
+    with transaction.atomic():
+        track = LocationTrack.objects.select_for_update().filter(user_id=user_id, date=date).first()
+        points = [row[1:] for row in rows]
+        if track is not None:
+            points += decode_track(track.start, track.data)
+        else:
+            track = LocationTrack(user_id=user_id, date=date)
+        track.start, track.end, track.data = encode_track(points)
+        track.point_count = len(points)
+        track.save()
+
+        ids = [row[0] for row in rows]
+        # Plain DELETE statements: the row-by-row delete signals only
+        # concern LatestLocation, which is unlinked here instead
+        LatestLocation.objects.filter(user_id=user_id, location_id__in=ids).update(location_id=None)
+        delete_rows(Location, ids)
+
+
+def compact_locations(days=None):
+    """
+    Compact every routine point older than the cutoff, one user-day per
+    transaction. Returns (user-days written, points compacted).
+    """
+    old = Location.objects.filter(timestamp__lt=compaction_cutoff(days), is_emergency=False)
+    tracks = points = 0
+    for user_id in list(old.order_by().values_list('user_id', flat=True).distinct()):
+        user_old = old.filter(user_id=user_id)
+        while True:
+            # Oldest remaining day first, read through the (user, timestamp) index
+            first = user_old.order_by('timestamp').values_list('timestamp', flat=True).first()
+            if first is None:
+                break
+            date = timezone.localdate(first)
+            rows = list(user_old.filter(
+                timestamp__gte=_day_start(date),
+                timestamp__lt=_day_start(date + timedelta(days=1))
+            ).values_list('id', 'latitude', 'longitude', 'timestamp'))
+            compact_day(user_id, date, rows)
+            tracks += 1
+            points += len(rows)
+    return tracks, points
+
+
+def location_history(user):
+    """
+    All of a user's points as Location instances, newest first. Points
+    read from tracks are unsaved instances with id None.
+    """
+    locations = list(Location.objects.filter(user=user).order_by('-timestamp'))
+    for track in LocationTrack.objects.filter(user=user):
+        locations.extend(
+            Location(id=None, user=user, latitude=lat, longitude=lng, timestamp=timestamp)
+            for lat, lng, timestamp in decode_track(track.start, track.data)
+        )
+    locations.sort(key=lambda location: location.timestamp, reverse=True)
+    return locations
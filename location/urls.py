@@ -6,6 +6,7 @@ router = DefaultRouter()
 router.register(r'', LocationViewSet, basename='location')
 
 urlpatterns = [
-    path('', include(router.urls)),
+    # Before the router, whose detail route would take it for a location id
     path('emergency-locations/', EmergencyLocationsListView.as_view(), name='emergency-locations'),
+    path('', include(router.urls)),
 ]
@@ -1,12 +1,22 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, mixins, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from .models import Location
-from .serializers import LocationSerializer
-from users.permissions import IsSameUserOrAdmin
+from .models import LatestLocation, Location
+from .serializers import LatestLocationSerializer, LocationPointSerializer, LocationSerializer
+from .movement import movement_filter
+from .services import latest_locations, save_locations
+from config.params import parse_point_params
+from config.renderers import NDJSONParser, ORJSONParser
+from users.permissions import IsEmergencyService, IsSameUserOrAdmin
+from emergency.distance import coordinate_arrays, nearest_within
 
 class LocationViewSet(mixins.CreateModelMixin,
                       mixins.RetrieveModelMixin,
@@ -28,32 +38,109 @@ class LocationViewSet(mixins.CreateModelMixin,
             return Location.objects.all().order_by('-timestamp')
         return Location.objects.filter(user=user).order_by('-timestamp')
     
-    def perform_create(self, serializer):
-        # Automatically set the current user
-        serializer.save(user=self.request.user)
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Automatically set the current user; routine pings are buffered
+        locations = save_locations(request.user, [serializer.validated_data])
+        if not locations:
+            # Too close to the last accepted point to be worth storing:
+            # answer with the point it was merged into
+            serializer = self.get_serializer(movement_filter.last_accepted(request.user.id))
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer.instance = locations[0]
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @action(detail=False, methods=['get'])
     def latest(self, request):
         """Get the user's latest location"""
-        location = Location.objects.filter(user=request.user).order_by('-timestamp').first()
+        location = LatestLocation.objects.filter(user=request.user).first()
         if location:
-            serializer = self.get_serializer(location)
+            serializer = LatestLocationSerializer(location)
             return Response(serializer.data)
         return Response({"detail": "No location found for this user"}, status=status.HTTP_404_NOT_FOUND)
     
+    @action(detail=False, methods=['get'],
+            permission_classes=[permissions.IsAuthenticated, IsEmergencyService | permissions.IsAdminUser])
+    def current(self, request):
+        """
+        Latest position of many users at once (emergency services and
+        admin only), read from the latest-location table. Optional filters:
+        users (comma-separated ids), role, active_minutes, and lat/lng with
+        radius in km, which also sorts the closest first.
+        """
+        params = request.query_params
+        try:
+            user_ids = [uuid.UUID(pk) for pk in params['users'].split(',')] if params.get('users') else None
+            active_minutes = int(params['active_minutes']) if params.get('active_minutes') else None
+            lat, lng, radius = parse_point_params(params)
+        except ValueError:
+            return Response(
+                {'error': 'users must be ids and active_minutes, lat, lng and radius numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        since = timezone.now() - timedelta(minutes=active_minutes) if active_minutes is not None else None
+        queryset = latest_locations(user_ids=user_ids, since=since)
+        if params.get('role'):
+            queryset = queryset.filter(user__role=params['role'])
+        
+        if lat is None or lng is None:
+            locations = queryset.order_by('-timestamp')
+        else:
+            ids, lats, lngs = coordinate_arrays(queryset.values_list('user_id', 'latitude', 'longitude'))
+            indices, distances = nearest_within(lat, lng, lats, lngs, radius)
+            distance_by_id = {ids[i]: float(d) for i, d in zip(indices, distances)}
+            locations = sorted(
+                LatestLocation.objects.filter(pk__in=list(distance_by_id)),
+                key=lambda l: distance_by_id[l.user_id]
+            )
+        return Response(LatestLocationSerializer(locations, many=True).data)
+    
     @action(detail=False, methods=['post'])
     def emergency(self, request):
         """Update user location during emergency"""
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            # Create new location record with emergency flag
-            serializer.save(
-                user=request.user,
-                is_emergency=True
-            )
+            # Create new location record with emergency flag, written
+            # immediately rather than buffered
+            serializer.instance = save_locations(
+                request.user,
+                [{**serializer.validated_data, 'is_emergency': True}]
+            )[0]
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], parser_classes=[ORJSONParser, NDJSONParser])
+    def batch(self, request):
+        """
+        Store many timestamped points at once, sent as a JSON array or as
+        NDJSON (one point per line). The whole batch is validated first
+        and stored, or rejected as a whole; points the movement filter
+        finds redundant are counted as suppressed.
+        """
+        points = request.data
+        if not isinstance(points, list) or not points:
+            return Response(
+                {'error': 'Expected a non-empty array of points'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_points = settings.LOCATION_BATCH_MAX_POINTS
+        if len(points) > max_points:
+            return Response(
+                {'error': f'A batch may contain at most {max_points} points'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = LocationPointSerializer(data=points, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        locations = save_locations(request.user, serializer.validated_data)
+        return Response(
+            {'created': len(locations), 'suppressed': len(points) - len(locations)},
+            status=status.HTTP_201_CREATED
+        )
+
 class EmergencyLocationsListView(generics.ListAPIView):
     """List all emergency locations (for emergency services and admin only)"""
     serializer_class = LocationSerializer
@@ -64,6 +151,31 @@ class EmergencyLocationsListView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_staff or user.role in ['FIRE_STATION', 'POLICE', 'RED_CRESCENT']:
-            return Location.objects.filter(is_emergency=True).order_by('-timestamp')
-        # Regular users can only see their own emergency locations
-        return Location.objects.filter(user=user, is_emergency=True).order_by('-timestamp')
+            queryset = Location.objects.filter(is_emergency=True).order_by('-timestamp')
+        else:
+            # Regular users can only see their own emergency locations
+            queryset = Location.objects.filter(user=user, is_emergency=True).order_by('-timestamp')
+        
+        lat, lng, radius = parse_point_params(self.request.query_params)
+        if lat is None:
+            return queryset
+        
+        # Optional proximity filter, closest locations first
+        ids, lats, lngs = coordinate_arrays(queryset.values_list('id', 'latitude', 'longitude'))
+        indices, distances = nearest_within(lat, lng, lats, lngs, radius)
+        distance_by_id = {ids[i]: float(d) for i, d in zip(indices, distances)}
+        
+        locations = list(Location.objects.filter(pk__in=list(distance_by_id)))
+        for location in locations:
+            location.distance = distance_by_id[location.id]
+        return sorted(locations, key=lambda l: l.distance)
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            parse_point_params(request.query_params)
+        except ValueError:
+            return Response(
+                {'error': 'lat, lng and radius must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().list(request, *args, **kwargs)
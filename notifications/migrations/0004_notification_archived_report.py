@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2025-07-18 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0014_archivedemergencyreport'),
+        ('notifications', '0003_rename_notificatio_recipie_71c65a_idx_notificatio_recipie_236852_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='archived_report',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notifications', to='emergency.archivedemergencyreport'),
+        ),
+    ]
@@ -1,7 +1,7 @@
 import uuid
 from django.db import models
 from users.models import User
-from emergency.models import EmergencyReport
+from emergency.models import ArchivedEmergencyReport, EmergencyReport
 
 class Notification(models.Model):
     """Model for storing user notifications"""
@@ -29,6 +29,14 @@ class Notification(models.Model):
         blank=True, 
         related_name='notifications'
     )
+    # Set instead of emergency_report once the report is archived
+    archived_report = models.ForeignKey(
+        ArchivedEmergencyReport,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
     
     class Meta:
         ordering = ['-timestamp']
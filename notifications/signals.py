@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification
+from .versions import bump_notifications
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def bump_recipient_notifications(sender, instance, **kwargs):
+    """Invalidate cached copies of the recipient's notifications"""
+    bump_notifications([instance.recipient_id])
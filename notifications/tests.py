@@ -1,3 +1,68 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from users.models import User
+from .models import Notification
+
+
+def make_user(username, role='CITIZEN'):
+    return User.objects.create_user(username, f'{username}@example.com', 'pass', role=role)
+
+
+class ConditionalNotificationListTests(TestCase):
+    url = '/api/notifications/'
+
+    def setUp(self):
+        self.user = make_user('citizen')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Notification.objects.create(recipient=self.user, title='Welcome', message='Hello')
+
+    def get(self, etag=None, url=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url or self.url, **headers)
+
+    def test_unchanged_list_is_answered_with_304(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        # Version counters are not times
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        # Another page is another representation
+        self.assertEqual(self.get(etag, f'{self.url}?page_size=1').status_code, 200)
+
+    def test_writes_change_the_etag(self):
+        etag = self.get()['ETag']
+        notification = Notification.objects.create(recipient=self.user, title='Update', message='Resolved')
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+        etag = response['ETag']
+
+        # Bulk update, bumped by the view
+        self.client.post('/api/notifications/mark-all-read/')
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        notification.delete()
+        self.assertEqual(self.get(etag).status_code, 200)
+
+    def test_etags_are_per_user(self):
+        etag = self.get()['ETag']
+        other = make_user('other')
+        # Someone else's notifications do not invalidate this user's list
+        Notification.objects.create(recipient=other, title='Welcome', message='Hello')
+        self.assertEqual(self.get(etag).status_code, 304)
+
+        self.client.force_authenticate(other)
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,23 @@
+"""
+Per-user change counters for notifications, used to validate conditional
+GETs of notification lists and dashboards. Every write to a user's
+notifications must bump their counter: single saves and deletes do so
+through notifications.signals, bulk updates call bump_notifications.
+"""
+import uuid
+
+from config.generations import bump_generation, current_generation
+
+
+def _generation_key(user_id):
+    return f'notifications:{uuid.UUID(str(user_id)).hex}'
+
+
+def notifications_version(user_id):
+    return current_generation(_generation_key(user_id))
+
+
+def bump_notifications(user_ids):
+    """Mark the notifications of the given users as changed"""
+    for user_id in set(user_ids):
+        bump_generation(_generation_key(user_id))
@@ -6,19 +6,28 @@ from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
 from .models import Notification
 from .serializers import NotificationSerializer, FCMTokenSerializer
+from .versions import bump_notifications, notifications_version
 from users.models import DeviceToken
+from config.conditional import ConditionalGetMixin
 
 class NotificationPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 50
 
-class NotificationListView(APIView):
+class NotificationListView(ConditionalGetMixin, APIView):
     """List all notifications for the current user"""
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = NotificationPagination
     
+    def get_version(self, request):
+        return notifications_version(request.user.id), None
+    
     def get(self, request):
+        not_modified = self.not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        
         notifications = Notification.objects.filter(recipient=request.user)
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(notifications, request)
@@ -91,4 +100,5 @@ def register_fcm_token(request):
 def mark_all_read(request):
     """Mark all notifications as read for the current user"""
     Notification.objects.filter(recipient=request.user).update(is_read=True)
+    bump_notifications([request.user.id])
     return Response({'status': 'All notifications marked as read'}, status=status.HTTP_200_OK)
@@ -1,5 +1,6 @@
 import requests
 from decouple import config
+from requests.adapters import HTTPAdapter
 
 # Load environment variables
 DISCORD_WEBHOOK_URL = config("DISCORD_WEBHOOK_URL")
@@ -8,82 +9,105 @@ FACEBOOK_ACCESS_TOKEN = "EAAGyZCdjiiZBoBO3Am4r0fQPVbUZBDAwWLM04zloU8o1hZAlwtRYhy
 TELEGRAM_BOT_TOKEN = config("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = config("TELEGRAM_CHAT_ID")
 
+# API base URLs, overridable to point at a local stub (see script/social_stub_server.py)
+FACEBOOK_GRAPH_URL = config("FACEBOOK_GRAPH_URL", default="https://graph.facebook.com")
+TELEGRAM_API_URL = config("TELEGRAM_API_URL", default="https://api.telegram.org")
+
+# (connect, read) timeouts in seconds per platform; media uploads need a long read timeout
+TIMEOUTS = {
+    "DISCORD": (5, 60),
+    "FACEBOOK": (5, 120),
+    "TELEGRAM": (5, 120),
+}
+
+# Shared connection-pooled session, safe to use from the posting thread pool
+http_session = requests.Session()
+http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+http_session.mount("https://", http_adapter)
+http_session.mount("http://", http_adapter)
+
 # Discord Functions
 def send_file_to_discord(file_path, message=""):
     """
     Send a file (photo or video) to Discord via a webhook.
     If file_path is None, sends only the message.
+    Returns True if Discord accepted the message.
     """
     if file_path:
         with open(file_path, "rb") as file:
             files = {"file": file}
             data = {"content": message}
-            response = requests.post(DISCORD_WEBHOOK_URL, files=files, data=data)
+            response = http_session.post(DISCORD_WEBHOOK_URL, files=files, data=data, timeout=TIMEOUTS["DISCORD"])
     else:
         # Send text-only message
         data = {"content": message}
-        response = requests.post(DISCORD_WEBHOOK_URL, json=data)
+        response = http_session.post(DISCORD_WEBHOOK_URL, json=data, timeout=TIMEOUTS["DISCORD"])
     
     if response.status_code == 200 or response.status_code == 204:
         print("Message sent to Discord successfully!")
-    else:
-        print(f"Error sending to Discord: {response.status_code}, {response.text}")
+        return True
+    print(f"Error sending to Discord: {response.status_code}, {response.text}")
+    return False
 
 # Facebook Functions
 def post_to_facebook(file_path, message="", is_video=False):
     """
     Post a photo or video to a Facebook page.
     If file_path is None, creates a text-only post.
+    Returns True if Facebook accepted the post.
     """
     if file_path:
-        url = f"https://graph.facebook.com/{FACEBOOK_PAGE_ID}/{'videos' if is_video else 'photos'}"
+        url = f"{FACEBOOK_GRAPH_URL}/{FACEBOOK_PAGE_ID}/{'videos' if is_video else 'photos'}"
         params = {
             "access_token": FACEBOOK_ACCESS_TOKEN,
             "description" if is_video else "message": message,
         }
         with open(file_path, "rb") as file:
             files = {"source": file}
-            response = requests.post(url, files=files, params=params)
+            response = http_session.post(url, files=files, params=params, timeout=TIMEOUTS["FACEBOOK"])
     else:
         # Text-only post
-        url = f"https://graph.facebook.com/{FACEBOOK_PAGE_ID}/feed"
+        url = f"{FACEBOOK_GRAPH_URL}/{FACEBOOK_PAGE_ID}/feed"
         params = {
             "message": message,
             "access_token": FACEBOOK_ACCESS_TOKEN,
         }
-        response = requests.post(url, params=params)
+        response = http_session.post(url, params=params, timeout=TIMEOUTS["FACEBOOK"])
     
     if response.status_code == 200:
         print("Posted to Facebook successfully!")
-    else:
-        print(f"Error posting to Facebook: {response.json()}")
+        return True
+    print(f"Error posting to Facebook: {response.status_code}, {response.text}")
+    return False
 
 # Telegram Functions
 def send_media_to_telegram(file_path, caption="", is_video=False):
     """
     Send a photo or video to a Telegram chat.
     If file_path is None, sends a text-only message.
+    Returns True if Telegram accepted the message.
     """
     if file_path:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/{'sendVideo' if is_video else 'sendPhoto'}"
+        url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_BOT_TOKEN}/{'sendVideo' if is_video else 'sendPhoto'}"
         with open(file_path, "rb") as media:
             files = {"video" if is_video else "photo": media}
             data = {
                 "chat_id": TELEGRAM_CHAT_ID,
                 "caption": caption,
             }
-            response = requests.post(url, files=files, data=data)
+            response = http_session.post(url, files=files, data=data, timeout=TIMEOUTS["TELEGRAM"])
     else:
         # Text-only message
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+        url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
         data = {
             "chat_id": TELEGRAM_CHAT_ID,
             "text": caption,
             "parse_mode": "HTML"  # Enable HTML formatting if needed
         }
-        response = requests.post(url, data=data)
+        response = http_session.post(url, data=data, timeout=TIMEOUTS["TELEGRAM"])
     
     if response.status_code == 200:
         print(f"{'Message' if not file_path else 'Video' if is_video else 'Photo'} sent to Telegram successfully!")
-    else:
-        print(f"Error sending to Telegram: {response.status_code}, {response.text}")
+        return True
+    print(f"Error sending to Telegram: {response.status_code}, {response.text}")
+    return False
@@ -0,0 +1,62 @@
+"""
+Local stand-in for the Facebook, Telegram and Discord APIs.
+
+Accepts every POST, logs what was received and answers like the real
+APIs do on success, so the social media outbox can be exercised end to
+end without network access. Point the app at it with:
+
+    FACEBOOK_GRAPH_URL=http://127.0.0.1:8765/facebook
+    TELEGRAM_API_URL=http://127.0.0.1:8765/telegram
+    DISCORD_WEBHOOK_URL=http://127.0.0.1:8765/discord/webhook
+
+Usage: python script/social_stub_server.py [--port 8765] [--delay 0.5] [--fail discord]
+"""
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(delay, failing):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            platform = self.path.strip("/").split("/")[0]
+            time.sleep(delay)
+
+            if platform in failing:
+                self.respond(500, {"error": f"{platform} stub configured to fail"})
+            elif platform == "discord":
+                self.respond(204, None)
+            elif platform == "telegram":
+                self.respond(200, {"ok": True, "result": {"message_id": 1}})
+            else:
+                self.respond(200, {"id": uuid.uuid4().hex})
+            print(f"{platform}: {self.path} ({length} bytes)")
+
+        def respond(self, status, payload):
+            body = b"" if payload is None else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Social media API stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--fail", nargs="*", default=[], help="Platforms that should answer with an error")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.delay, set(args.fail)))
+    print(f"Social media stub listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
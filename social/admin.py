@@ -1,3 +1,14 @@
 from django.contrib import admin
+from .models import MediaAsset, SocialOutbox
 
-# Register your models here.
+@admin.register(MediaAsset)
+class MediaAssetAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'original_name', 'size', 'created_at')
+    search_fields = ('sha256', 'original_name')
+    readonly_fields = ('sha256', 'file', 'size', 'created_at')
+
+@admin.register(SocialOutbox)
+class SocialOutboxAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'attempts', 'created_at', 'processed_at')
+    list_filter = ('status',)
+    readonly_fields = ('created_at', 'processed_at', 'results', 'last_error')
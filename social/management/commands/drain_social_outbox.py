@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from social.services import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Publish queued emergency posts from the social media outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when the outbox is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        while True:
+            close_old_connections()
+            handled = drain_outbox(batch_size)
+            if handled:
+                self.stdout.write(f"Published {handled} outbox entr{'y' if handled == 1 else 'ies'}")
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
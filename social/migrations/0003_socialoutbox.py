@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2025-07-14 16:05
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emergency', '0007_emergencyreport_timestamp_id_index'),
+        ('social', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialOutbox',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('emergency_data', models.JSONField()),
+                ('location_data', models.JSONField(blank=True, null=True)),
+                ('media', models.FileField(blank=True, null=True, upload_to='social_outbox/')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('results', models.JSONField(blank=True, null=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('emergency_report', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='social_posts', to='emergency.emergencyreport')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='social_soci_status_942265_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2025-07-15 09:41
+
+import django.db.models.deletion
+import hashlib
+import os
+import uuid
+from django.db import migrations, models
+
+
+def move_outbox_media_to_assets(apps, schema_editor):
+    MediaAsset = apps.get_model('social', 'MediaAsset')
+    SocialOutbox = apps.get_model('social', 'SocialOutbox')
+    for entry in SocialOutbox.objects.exclude(media='').exclude(media__isnull=True).iterator():
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with entry.media.open('rb') as media:
+                for chunk in media.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+        except FileNotFoundError:
+            continue
+        # Existing files stay where they are; only new uploads use the hashed layout
+        asset, _ = MediaAsset.objects.get_or_create(
+            sha256=digest.hexdigest(),
+            defaults={
+                'file': entry.media.name,
+                'original_name': os.path.basename(entry.media.name),
+                'size': size,
+            }
+        )
+        entry.asset = asset
+        entry.save(update_fields=['asset'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('social', '0003_socialoutbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaAsset',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='social_media/')),
+                ('original_name', models.CharField(blank=True, default='', max_length=255)),
+                ('size', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='socialoutbox',
+            name='asset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='outbox_entries', to='social.mediaasset'),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='asset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='social.mediaasset'),
+        ),
+        migrations.RunPython(move_outbox_media_to_assets, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='socialoutbox',
+            name='media',
+        ),
+    ]
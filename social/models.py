@@ -1,9 +1,33 @@
 import uuid
 from django.db import models
+from django.utils import timezone
 
 from location.models import Location
 from users.models import User
 
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.wmv')
+
+
+class MediaAsset(models.Model):
+    """
+    A photo or video stored once under the SHA-256 of its content.
+    Every post and outbox entry that uses the same file shares one asset.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='social_media/', max_length=255)
+    original_name = models.CharField(max_length=255, blank=True, default='')
+    size = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def is_video(self):
+        return self.file.name.lower().endswith(VIDEO_EXTENSIONS)
+
+    def __str__(self):
+        return f"{self.original_name or self.file.name} ({self.sha256[:12]})"
+
+
 class SocialPost(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     PLATFORM_CHOICES = [
@@ -15,8 +39,62 @@ class SocialPost(models.Model):
     content = models.TextField()
     photo = models.ImageField(upload_to='social_photos/', blank=True, null=True)
     video = models.FileField(upload_to='social_videos/', blank=True, null=True)
+    asset = models.ForeignKey(
+        MediaAsset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='posts'
+    )
     status = models.CharField(max_length=20, default='PENDING')
     timestamp = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.platform} - {self.timestamp}"
\ No newline at end of file
+        return f"{self.platform} - {self.timestamp}"
+
+
+class SocialOutbox(models.Model):
+    """
+    Emergency posts waiting to be published to social media.
+    Rows are written in the same transaction as the emergency report and
+    drained by the drain_social_outbox management command.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+    emergency_report = models.ForeignKey(
+        'emergency.EmergencyReport',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='social_posts'
+    )
+    emergency_data = models.JSONField()
+    location_data = models.JSONField(null=True, blank=True)
+    asset = models.ForeignKey(
+        MediaAsset,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='outbox_entries'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    results = models.JSONField(null=True, blank=True)
+    available_at = models.DateTimeField(default=timezone.now)  # Not picked up before this time
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"Outbox {self.status} - {self.created_at}"
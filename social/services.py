@@ -0,0 +1,344 @@
+import hashlib
+import logging
+import os
+import tempfile
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MediaAsset, SocialPost, SocialOutbox
+from script.all_social import send_file_to_discord, post_to_facebook, send_media_to_telegram
+
+logger = logging.getLogger(__name__)
+
+# All platforms posts are published to
+PLATFORMS = ['FACEBOOK', 'TELEGRAM', 'DISCORD']
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class _MoveIntoPlace:
+    """
+    on_commit callback that moves a stored upload from its temp file to
+    its final path. If the transaction rolls back, Django drops the
+    callback without running it and the finalizer deletes the temp file.
+    """
+    def __init__(self, tmp_path, path):
+        self.tmp_path = tmp_path
+        self.path = path
+        self._cleanup = weakref.finalize(self, _remove_file, tmp_path)
+    
+    def __call__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        os.replace(self.tmp_path, self.path)
+        os.chmod(self.path, settings.FILE_UPLOAD_PERMISSIONS)
+        self._cleanup.detach()
+
+def store_media_asset(media_file):
+    """
+    Store an uploaded photo or video once, keyed by the SHA-256 of its content
+    
+    The upload is streamed to a temporary file in chunks while it is hashed,
+    so large videos are never held in memory. The file is only moved into
+    place under social_media/<hash prefix>/<hash><ext> once the transaction
+    that records the asset commits, so a rollback leaves no file without a
+    row. Uploading a file that is already stored returns the existing asset
+    and discards the new copy.
+    
+    Returns:
+        MediaAsset: The stored asset
+    """
+    original_name = os.path.basename(media_file.name or '')
+    ext = os.path.splitext(original_name)[1].lower()
+    
+    digest = hashlib.sha256()
+    size = 0
+    if hasattr(media_file, 'seek'):
+        media_file.seek(0)
+    with tempfile.NamedTemporaryFile(dir=settings.TEMP_MEDIA_ROOT, delete=False) as tmp:
+        try:
+            for chunk in media_file.chunks():
+                digest.update(chunk)
+                size += len(chunk)
+                tmp.write(chunk)
+        except Exception:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    sha256 = digest.hexdigest()
+    
+    asset = MediaAsset.objects.filter(sha256=sha256).first()
+    if asset is not None:
+        os.remove(tmp.name)
+        return asset
+    
+    name = f"social_media/{sha256[:2]}/{sha256}{ext}"
+    try:
+        with transaction.atomic():
+            asset = MediaAsset.objects.create(
+                sha256=sha256,
+                file=name,
+                original_name=original_name,
+                size=size
+            )
+    except IntegrityError:
+        # Stored concurrently by another request; the file content is identical
+        os.remove(tmp.name)
+        return MediaAsset.objects.get(sha256=sha256)
+    except Exception:
+        os.remove(tmp.name)
+        raise
+    # Runs at once outside a transaction
+    transaction.on_commit(_MoveIntoPlace(tmp.name, os.path.join(settings.MEDIA_ROOT, name)))
+    return asset
+
+def send_to_platform(platform, file_path, content, is_video=False):
+    """
+    Post content, with an optional photo or video, to a single platform
+    
+    Returns:
+        bool: True if the platform accepted the post
+    """
+    if platform == 'DISCORD':
+        return send_file_to_discord(file_path, content)
+    elif platform == 'FACEBOOK':
+        return post_to_facebook(file_path, content, is_video)
+    elif platform == 'TELEGRAM':
+        return send_media_to_telegram(file_path, content, is_video)
+    raise ValueError(f"Unknown platform: {platform}")
+
+def publish_to_platforms(platforms, file_path, content, is_video=False):
+    """
+    Post to several platforms concurrently on a thread pool, so the total
+    time is that of the slowest platform rather than the sum of all of them
+    
+    Returns:
+        dict: 'success' is True only if every platform accepted the post,
+        'results' holds one result dict per platform, in the order given,
+        and on failure 'error' names each failed platform and its error
+    """
+    if not platforms:
+        return {'success': True, 'results': []}
+    
+    with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+        futures = [
+            executor.submit(send_to_platform, platform, file_path, content, is_video)
+            for platform in platforms
+        ]
+    
+    post_results = []
+    for platform, future in zip(platforms, futures):
+        try:
+            if future.result():
+                post_results.append({'platform': platform, 'status': 'success'})
+            else:
+                post_results.append({'platform': platform, 'status': 'failed', 'error': f'{platform.title()} rejected the post'})
+        except Exception as e:
+            logger.warning(f"Posting to {platform} failed: {e}")
+            post_results.append({'platform': platform, 'status': 'failed', 'error': str(e) or e.__class__.__name__})
+    
+    failed = [result for result in post_results if result['status'] != 'success']
+    outcome = {'success': not failed, 'results': post_results}
+    if failed:
+        outcome['error'] = '; '.join(f"{result['platform']}: {result['error']}" for result in failed)
+    return outcome
+
+def post_emergency_to_social_media(emergency_data, location_data=None, media_file=None, asset=None, platforms=None):
+    """
+    Post emergency report to social media platforms
+    
+    Args:
+        emergency_data: Emergency report data (description, type, etc.)
+        location_data: Location data of the emergency (optional)
+        media_file: Image or video file to be attached to the post (optional)
+        asset: Already stored MediaAsset to attach instead of media_file (optional)
+        platforms: Platforms to post to (optional, all of PLATFORMS by default)
+    
+    Returns:
+        dict: As returned by publish_to_platforms; 'success' is False
+        if any platform failed
+    """
+    try:
+        # Prepare content for social media post
+        description = emergency_data.get('description', 'Emergency reported')
+        emergency_type = emergency_data.get('emergency_type', 'GENERAL')
+        
+        # Extract additional emergency details
+        contact_info = emergency_data.get('contact_info', '')
+        severity = emergency_data.get('severity', '')
+        people_count = emergency_data.get('people_count', '')
+        
+        # Create more descriptive content for social media
+        location_info = ""
+        if location_data:
+            if location_data.get('address'):
+                location_info = f"📍 Location: {location_data.get('address')}"
+            elif location_data.get('latitude') and location_data.get('longitude'):
+                location_info = f"📍 Location: Latitude {location_data.get('latitude')}, Longitude {location_data.get('longitude')}"
+                # Add Google Maps link
+                lat = location_data.get('latitude')
+                lng = location_data.get('longitude')
+                location_info += f"\n🗺️ Map: https://www.google.com/maps?q={lat},{lng}"
+        
+        # Build a more comprehensive message
+        content = f"🚨 EMERGENCY ALERT 🚨\n\n{description}\n\n🔴 Type: {emergency_type}"
+        
+        if severity:
+            content += f"\n⚠️ Severity: {severity}"
+            
+        if people_count:
+            content += f"\n👥 People affected: {people_count}"
+            
+        if contact_info:
+            content += f"\n📞 Contact: {contact_info}"
+            
+        if location_info:
+            content += f"\n{location_info}"
+            
+        content += "\n\n#EmergencyAlert #ResQApp"
+        
+        platforms = PLATFORMS if platforms is None else platforms
+        
+        # Store the media file once and share it between all posts
+        if media_file and asset is None:
+            asset = store_media_asset(media_file)
+        file_path = asset.file.path if asset else None
+        is_video = asset.is_video if asset else False
+        
+        social_posts = []
+        for platform in platforms:
+            # Create a record in the database
+            social_post = SocialPost(
+                platform=platform,
+                content=content,
+                photo=asset.file.name if asset and not is_video else None,
+                video=asset.file.name if asset and is_video else None,
+                asset=asset,
+                status='PROCESSING'
+            )
+            social_post.save()
+            social_posts.append(social_post)
+        
+        # Post to every platform at once
+        outcome = publish_to_platforms(platforms, file_path, content, is_video)
+        
+        # Update statuses with the outcome
+        for social_post, result in zip(social_posts, outcome['results']):
+            social_post.status = 'POSTED' if result['status'] == 'success' else 'FAILED'
+            social_post.save(update_fields=['status'])
+        
+        return outcome
+    
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
+
+def enqueue_emergency_post(emergency_data, location_data=None, media_file=None, report=None):
+    """
+    Add an emergency post to the social media outbox
+    
+    Call this inside the transaction that creates the report so the post is
+    only queued if the report is saved.
+    
+    Args:
+        emergency_data: Emergency report data (description, type, etc.)
+        location_data: Location data of the emergency (optional)
+        media_file: Uploaded image or video to attach to the post (optional)
+        report: EmergencyReport the post belongs to (optional)
+    
+    Returns:
+        SocialOutbox: The queued entry
+    """
+    asset = None
+    if media_file and hasattr(media_file, 'chunks'):
+        asset = store_media_asset(media_file)
+    return SocialOutbox.objects.create(
+        emergency_report=report,
+        emergency_data=emergency_data,
+        location_data=location_data,
+        asset=asset
+    )
+
+def claim_outbox_entries(batch_size=10):
+    """
+    Lock and claim a batch of due outbox entries for this worker
+    
+    Claimed entries are leased for SOCIAL_OUTBOX_LEASE_SECONDS; if the worker
+    dies before finishing, another worker picks them up once the lease ends.
+    """
+    now = timezone.now()
+    lease_until = now + timedelta(seconds=settings.SOCIAL_OUTBOX_LEASE_SECONDS)
+    with transaction.atomic():
+        entry_ids = list(
+            SocialOutbox.objects.select_for_update(skip_locked=True).filter(
+                status__in=['PENDING', 'PROCESSING'],
+                available_at__lte=now
+            ).order_by('available_at').values_list('id', flat=True)[:batch_size]
+        )
+        SocialOutbox.objects.filter(pk__in=entry_ids).update(
+            status='PROCESSING',
+            available_at=lease_until,
+            attempts=F('attempts') + 1
+        )
+    return list(SocialOutbox.objects.filter(pk__in=entry_ids).order_by('created_at'))
+
+def publish_outbox_entry(entry):
+    """
+    Publish a claimed outbox entry and record the outcome
+    
+    entry.results keeps the latest result of every platform. A retry only
+    posts to the platforms that have not accepted the post yet, so a
+    platform is never posted to twice. Entries with any failed platform
+    are retried with exponential backoff until SOCIAL_OUTBOX_MAX_ATTEMPTS
+    is reached.
+    """
+    results = {result['platform']: result for result in entry.results or []}
+    pending = [
+        platform for platform in PLATFORMS
+        if results.get(platform, {}).get('status') != 'success'
+    ]
+    try:
+        if pending:
+            outcome = post_emergency_to_social_media(
+                entry.emergency_data, entry.location_data, asset=entry.asset, platforms=pending
+            )
+        else:
+            outcome = {'success': True}
+    except Exception as e:
+        outcome = {'success': False, 'error': str(e)}
+    for result in outcome.get('results', []):
+        results[result['platform']] = result
+    
+    now = timezone.now()
+    entry.results = [results[platform] for platform in PLATFORMS if platform in results]
+    if outcome.get('success'):
+        entry.status = 'SENT'
+        entry.last_error = ''
+        entry.processed_at = now
+    elif entry.attempts >= settings.SOCIAL_OUTBOX_MAX_ATTEMPTS:
+        entry.status = 'FAILED'
+        entry.last_error = outcome.get('error', '')
+        entry.processed_at = now
+        logger.error(f"Giving up on social outbox entry {entry.id}: {entry.last_error}")
+    else:
+        entry.status = 'PENDING'
+        entry.last_error = outcome.get('error', '')
+        entry.available_at = now + timedelta(seconds=30 * 2 ** entry.attempts)
+        logger.warning(f"Social outbox entry {entry.id} failed, retrying at {entry.available_at}: {entry.last_error}")
+    entry.save(update_fields=['status', 'results', 'last_error', 'processed_at', 'available_at'])
+    return entry
+
+def drain_outbox(batch_size=10):
+    """Publish one batch of due outbox entries, returning how many were handled"""
+    entries = claim_outbox_entries(batch_size)
+    for entry in entries:
+        publish_outbox_entry(entry)
+    return len(entries)
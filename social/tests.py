@@ -0,0 +1,241 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from requests.exceptions import ReadTimeout
+
+from .models import MediaAsset, SocialOutbox, SocialPost
+from .services import (
+    claim_outbox_entries, drain_outbox, post_emergency_to_social_media, publish_to_platforms, store_media_asset
+)
+
+
+def fake_platforms(**outcomes):
+    """A send_to_platform stand-in: True/False per platform, or an exception to raise"""
+    def send(platform, file_path, content, is_video=False):
+        outcome = outcomes.get(platform, True)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return mock.patch('social.services.send_to_platform', side_effect=send)
+
+
+class PublishToPlatformsTests(TestCase):
+    def test_success_when_every_platform_accepts(self):
+        with fake_platforms():
+            outcome = publish_to_platforms(['FACEBOOK', 'DISCORD'], None, 'Fire')
+        self.assertTrue(outcome['success'])
+        self.assertNotIn('error', outcome)
+        self.assertEqual([r['status'] for r in outcome['results']], ['success', 'success'])
+
+    def test_any_failed_platform_fails_the_whole_post(self):
+        with fake_platforms(TELEGRAM=False, DISCORD=ReadTimeout('Read timed out')):
+            outcome = publish_to_platforms(['FACEBOOK', 'TELEGRAM', 'DISCORD'], None, 'Fire')
+        self.assertFalse(outcome['success'])
+        self.assertEqual(
+            [r['status'] for r in outcome['results']], ['success', 'failed', 'failed']
+        )
+        self.assertIn('TELEGRAM: Telegram rejected the post', outcome['error'])
+        self.assertIn('DISCORD: Read timed out', outcome['error'])
+
+
+
+class PlatformSenderTests(TestCase):
+    """Run the real dispatch with the three platform senders mocked out"""
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        os.makedirs(os.path.join(media_root, 'tmp'))
+        settings = override_settings(MEDIA_ROOT=media_root, TEMP_MEDIA_ROOT=os.path.join(media_root, 'tmp'))
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.senders = {}
+        for platform, name in [
+            ('DISCORD', 'send_file_to_discord'),
+            ('FACEBOOK', 'post_to_facebook'),
+            ('TELEGRAM', 'send_media_to_telegram'),
+        ]:
+            patcher = mock.patch(f'social.services.{name}', return_value=True)
+            self.senders[platform] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_partial_failure_is_reported_per_platform(self):
+        self.senders['FACEBOOK'].return_value = False
+        self.senders['TELEGRAM'].side_effect = ReadTimeout('Read timed out')
+        outcome = publish_to_platforms(['FACEBOOK', 'TELEGRAM', 'DISCORD'], 'flood.jpg', 'Flood', is_video=False)
+        self.assertFalse(outcome['success'])
+        self.assertEqual(
+            [(r['platform'], r['status']) for r in outcome['results']],
+            [('FACEBOOK', 'failed'), ('TELEGRAM', 'failed'), ('DISCORD', 'success')]
+        )
+        self.assertEqual(outcome['error'], 'FACEBOOK: Facebook rejected the post; TELEGRAM: Read timed out')
+        self.senders['DISCORD'].assert_called_once_with('flood.jpg', 'Flood')
+        self.senders['FACEBOOK'].assert_called_once_with('flood.jpg', 'Flood', False)
+
+    def test_no_platforms_posts_nothing(self):
+        self.assertEqual(publish_to_platforms([], None, 'Fire'), {'success': True, 'results': []})
+        outcome = post_emergency_to_social_media({'description': 'Fire'}, platforms=[])
+        self.assertTrue(outcome['success'])
+        self.assertFalse(SocialPost.objects.exists())
+        for sender in self.senders.values():
+            sender.assert_not_called()
+
+    def post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/social/post/', {
+                'content': 'Flood on the coast road',
+                'file': SimpleUploadedFile('flood.jpg', b'jpeg bytes', content_type='image/jpeg'),
+            })
+
+    def test_view_answers_502_when_a_platform_fails(self):
+        self.senders['DISCORD'].side_effect = ReadTimeout('Read timed out')
+        response = self.post()
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.json()['error'], 'Posting failed on DISCORD: Read timed out')
+        self.assertEqual(
+            dict(SocialPost.objects.values_list('platform', 'status')),
+            {'FACEBOOK': 'POSTED', 'TELEGRAM': 'POSTED', 'DISCORD': 'FAILED'}
+        )
+
+    def test_view_answers_200_when_every_platform_accepts(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SocialPost.objects.filter(status='POSTED').count(), 3)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.entry = SocialOutbox.objects.create(emergency_data={'description': 'Fire in the market'})
+
+    def drain(self, **outcomes):
+        with fake_platforms(**outcomes) as send:
+            drain_outbox()
+        self.entry.refresh_from_db()
+        return sorted(call.args[0] for call in send.call_args_list)
+
+    def make_due(self):
+        SocialOutbox.objects.filter(pk=self.entry.pk).update(available_at=timezone.now())
+
+    def test_failed_platform_fails_the_attempt_and_is_retried_alone(self):
+        posted = self.drain(DISCORD=False, FACEBOOK=ReadTimeout('Read timed out'))
+        self.assertEqual(posted, ['DISCORD', 'FACEBOOK', 'TELEGRAM'])
+        self.assertEqual(self.entry.status, 'PENDING')
+        self.assertEqual(self.entry.attempts, 1)
+        self.assertIn('DISCORD', self.entry.last_error)
+        self.assertIn('FACEBOOK: Read timed out', self.entry.last_error)
+        self.assertEqual(
+            {r['platform']: r['status'] for r in self.entry.results},
+            {'FACEBOOK': 'failed', 'TELEGRAM': 'success', 'DISCORD': 'failed'}
+        )
+        self.assertGreater(self.entry.available_at, timezone.now())
+
+        self.make_due()
+        posted = self.drain()
+        self.assertEqual(posted, ['DISCORD', 'FACEBOOK'])
+        self.assertEqual(self.entry.status, 'SENT')
+        self.assertEqual(self.entry.attempts, 2)
+        self.assertEqual(self.entry.last_error, '')
+        self.assertTrue(all(r['status'] == 'success' for r in self.entry.results))
+        # One post row per platform attempt, none for the platform that
+        # already had the post
+        self.assertEqual(SocialPost.objects.filter(platform='TELEGRAM').count(), 1)
+        self.assertEqual(SocialPost.objects.filter(platform='DISCORD').count(), 2)
+
+    @override_settings(SOCIAL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_entry_fails_after_max_attempts(self):
+        self.drain(TELEGRAM=False)
+        self.make_due()
+        posted = self.drain(TELEGRAM=False)
+        self.assertEqual(posted, ['TELEGRAM'])
+        self.assertEqual(self.entry.status, 'FAILED')
+        self.assertIn('TELEGRAM', self.entry.last_error)
+        self.assertIsNotNone(self.entry.processed_at)
+
+    def test_all_platforms_accepting_marks_the_entry_sent(self):
+        self.drain()
+        self.assertEqual(self.entry.status, 'SENT')
+        self.assertEqual(self.entry.attempts, 1)
+        self.assertEqual(SocialPost.objects.filter(status='POSTED').count(), 3)
+
+
+    @override_settings(SOCIAL_OUTBOX_LEASE_SECONDS=300)
+    def test_claimed_entries_are_leased_until_the_worker_finishes_or_dies(self):
+        later = SocialOutbox.objects.create(emergency_data={'description': 'Flood'})
+        SocialOutbox.objects.filter(pk=later.pk).update(available_at=timezone.now() + timedelta(minutes=5))
+        SocialOutbox.objects.create(emergency_data={'description': 'Sent'}, status='SENT')
+
+        before = timezone.now()
+        claimed = claim_outbox_entries(batch_size=5)
+        self.assertEqual([entry.pk for entry in claimed], [self.entry.pk])
+        entry = claimed[0]
+        self.assertEqual((entry.status, entry.attempts), ('PROCESSING', 1))
+        self.assertGreaterEqual(entry.available_at, before + timedelta(seconds=300))
+        # Leased: another worker does not see it
+        self.assertEqual(claim_outbox_entries(), [])
+
+        # The worker died: the lease runs out and the entry is claimed again
+        self.make_due()
+        claimed = claim_outbox_entries()
+        self.assertEqual([(entry.pk, entry.attempts) for entry in claimed], [(self.entry.pk, 2)])
+
+    def test_claims_take_the_longest_waiting_entries_first(self):
+        entries = [SocialOutbox.objects.create(emergency_data={'description': str(i)}) for i in range(3)]
+        now = timezone.now()
+        for minutes, entry in zip([3, 1, 2], entries):
+            SocialOutbox.objects.filter(pk=entry.pk).update(available_at=now - timedelta(minutes=minutes))
+        claimed = {entry.pk for entry in claim_outbox_entries(batch_size=2)}
+        self.assertEqual(claimed, {entries[0].pk, entries[2].pk})
+
+    def test_retries_back_off_exponentially(self):
+        for attempts in range(1, 4):
+            before = timezone.now()
+            self.drain(DISCORD=False)
+            self.assertEqual(self.entry.attempts, attempts)
+            delay = (self.entry.available_at - before).total_seconds()
+            self.assertAlmostEqual(delay, 30 * 2 ** attempts, delta=5)
+            self.make_due()
+
+class StoreMediaAssetTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.temp_root = os.path.join(media_root, 'tmp')
+        os.makedirs(self.temp_root)
+        settings = override_settings(MEDIA_ROOT=media_root, TEMP_MEDIA_ROOT=self.temp_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def upload(self, content=b'jpeg bytes'):
+        return SimpleUploadedFile('flood.JPG', content, content_type='image/jpeg')
+
+    def test_file_is_moved_into_place_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = store_media_asset(self.upload())
+            self.assertFalse(os.path.exists(asset.file.path))
+        self.assertTrue(asset.file.name.endswith(f'{asset.sha256}.jpg'))
+        with open(asset.file.path, 'rb') as stored:
+            self.assertEqual(stored.read(), b'jpeg bytes')
+        self.assertEqual(os.listdir(self.temp_root), [])
+
+    def test_same_content_is_stored_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = store_media_asset(self.upload())
+        second = store_media_asset(self.upload())
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(MediaAsset.objects.count(), 1)
+        self.assertEqual(os.listdir(self.temp_root), [])
+
+    def test_rollback_leaves_no_file(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                asset = store_media_asset(self.upload())
+                raise RuntimeError('report could not be saved')
+        self.assertFalse(MediaAsset.objects.exists())
+        self.assertFalse(os.path.exists(asset.file.path))
+        self.assertEqual(os.listdir(self.temp_root), [])
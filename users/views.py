@@ -11,8 +11,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User
 from .serializers import UserSerializer, LoginSerializer, RegisterSerializer
 from .permissions import IsSameUserOrAdmin
-from location.models import Location
 from location.serializers import LocationSerializer
+from location.trajectory import location_history
 
 User = get_user_model()
 
@@ -131,7 +131,8 @@ class UserViewSet(mixins.CreateModelMixin,
             return Response({"detail": "You don't have permission to view these locations"},
                            status=status.HTTP_403_FORBIDDEN)
             
-        locations = Location.objects.filter(user=user).order_by('-timestamp')
+        # Old points are read back from their compacted daily tracks
+        locations = location_history(user)
         serializer = LocationSerializer(locations, many=True)
         return Response(serializer.data)
 